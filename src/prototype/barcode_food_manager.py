@@ -1,32 +1,54 @@
-import cv2
-from pyzbar import pyzbar
-from PIL import Image, ImageDraw, ImageFont
-import numpy as np
-import pandas as pd
 import time
-import re
+START_TIME = time.perf_counter()  # 시작 → 첫 프레임/첫 조회 시간 측정 기준
+import argparse
+import importlib
 import os
-import sys # 프로그램 종료를 위해 추가
-
-# EasyOCR 설치 여부 확인
-try:
-    import easyocr
-    HAVE_EASYOCR = True
-except ImportError:
-    HAVE_EASYOCR = False
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import cv2
+from product_index import ProductIndex
+from live_product_db import LiveProductIndex
+from scan_pipeline import ScanPipeline
+from motion_decoder import FullFrameDecoder, MotionGatedDecoder
+from text_overlay import find_korean_font, get_renderer
+from date_parser import find_exp
+from ocr_engine import OcrEngine, HAVE_EASYOCR
+from inventory_store import InventoryStore
+from expiry_alerts import ExpiryAlertScheduler, CallbackSink, InventoryAlertSink, JsonlFileSink
+from dashboard_server import DashboardServer
+from recipe_recommender import BASIC_RECIPES, RecipeRecommender
+from metrics import registry as metrics
 
 PRODUCT_DB_PATH = "product_db.csv"
 
-# --- 이 부분이 수정되었습니다 ---
-# DB 파일이 있는지 확인하고, 없으면 안내 후 종료
-if not os.path.exists(PRODUCT_DB_PATH):
-    print(f"🚨 오류: '{PRODUCT_DB_PATH}' 파일을 찾을 수 없습니다.")
-    print("먼저 create_db.py를 실행하여 50개 샘플 데이터베이스를 생성해주세요.")
-    sys.exit() # 프로그램 종료
-# --- 여기까지 수정 ---
+# 첫 프레임에 꼭 필요하지 않은 무거운 모듈은 카메라를 여는 동안 백그라운드에서 미리 import
+PRELOAD_MODULES = ["pyzbar.pyzbar", "PIL.ImageFont", "PIL.ImageDraw"]
+
+
+def preload_modules(names=PRELOAD_MODULES):
+    def run():
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+def get_pyzbar():
+    # pyzbar는 zbar 공유 라이브러리를 로드하므로 처음 디코딩할 때 import
+    from pyzbar import pyzbar
+    return pyzbar
+
+
+def elapsed_ms():
+    return (time.perf_counter() - START_TIME) * 1000.0
 
 
 def load_product_db(path):
+    import pandas as pd
     # 바코드가 숫자로만 구성된 경우, 문자열로 불러와 앞의 0이 사라지지 않게 함
     return pd.read_csv(path, dtype={"code": str}, encoding='utf-8-sig')
 
@@ -38,20 +60,15 @@ def query_product(db, code):
     return None
 
 def extract_exp_from_text(text):
-    patterns = [
-        r'(\d{4}-\d{1,2}-\d{1,2})',
-        r'(\d{2}/\d{2}/\d{4})',
-        r'(\d{4}/\d{1,2}/\d{1,2})',
-        r'(\d{4}\.\d{1,2}\.\d{1,2})'
-    ]
-    for pat in patterns:
-        m = re.search(pat, text)
-        if m:
-            return m.group(1)
-    return None
+    # 네 가지 형식을 하나의 정규식으로 한 번에 찾음 (결과는 기존과 같고 반복 문자열은 캐시됨)
+    return find_exp(text)
+
+def extract_exp_from_texts(texts):
+    # OCR 결과 문자열 목록용 (OcrEngine의 extract_fn)
+    return extract_exp_from_text(" ".join(texts))
 
 def decode_barcode(frame):
-    barcodes = pyzbar.decode(frame)
+    barcodes = get_pyzbar().decode(frame)
     results = []
     for b in barcodes:
         data = b.data.decode('utf-8')
@@ -60,77 +77,264 @@ def decode_barcode(frame):
     return results
     
 # OpenCV 프레임에 한글 텍스트를 추가하는 함수
+# 폰트와 라벨 스프라이트는 캐시되고, 텍스트 영역에만 제자리에서 블렌딩됨
 def put_text_korean(frame, text, pos, font_path, font_size, color):
-    img_pil = Image.fromarray(frame)
-    draw = ImageDraw.Draw(img_pil)
-    font = ImageFont.truetype(font_path, font_size)
-    draw.text(pos, text, font=font, fill=color)
-    return np.array(img_pil)
-
-def main():
-    product_db = load_product_db(PRODUCT_DB_PATH)
-
-    reader = None
-    if HAVE_EASYOCR:
-        try:
-            reader = easyocr.Reader(['en','ko'], gpu=False)
-        except Exception as e:
-            print("EasyOCR 로드 실패:", e)
-            reader = None
+    return get_renderer(font_path).draw(frame, text, pos, font_size, color)
+
+def make_decoder(decode_mode):
+    """decode_mode에 맞는 디코더를 만듭니다. 반환값은 decode_barcode와 같은 형식의 결과를 돌려줍니다."""
+    if decode_mode == "full":
+        return FullFrameDecoder(get_pyzbar().decode)
+    if decode_mode == "motion":
+        return MotionGatedDecoder(get_pyzbar().decode)
+    raise ValueError(f"알 수 없는 디코딩 모드: {decode_mode}")
+
+def main(workers=2, worker_type="thread", queue_size=2, decode_mode="full", ocr=False,
+         inventory_path="inventory.db", alerts_path=None, metrics_file=None, metrics_port=None,
+         hud=False, watch_db=False, db_deltas=None, dashboard_port=None,
+         recipes=False):
+    if decode_mode == "motion" and worker_type == "process":
+        # 움직임 감지는 직전 프레임 상태가 필요하므로 프로세스 간에 나눌 수 없음
+        print("motion 디코딩 모드는 스레드 워커에서만 사용할 수 있습니다.")
+        return
+
+    # 계측은 내보낼 곳이나 HUD가 있을 때만 켬 (꺼져 있으면 stage()/inc()는 바로 반환)
+    metrics.enable(bool(metrics_file or metrics_port or hud))
+    if metrics_file:
+        metrics.start_textfile_writer(metrics_file)
+    if metrics_port:
+        metrics.serve_http(metrics_port)
+        print(f"메트릭: http://127.0.0.1:{metrics_port}/metrics")
+
+    # DB 파일이 있는지 확인하고, 없으면 안내 후 종료
+    if not os.path.exists(PRODUCT_DB_PATH):
+        print(f"🚨 오류: '{PRODUCT_DB_PATH}' 파일을 찾을 수 없습니다.")
+        print("먼저 create_db.py를 실행하여 50개 샘플 데이터베이스를 생성해주세요.")
+        return
+
+    preload_modules()
+    # 프레임마다 DataFrame 전체를 비교하지 않도록 정렬 배열 인덱스를 사용.
+    # CSV가 바뀌지 않았으면 미리 만들어 둔 바이너리 스냅샷을 메모리 매핑하므로 pandas도 필요 없음.
+    # 카메라를 여는 동안 백그라운드에서 로드함
+    loader = ThreadPoolExecutor(max_workers=1)
+    index_future = loader.submit(ProductIndex.load_or_build, PRODUCT_DB_PATH)
+
+    # OCR은 요청했을 때만 사용하며, 모델은 첫 OCR 때 백그라운드 스레드에서 로드됨
+    ocr_engine = None
+    if ocr:
+        if HAVE_EASYOCR:
+            ocr_engine = OcrEngine(extract_exp_from_texts)
+        else:
+            print("EasyOCR가 설치되어 있지 않아 OCR 없이 실행합니다.")
 
     cap = cv2.VideoCapture(0)
     if not cap.isOpened():
         print("카메라를 열 수 없습니다.")
+        loader.shutdown()
         return
 
-    # 한글 폰트 경로 설정 (Windows 기준, 다른 OS는 경로 수정 필요)
-    font_path = 'C:/Windows/Fonts/malgun.ttf'
-    if not os.path.exists(font_path):
-        font_path = '/usr/share/fonts/truetype/nanum/NanumGothic.ttf' # Linux 예시
-        if not os.path.exists(font_path):
-            print("경고: 한글 폰트 파일('malgun.ttf' 또는 'NanumGothic.ttf')을 찾을 수 없습니다.")
-            font_path = None
+    product_index, rebuilt = index_future.result()
+    loader.shutdown()
+    print(f"상품 DB {len(product_index)}개 {'스냅샷 새로 생성' if rebuilt else '스냅샷 사용'} ({elapsed_ms():.0f}ms)")
+    if watch_db or db_deltas:
+        # CSV 수정/델타 파일을 백그라운드에서 반영하고 인덱스를 한 번에 교체 (조회는 잠금 없이 계속됨)
+        product_index = LiveProductIndex(
+            product_index, csv_path=PRODUCT_DB_PATH if watch_db else None, delta_dir=db_deltas,
+            on_reload=lambda kind, rows, secs: print(f"🔄 상품 DB 갱신 ({kind}): {rows}행, {secs * 1000:.1f}ms"),
+        ).start()
+    first_frame_ms = first_lookup_ms = None
+
+    # 한글 폰트 경로 설정 (Windows, Linux 순으로 찾음. 다른 OS는 text_overlay.KOREAN_FONT_PATHS 수정 필요)
+    font_path = find_korean_font()
+    if font_path is None:
+        print("경고: 한글 폰트 파일('malgun.ttf' 또는 'NanumGothic.ttf')을 찾을 수 없습니다.")
+
+    # 입고 기록은 백그라운드 스레드가 모아서 커밋하므로 렌더 루프를 막지 않음
+    inventory = InventoryStore(inventory_path) if inventory_path else None
+
+    # 유통기한 임박/만료 알림: 재고 입고/출고 이벤트를 받아 힙에 예약해 두고 시각이 되면 알림
+    alerts = None
+    dashboard = None
+    recommender = None
+    last_recipes = None
+    recipes_version = None
+    if inventory is not None:
+        if recipes:
+            # 재료 → 레시피 역색인에 입고/출고만 반영하므로 스캔마다 다시 조회해도 가벼움
+            recommender = RecipeRecommender(BASIC_RECIPES)
+            recommender.track_many(inventory.current_items())
+            inventory.add_listener(recommender.on_inventory_event)
+        sinks = [CallbackSink(lambda alert: print("🔔", alert["message"]))]
+        if alerts_path:
+            sinks.append(JsonlFileSink(alerts_path))
+        if dashboard_port is not None:
+            # 대시보드는 자체 이벤트 루프 스레드에서 동작하고, 입고/출고와 알림을 이벤트로 받아 캐시를 갱신함
+            dashboard = DashboardServer(inventory, port=dashboard_port, recommender=recommender).start()
+            inventory.add_listener(dashboard.on_inventory_event)
+            sinks.append(CallbackSink(dashboard.on_alert))
+            print(f"대시보드: http://127.0.0.1:{dashboard.port}/")
+        # 보낸 알림은 재고 DB에 기록해 두고, 다시 시작할 때 이미 보낸 알림은 건너뜀
+        sinks.append(InventoryAlertSink(inventory))
+        alerts = ExpiryAlertScheduler(sinks)
+        alerts.track_many(inventory.current_items(), fired=inventory.alert_states())
+        inventory.add_listener(alerts.on_inventory_event)
+        alerts.start()
+
+    # 입고할 때 OCR 날짜가 아직 없으면 상품 DB 날짜로 넣고, 포장에서 읽은 날짜가 도착하면 그 품목을 고침
+    awaiting_exp = {}  # 품목 id -> 바코드
+    if ocr_engine is not None and inventory is not None:
+        def on_ocr_result(code, exp):
+            for item_id in [i for i, c in list(awaiting_exp.items()) if c == code]:
+                if awaiting_exp.pop(item_id, None) is not None and exp:
+                    inventory.update_exp(item_id, exp)
+        ocr_engine.on_result = on_ocr_result
 
     seen = {}
     READ_INTERVAL = 2.0
+    # 입고는 바코드가 화면에 나타날 때 한 번만 기록. ABSENT_SECONDS 동안 안 보였다가 다시 보이면 새로 넣은 것으로 봄
+    visible = {}  # code -> 마지막으로 보인 시각
+    ABSENT_SECONDS = 3.0
+    STATS_INTERVAL = 5.0
+    last_stats = time.monotonic()
+    fps = 0.0
+    last_frame = time.monotonic()
 
+    # 캡처와 디코딩은 백그라운드 스레드/프로세스에서, 렌더는 메인 스레드에서 수행
+    decoder = make_decoder(decode_mode) if worker_type == "thread" else decode_barcode
+    pipeline = ScanPipeline(cap, decoder, workers=workers, worker_type=worker_type,
+                            queue_size=queue_size)
     try:
+        pipeline.start()
         while True:
-            ret, frame = cap.read()
-            if not ret:
-                print("프레임을 읽을 수 없습니다. 카메라 상태를 확인하세요.")
-                break
+            result = pipeline.next_result(timeout=0.05)
+            if result is None:
+                if pipeline.finished():
+                    print("프레임을 읽을 수 없습니다. 카메라 상태를 확인하세요.")
+                    break
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+                continue
 
-            bars = decode_barcode(frame)
+            _, t_capture, frame, bars = result
             for b in bars:
                 code = b["data"]
                 now = time.time()
-                if code in seen and now - seen[code] < READ_INTERVAL:
+                arrived = code not in visible or now - visible[code] > ABSENT_SECONDS
+                visible[code] = now
+                # READ_INTERVAL은 조회/표시 갱신만 줄임 (입고 여부와 무관)
+                if not arrived and code in seen and now - seen[code] < READ_INTERVAL:
+                    metrics.inc("duplicate_skips")
                     continue
                 seen[code] = now
 
-                info = query_product(product_db, code)
+                with metrics.stage("lookup"):
+                    info = product_index.lookup(code)
+                if first_lookup_ms is None:
+                    first_lookup_ms = elapsed_ms()
+                    metrics.set_gauge("startup_first_lookup_seconds", first_lookup_ms / 1000.0)
+                    print(f"⏱️ 시작 → 첫 조회 {first_lookup_ms:.0f}ms")
                 if info is None:
+                    metrics.inc("unknown_codes")
                     info = {"code": code, "name": "미등록 상품", "exp": "N/A"}
-
-                (x, y, w, h) = b["rect"]
-                cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
-                
-                text = f"{info['name']} | 유통기한: {info['exp']}"
-                
-                if font_path:
-                    frame = put_text_korean(frame, text, (x, y - 40), font_path, 30, (255, 255, 0))
                 else:
-                    cv2.putText(frame, "Product:" + info['name'], (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+                    metrics.inc("lookup_hits")
+                ocr_exp = None
+                if ocr_engine is not None:
+                    # 같은 상품은 코드별 캐시를 사용하므로 매 프레임 OCR하지 않음
+                    ocr_exp = ocr_engine.exp_async(code, frame, b["rect"])
+                    if ocr_exp:
+                        metrics.inc("ocr_cache_hits")
+                        info = dict(info, exp=ocr_exp)
+                if inventory is not None and arrived:
+                    item_id = inventory.add(code, info["name"], info["exp"], source="camera")
+                    if ocr_engine is not None and not ocr_exp:
+                        awaiting_exp[item_id] = code
+                        # exp_async 이후 add 전에 OCR이 끝났으면 콜백이 이 품목을 못 봤으므로 여기서 반영
+                        hit, exp = ocr_engine.cached(code)
+                        if hit and awaiting_exp.pop(item_id, None) is not None and exp:
+                            inventory.update_exp(item_id, exp)
+                if recommender is not None and recommender.version != recipes_version:
+                    # 입고/출고로 레시피 점수가 실제로 바뀐 경우에만 캡처 루프에서 다시 조회
+                    recipes_version = recommender.version
+                    top = [r["name"] for r in recommender.top(3, max_missing=1)]
+                    if top and top != last_recipes:
+                        print("🍳 추천 레시피:", ", ".join(top))
+                    last_recipes = top
+
+                with metrics.stage("overlay"):
+                    (x, y, w, h) = b["rect"]
+                    cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
+                    
+                    text = f"{info['name']} | 유통기한: {info['exp']}"
+                    
+                    if font_path:
+                        frame = put_text_korean(frame, text, (x, y - 40), font_path, 30, (255, 255, 0))
+                    else:
+                        cv2.putText(frame, "Product:" + info['name'], (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+            now = time.monotonic()
+            fps = 0.9 * fps + 0.1 / max(now - last_frame, 1e-6)
+            last_frame = now
+            if hud:
+                metrics.draw_hud(frame, fps)
+
+            with metrics.stage("display"):
+                cv2.imshow('Barcode Scanner', frame)
+                key = cv2.waitKey(1) & 0xFF
+            pipeline.mark_rendered(t_capture)
+            metrics.inc("frames_rendered")
+            if first_frame_ms is None:
+                first_frame_ms = elapsed_ms()
+                metrics.set_gauge("startup_first_frame_seconds", first_frame_ms / 1000.0)
+                print(f"⏱️ 시작 → 첫 프레임 {first_frame_ms:.0f}ms")
 
-            cv2.imshow('Barcode Scanner', frame)
+            if time.monotonic() - last_stats >= STATS_INTERVAL:
+                print(pipeline.format_stats())
+                last_stats = time.monotonic()
 
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            if key == ord('q'):
                 break
     finally:
         print("프로그램을 종료합니다.")
+        pipeline.stop()
+        if ocr_engine is not None:
+            ocr_engine.close()
+        if isinstance(product_index, LiveProductIndex):
+            product_index.stop()
+        if alerts is not None:
+            alerts.stop()
+        if dashboard is not None:
+            dashboard.stop()
+        if inventory is not None:
+            inventory.close()
+        metrics.close()
+        print(pipeline.format_stats())
+        if worker_type == "thread":
+            print(decoder.stats.format(decode_mode))
         cap.release()
         cv2.destroyAllWindows()
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="스마트 냉장고 바코드 스캐너")
+    parser.add_argument("--workers", type=int, default=2, help="디코딩 워커 수")
+    parser.add_argument("--worker-type", choices=["thread", "process"], default="thread",
+                        help="디코딩 워커 종류 (스레드 또는 프로세스)")
+    parser.add_argument("--queue-size", type=int, default=2, help="단계 사이 큐 크기 (가득 차면 오래된 프레임을 버림)")
+    parser.add_argument("--decode-mode", choices=["full", "motion"], default="full",
+                        help="full: 매 프레임 전체 디코딩, motion: 움직임이 있을 때 변화 영역만 디코딩")
+    parser.add_argument("--ocr", action="store_true", help="바코드 주변에서 유통기한을 OCR로 읽기 (easyocr 필요)")
+    parser.add_argument("--inventory", default="inventory.db", help="재고 기록 SQLite 파일 (빈 문자열이면 기록 안 함)")
+    parser.add_argument("--alerts", help="유통기한 알림을 기록할 JSON Lines 파일")
+    parser.add_argument("--metrics-file", help="단계별 지연 시간/카운터를 Prometheus 텍스트로 주기적으로 기록할 파일")
+    parser.add_argument("--metrics-port", type=int, help="localhost:PORT/metrics 로 메트릭 제공")
+    parser.add_argument("--hud", action="store_true", help="화면에 FPS와 단계별 지연 시간 표시")
+    parser.add_argument("--watch-db", action="store_true", help="실행 중 product_db.csv 수정을 감지해 다시 시작하지 않고 반영")
+    parser.add_argument("--db-deltas", help="op,code,name,exp 형식의 델타 CSV를 넣으면 반영하는 디렉터리")
+    parser.add_argument("--dashboard-port", type=int, help="localhost:PORT 에서 재고 대시보드 API/이벤트 스트림 제공")
+    parser.add_argument("--recipes", action="store_true", help="입고할 때마다 현재 재고로 만들 수 있는 레시피 추천")
+    args = parser.parse_args()
+    main(workers=args.workers, worker_type=args.worker_type, queue_size=args.queue_size,
+         decode_mode=args.decode_mode, ocr=args.ocr, inventory_path=args.inventory,
+         alerts_path=args.alerts, metrics_file=args.metrics_file, metrics_port=args.metrics_port,
+         hud=args.hud, watch_db=args.watch_db, db_deltas=args.db_deltas,
+         dashboard_port=args.dashboard_port, recipes=args.recipes)
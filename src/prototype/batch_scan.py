@@ -0,0 +1,167 @@
+import argparse
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+from pyzbar import pyzbar
+
+from motion_decoder import to_results
+from ocr_engine import OcrEngine
+from product_index import ProductIndex
+
+IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"}
+
+
+def iter_video(path, stride=1):
+    """영상 파일의 프레임을 (프레임 번호, 초 단위 시각, 프레임) 형태로 하나씩 읽습니다."""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise FileNotFoundError(f"영상을 열 수 없습니다: {path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    try:
+        index = 0
+        while True:
+            # stride만큼 건너뛸 프레임은 디코딩하지 않고 grab만 함
+            if index % stride:
+                if not cap.grab():
+                    break
+                index += 1
+                continue
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield index, round(index / fps, 3), frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def iter_images(directory):
+    """디렉터리의 이미지 경로를 이름 순으로 (번호, None, 경로) 형태로 돌려줍니다.
+    이미지는 워커 프로세스에서 직접 읽으므로 픽셀을 프로세스 간에 복사하지 않습니다."""
+    names = sorted(n for n in os.listdir(directory) if os.path.splitext(n)[1].lower() in IMAGE_EXTS)
+    for index, name in enumerate(names):
+        yield index, None, os.path.join(directory, name)
+
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+_ocr_engine = None
+
+
+def get_ocr_engine():
+    """워커 프로세스마다 OCR 엔진을 한 번만 만듭니다. 코드별 캐시도 프로세스 안에서 재사용됩니다."""
+    global _ocr_engine
+    if _ocr_engine is None:
+        from barcode_food_manager import extract_exp_from_texts
+        _ocr_engine = OcrEngine(extract_exp_from_texts)
+    return _ocr_engine
+
+
+def scan_chunk(chunk, ocr=False):
+    """워커 프로세스에서 실행: 프레임 묶음을 디코딩해 (번호, 시각, 출처, 바코드 목록) 목록을 반환.
+    ocr이면 각 바코드 주변에서 읽은 유통기한을 "ocr_exp"에 담습니다."""
+    out = []
+    for index, timestamp, src in chunk:
+        if isinstance(src, str):
+            frame = cv2.imread(src)
+            source = src
+            if frame is None:
+                out.append((index, timestamp, source, []))
+                continue
+        else:
+            frame, source = src, None
+        bars = to_results(pyzbar.decode(frame))
+        if ocr:
+            engine = get_ocr_engine()
+            for b in bars:
+                b["ocr_exp"] = engine.exp_for(b["data"], frame, b["rect"])
+        out.append((index, timestamp, source, bars))
+    return out
+
+
+def ordered_map(executor, fn, items, window, *args):
+    """executor.map과 같지만 동시에 제출하는 작업 수를 window로 제한해 메모리를 일정하게 유지합니다.
+    결과는 입력 순서대로 나옵니다."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item, *args))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="녹화 영상 / 이미지 폴더 바코드 일괄 스캔 (화면 없음)")
+    parser.add_argument("input", help="영상 파일 또는 이미지 디렉터리")
+    parser.add_argument("--db", default="product_db.csv", help="상품 데이터베이스 CSV")
+    parser.add_argument("--out", help="결과 JSON Lines 파일 (기본: 표준 출력)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk", type=int, default=8, help="워커에 한 번에 넘길 프레임 수")
+    parser.add_argument("--stride", type=int, default=1, help="영상에서 N프레임마다 하나씩만 처리")
+    parser.add_argument("--ocr", action="store_true", help="바코드가 있는 프레임에서 유통기한 OCR 수행 (easyocr 필요)")
+    args = parser.parse_args()
+    for name in ("workers", "chunk", "stride"):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name}는 1 이상이어야 합니다.")
+
+    index = ProductIndex.load_or_build(args.db)[0] if os.path.exists(args.db) else None
+    if index is None:
+        print(f"경고: '{args.db}' 파일이 없어 상품 정보 없이 기록합니다.", file=sys.stderr)
+
+    is_dir = os.path.isdir(args.input)
+    items = iter_images(args.input) if is_dir else iter_video(args.input, args.stride)
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+
+    frames = barcodes = 0
+    last_ts = 0.0
+    t0 = time.perf_counter()
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            window = args.workers * 4
+            for results in ordered_map(executor, scan_chunk, chunked(items, args.chunk), window, args.ocr):
+                for frame_index, timestamp, source, bars in results:
+                    frames += 1
+                    last_ts = timestamp or last_ts
+                    for b in bars:
+                        record = {
+                            "frame": frame_index,
+                            "timestamp": timestamp,
+                            "code": b["data"],
+                            "type": b["type"],
+                            "rect": list(b["rect"]),
+                            "product": index.lookup(b["data"]) if index is not None else None,
+                        }
+                        if source is not None:
+                            record["source"] = source
+                        if args.ocr:
+                            record["ocr_exp"] = b.get("ocr_exp")
+                        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                        barcodes += 1
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - t0
+    summary = f"프레임 {frames}개, 바코드 {barcodes}건, {elapsed:.1f}초, {frames / max(elapsed, 1e-9):.1f} fps"
+    if not is_dir and last_ts:
+        summary += f", 실제 시간 대비 {elapsed / last_ts:.2f}배 소요"
+    print(summary, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+import argparse
+import datetime
+import time
+
+import numpy as np
+
+from expiry_alerts import CallbackSink, ExpiryAlertScheduler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ExpiryAlertScheduler 추가/삭제/알림 처리량 및 대기 CPU 측정")
+    parser.add_argument("--items", type=int, default=1_000_000)
+    parser.add_argument("--days", type=int, default=30, help="시뮬레이션할 기간 (일)")
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    today = datetime.date.today()
+    offsets = rng.integers(0, 365, size=args.items)
+    exps = [(today + datetime.timedelta(days=int(d))).isoformat() for d in offsets]
+    items = [{"id": i, "code": str(8800000000000 + i), "name": f"상품{i % 50}", "exp": e}
+             for i, e in enumerate(exps)]
+
+    fired = []
+    scheduler = ExpiryAlertScheduler([CallbackSink(fired.append)])
+
+    t0 = time.perf_counter()
+    scheduler.track_many(items)
+    print(f"일괄 등록 {args.items:,}건 {time.perf_counter() - t0:.2f}s")
+
+    extra = [{"id": args.items + i, "code": "x", "name": "x", "exp": exps[i]} for i in range(100_000)]
+    t0 = time.perf_counter()
+    for item in extra:
+        scheduler.track(item)
+    print(f"개별 추가 평균 {(time.perf_counter() - t0) / len(extra) * 1e6:.2f}us")
+    t0 = time.perf_counter()
+    for item in extra:
+        scheduler.untrack(item["id"])
+    print(f"개별 삭제 평균 {(time.perf_counter() - t0) / len(extra) * 1e6:.2f}us")
+
+    # 하루씩 시간을 진행하며 도래한 알림만 처리
+    now = time.time()
+    t0 = time.perf_counter()
+    for day in range(args.days):
+        scheduler.advance(now + day * 86400)
+    elapsed = time.perf_counter() - t0
+    print(f"{args.days}일 진행: 알림 {len(fired):,}건, {elapsed:.2f}s ({len(fired) / max(elapsed, 1e-9):,.0f}건/s)")
+
+    # 다음 알림까지 잠들어 있는 동안의 CPU 사용량
+    scheduler.sinks = []
+    scheduler.start()
+    cpu0, wall0 = time.process_time(), time.perf_counter()
+    time.sleep(args.idle_seconds)
+    cpu = time.process_time() - cpu0
+    print(f"대기 {time.perf_counter() - wall0:.1f}s 동안 CPU {cpu * 1000:.2f}ms")
+    scheduler.stop()
+
+
+if __name__ == '__main__':
+    main()
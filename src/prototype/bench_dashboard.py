@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import datetime
+import json
+import multiprocessing as mp
+import os
+import random
+import re
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from dashboard_server import DashboardServer
+from expiry_alerts import CallbackSink, ExpiryAlertScheduler
+from inventory_store import InventoryStore
+
+CONTENT_LENGTH_RE = re.compile(rb"Content-Length: (\d+)", re.IGNORECASE)
+
+
+def product(i):
+    today = datetime.date.today()
+    return str(8_800_000_000_000 + i), f"상품{i}", (today + datetime.timedelta(days=i % 60 - 2)).isoformat()
+
+
+def run_server(db_path, cache, products, scan_rate, port_q, measure, stop, result_q):
+    """서버 프로세스: 스캐너처럼 재고에 입고/출고를 일정 속도로 기록하면서 대시보드 서버를 돌림."""
+    inventory = InventoryStore(db_path)
+    server = DashboardServer(inventory, port=0, cache=cache).start()
+    alerts = ExpiryAlertScheduler([CallbackSink(server.on_alert)])
+    alerts.track_many(inventory.current_items())
+    inventory.add_listener(server.on_inventory_event)
+    inventory.add_listener(alerts.on_inventory_event)
+    alerts.start()
+    port_q.put(server.port)
+
+    measure.wait()
+    cpu0, wall0, events0 = time.process_time(), time.perf_counter(), server.stats["events"]
+    rng = random.Random(0)
+    next_t = time.monotonic()
+    while not stop.is_set():
+        code, name, exp = product(rng.randrange(products))
+        if inventory.count(code) and rng.random() < 0.5:
+            inventory.remove(code)
+        else:
+            inventory.add(code, name, exp, source="bench")
+        next_t += 1.0 / scan_rate
+        stop.wait(max(0.0, next_t - time.monotonic()))
+    cpu, wall = time.process_time() - cpu0, time.perf_counter() - wall0
+    alerts.stop()
+    server.stop()
+    inventory.close()
+    result_q.put({"cpu": cpu, "wall": wall, "events": server.stats["events"] - events0, "stats": dict(server.stats)})
+
+
+async def sse_client(port, sample, received, latencies):
+    """SSE 구독자. sample이면 이벤트를 해석해 발생 → 수신 지연을 기록하고, 아니면 이벤트 수만 셈."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(b"GET /events HTTP/1.1\r\nHost: localhost\r\nAccept: text/event-stream\r\n\r\n")
+    await reader.readuntil(b"\r\n\r\n")
+    try:
+        if sample:
+            while line := await reader.readline():
+                if line.startswith(b"data: "):
+                    data = json.loads(line[6:])
+                    latencies.append(time.time() - data.get("ts", data.get("added")))
+                    received[0] += 1
+        else:
+            while chunk := await reader.read(65536):
+                received[0] += chunk.count(b"\nevent: ")
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+async def request_worker(port, paths, deadline, latencies, errors):
+    """keep-alive 연결 하나로 조회 API를 계속 요청합니다."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    i = 0
+    while time.perf_counter() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        t0 = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("ascii"))
+        head = await reader.readuntil(b"\r\n\r\n")
+        await reader.readexactly(int(CONTENT_LENGTH_RE.search(head).group(1)))
+        latencies.append(time.perf_counter() - t0)
+        if not head.startswith(b"HTTP/1.1 200"):
+            errors[0] += 1
+    writer.close()
+
+
+async def load(port, args, measure, stop):
+    received = [[0] for _ in range(args.clients)]
+    event_latencies = []
+    clients = []
+    for i in range(args.clients):
+        sample = i < args.sample_clients
+        clients.append(asyncio.create_task(sse_client(port, sample, received[i], event_latencies)))
+        if i % 200 == 199:
+            await asyncio.sleep(0.05)  # 접속 폭주로 backlog가 넘치지 않게 조금씩 연결
+    await asyncio.sleep(0.5)
+
+    rng = random.Random(1)
+    paths = []
+    for _ in range(1000):
+        r = rng.random()
+        if r < 0.4:
+            paths.append("/api/items")
+        elif r < 0.8:
+            paths.append("/api/expiring")
+        else:
+            paths.append(f"/api/history/{product(rng.randrange(args.products))[0]}?limit=20")
+    measure.set()
+    latencies, errors = [], [0]
+    t0 = time.perf_counter()
+    deadline = t0 + args.seconds
+    await asyncio.gather(*(request_worker(port, paths[i::args.workers] or paths, deadline, latencies, errors)
+                           for i in range(args.workers)))
+    elapsed = time.perf_counter() - t0
+    stop.set()
+    await asyncio.sleep(0.5)  # 마지막 이벤트가 도착할 시간
+    for task in clients:
+        task.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    return {"requests": len(latencies), "elapsed": elapsed, "errors": errors[0],
+            "latency": np.array(latencies) * 1000, "event_latency": np.array(event_latencies) * 1000,
+            "received": sum(r[0] for r in received)}
+
+
+def run(args, db_path, cache):
+    port_q, result_q = mp.Queue(), mp.Queue()
+    measure, stop = mp.Event(), mp.Event()
+    proc = mp.Process(target=run_server,
+                      args=(db_path, cache, args.products, args.scan_rate, port_q, measure, stop, result_q))
+    proc.start()
+    port = port_q.get(timeout=30)
+    out = asyncio.run(load(port, args, measure, stop))
+    out.update(result_q.get(timeout=30))
+    proc.join()
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="대시보드 서버 부하 테스트 (SSE 구독자 + 조회 요청, 캐시 사용/미사용 비교)")
+    parser.add_argument("--items", type=int, default=500, help="미리 넣어 둘 재고 수")
+    parser.add_argument("--products", type=int, default=200, help="스캔에 쓰는 상품 종류 수")
+    parser.add_argument("--clients", type=int, default=2000, help="SSE 스트림 구독자 수")
+    parser.add_argument("--sample-clients", type=int, default=20, help="이벤트 지연을 재는 구독자 수")
+    parser.add_argument("--workers", type=int, default=50, help="조회 API를 계속 요청하는 연결 수")
+    parser.add_argument("--scan-rate", type=float, default=5.0, help="초당 입고/출고 이벤트 수")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="dashboard_bench_")
+    db_path = os.path.join(tmp, "inventory.db")
+    with InventoryStore(db_path) as inventory:
+        for i in range(args.items):
+            inventory.add(*product(i % args.products), source="bench")
+
+    print(f"재고 {args.items}개, SSE 구독자 {args.clients}명, 조회 연결 {args.workers}개, "
+          f"입고/출고 {args.scan_rate:g}건/s, {args.seconds:g}s, CPU {os.cpu_count()}개")
+    print(f"{'캐시':<6}{'요청/s':>10}{'p50':>10}{'p99':>10}{'오류':>6}{'이벤트':>8}{'전달률':>9}"
+          f"{'이벤트 p50':>12}{'이벤트 p99':>12}{'서버 CPU':>10}{'적중률':>8}")
+    for cache in (True, False):
+        run_db = os.path.join(tmp, f"run_{int(cache)}.db")
+        shutil.copy(db_path, run_db)  # 두 실행이 같은 재고에서 시작하도록
+        r = run(args, run_db, cache)
+        stats = r["stats"]
+        hits, misses = stats.get("cache_hits", 0), stats.get("cache_misses", 0)
+        lat, ev = r["latency"], r["event_latency"]
+        print(f"{'사용' if cache else '안 함':<6}{r['requests'] / r['elapsed']:>10,.0f}"
+              f"{np.percentile(lat, 50):>8.2f}ms{np.percentile(lat, 99):>8.2f}ms{r['errors']:>6}"
+              f"{r['events']:>8}{r['received'] / max(r['events'] * args.clients, 1) * 100:>8.1f}%"
+              f"{np.percentile(ev, 50) if len(ev) else 0:>10.2f}ms{np.percentile(ev, 99) if len(ev) else 0:>10.2f}ms"
+              f"{r['cpu'] / r['wall'] * 100:>9.0f}%"
+              f"{hits / max(hits + misses, 1) * 100:>7.1f}%")
+    shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
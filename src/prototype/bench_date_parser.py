@@ -0,0 +1,189 @@
+import argparse
+import datetime
+import re
+import sys
+import time
+
+import numpy as np
+
+import date_parser
+
+
+def extract_exp_from_text_legacy(text):
+    """비교용: 기존 barcode_food_manager.extract_exp_from_text (정규식 4개를 차례로 시도)."""
+    patterns = [
+        r'(\d{4}-\d{1,2}-\d{1,2})',
+        r'(\d{2}/\d{2}/\d{4})',
+        r'(\d{4}/\d{1,2}/\d{1,2})',
+        r'(\d{4}\.\d{1,2}\.\d{1,2})'
+    ]
+    for pat in patterns:
+        m = re.search(pat, text)
+        if m:
+            return m.group(1)
+    return None
+
+
+def extract_date_legacy(texts):
+    """비교용: 기존 test2.extract_date (문자열 × 정규식 4개 × strptime 형식 10개)."""
+    date_patterns = [
+        r'(19|20)\d{2}[년\-\/\.](0?[1-9]|1[0-2])[월\-\/\.](0?[1-9]|[12]\d|3[01])[일]?',
+        r'(0?[1-9]|1[0-2])[\-\/\.](0?[1-9]|[12]\d|3[01])[\-\/\.](19|20)\d{2}',
+        r'(0?[1-9]|[12]\d|3[01])[\-\/\.](0?[1-9]|1[0-2])[\-\/\.](19|20)\d{2}',
+        r'(19|20)\d{2}[년](0?[1-9]|1[0-2])[월](0?[1-9]|[12]\d|3[01])[일]?'
+    ]
+    for t in texts:
+        for pat in date_patterns:
+            m = re.search(pat, t)
+            if m:
+                raw = m.group(0)
+                candidates = [
+                    "%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d",
+                    "%m-%d-%Y", "%m/%d/%Y", "%m.%d.%Y",
+                    "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y",
+                    "%Y년%m월%d일"
+                ]
+                cleaned = raw.replace('년', '').replace('월', '').replace('일', '')
+                for fmt in candidates:
+                    try:
+                        return datetime.datetime.strptime(cleaned, fmt).date()
+                    except Exception:
+                        continue
+    return None
+
+
+D = datetime.date
+
+# (OCR 문자열, 스캐너 결과 = 기존 extract_exp_from_text, 날짜 결과)
+GOLDEN = [
+    # ISO / 점 / 슬래시
+    ("2024-12-31", "2024-12-31", D(2024, 12, 31)),
+    ("2024-1-5", "2024-1-5", D(2024, 1, 5)),
+    ("2024/12/25", "2024/12/25", D(2024, 12, 25)),
+    ("2024.07.19", "2024.07.19", D(2024, 7, 19)),
+    ("EXP 2025.03.09", "2025.03.09", D(2025, 3, 9)),
+    ("유통기한:2026-02-28까지", "2026-02-28", D(2026, 2, 28)),
+    ("2024-02-29", "2024-02-29", D(2024, 2, 29)),
+    ("2023-02-29", "2023-02-29", None),
+    ("2024-13-01", "2024-13-01", None),
+    ("2024-1/5", None, None),
+    # 한글 년월일
+    ("2024년12월31일", None, D(2024, 12, 31)),
+    ("2024년 12월 31일", None, D(2024, 12, 31)),
+    ("유통기한 2025년 3월 1일 까지", None, D(2025, 3, 1)),
+    ("2025년1월9", None, D(2025, 1, 9)),
+    # 미국식 (월/일/연도)
+    ("12/31/2024", "12/31/2024", D(2024, 12, 31)),
+    ("05/06/2024", "05/06/2024", D(2024, 5, 6)),
+    ("1-15-2025", None, D(2025, 1, 15)),
+    # 유럽식 (일/월/연도)
+    ("31/12/2024", "31/12/2024", D(2024, 12, 31)),
+    ("25.12.2024", None, D(2024, 12, 25)),
+    ("13-02-2025", None, D(2025, 2, 13)),
+    ("32/13/2024", "32/13/2024", None),
+    # 여러 날짜 / 형식 우선순위
+    ("제조 2024-01-02 유통 2025-01-02", "2024-01-02", D(2024, 1, 2)),
+    ("12/31/2024 제조 2025.01.02", "12/31/2024", D(2025, 1, 2)),
+    ("2025/06/01 2025-06-02", "2025-06-02", D(2025, 6, 1)),
+    ("2024-02-30 / 2024-03-01", "2024-02-30", D(2024, 3, 1)),
+    # OCR 잡음
+    ("LOT12024-01-02", "2024-01-02", D(2024, 1, 2)),
+    ("BB:2024-05-123", "2024-05-12", D(2024, 5, 12)),
+    ("1234-5-6", "1234-5-6", None),
+    ("112/12/2024", "12/12/2024", None),
+    ("가격 3,500원", None, None),
+    ("서울우유 1000ml 냉장보관 0~10℃", None, None),
+    ("", None, None),
+]
+
+
+def random_texts(n, rng):
+    """형식/구분자/자릿수/잡음을 섞은 무작위 OCR 문자열 (스캐너 결과 일치 확인용)."""
+    seps = np.array(list("-/.") + ["년"])
+    noise = ["", "EXP ", "유통기한 ", "LOT1", "제조 ", "BB:", "~", "까지", "7", " 12/"]
+    out = []
+    for _ in range(n):
+        parts = []
+        for _ in range(rng.integers(1, 4)):
+            y = str(rng.integers(1890, 2110))
+            m, d = (str(v).zfill(int(rng.integers(1, 3))) for v in rng.integers(0, 40, size=2))
+            s1, s2 = rng.choice(seps, size=2)
+            if rng.random() < 0.5:
+                s2 = s1
+            parts.append(rng.choice(noise) + (f"{y}{s1}{m}{s2}{d}" if rng.random() < 0.6 else f"{m}{s1}{d}{s2}{y}")
+                         + rng.choice(noise))
+        out.append(" ".join(parts))
+    return out
+
+
+def bench(fn, items, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(items) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유통기한 파서 비교 (기존 함수 vs date_parser)")
+    parser.add_argument("--texts", type=int, default=20_000, help="무작위 OCR 문자열 수")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    # 1) 골든 코퍼스
+    failures = 0
+    legacy_date_diff = []
+    for text, exp_str, exp_date in GOLDEN:
+        got_str, got_date = date_parser.find_exp(text), date_parser.parse(text)
+        if got_str != exp_str or got_date != exp_date or extract_exp_from_text_legacy(text) != exp_str:
+            failures += 1
+            print(f"❌ {text!r}: 스캐너 {got_str!r} (기대 {exp_str!r}), 날짜 {got_date} (기대 {exp_date})")
+        legacy = extract_date_legacy([text])
+        if legacy != exp_date:
+            legacy_date_diff.append((text, legacy, exp_date))
+    print(f"골든 코퍼스 {len(GOLDEN)}건: 실패 {failures}건")
+    if legacy_date_diff:
+        print(f"기존 extract_date가 기대값과 다른 {len(legacy_date_diff)}건 (새 파서에서 수정됨):")
+        for text, legacy, expected in legacy_date_diff:
+            print(f"  {text!r}: 기존 {legacy} → {expected}")
+
+    # 2) 무작위 문자열에서 스캐너 결과가 기존과 완전히 같은지 확인
+    rng = np.random.default_rng(args.seed)
+    texts = random_texts(args.texts, rng)
+    mismatches = [t for t in texts if date_parser.find_exp(t) != extract_exp_from_text_legacy(t)]
+    print(f"무작위 {len(texts)}건 스캐너 결과 불일치: {len(mismatches)}건")
+    for t in mismatches[:10]:
+        print(f"  {t!r}: 기존 {extract_exp_from_text_legacy(t)!r}, 새 {date_parser.find_exp(t)!r}")
+
+    # 3) 속도: 캐시 없는 1회 파싱, 그리고 OCR처럼 같은 문자열이 반복되는 배치
+    unique = list(dict.fromkeys(texts))
+    ocr_batch = [unique[i] for i in rng.integers(0, max(1, len(unique) // 20), size=len(texts))]
+    rows = [
+        ("extract_exp_from_text (기존)", bench(extract_exp_from_text_legacy, unique, args.repeat)),
+        ("find_exp (캐시 없음)", bench(date_parser.find_exp.__wrapped__, unique, args.repeat)),
+        ("extract_date (기존)", bench(lambda t: extract_date_legacy([t]), unique, args.repeat)),
+        ("parse (캐시 없음)", bench(date_parser.parse.__wrapped__, unique, args.repeat)),
+    ]
+    t0 = time.perf_counter()
+    for t in ocr_batch:
+        extract_date_legacy([t])
+    legacy_batch = (time.perf_counter() - t0) / len(ocr_batch) * 1e6
+    date_parser.parse.cache_clear()
+    t0 = time.perf_counter()
+    date_parser.parse_many(ocr_batch)
+    rows += [("extract_date 반복 문자열 (기존)", legacy_batch),
+             ("parse_many 반복 문자열 (캐시)", (time.perf_counter() - t0) / len(ocr_batch) * 1e6)]
+
+    print(f"\n{'방식':<34}{'문자열당':>12}")
+    for name, us in rows:
+        print(f"{name:<34}{us:>10.2f}µs")
+
+    if failures or mismatches:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
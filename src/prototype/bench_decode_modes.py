@@ -0,0 +1,58 @@
+import argparse
+
+import cv2
+import numpy as np
+from pyzbar import pyzbar
+
+from motion_decoder import FullFrameDecoder, MotionGatedDecoder
+
+
+def synthetic_frames(count, moving_ratio, seed=0, size=(480, 640)):
+    """냉장고 내부처럼 대부분 정지해 있고 가끔 상품이 움직이는 합성 영상."""
+    rng = np.random.default_rng(seed)
+    h, w = size
+    background = cv2.GaussianBlur(rng.integers(0, 255, size=(h, w, 3), dtype=np.uint8), (21, 21), 0)
+    item = np.full((120, 160, 3), 255, dtype=np.uint8)
+    item[20:100, 10:150:6] = 0  # 바코드처럼 보이는 세로 줄무늬
+    x, y = 100, 150
+    moving_frames = int(count * moving_ratio)
+    for i in range(count):
+        # 앞부분은 상품을 넣는 장면(움직임), 나머지는 정지 장면
+        if i < moving_frames:
+            x = (x + 7) % (w - 160)
+        frame = background.copy()
+        frame[y:y + 120, x:x + 160] = item
+        noise = rng.integers(-3, 4, size=frame.shape, dtype=np.int16)
+        yield np.clip(frame.astype(np.int16) + noise, 0, 255).astype(np.uint8)
+
+
+def video_frames(path):
+    cap = cv2.VideoCapture(path)
+    try:
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame
+    finally:
+        cap.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="full / motion 디코딩 모드의 CPU 사용량과 디코딩 횟수 비교")
+    parser.add_argument("--video", help="비교에 사용할 영상 파일 (없으면 합성 영상)")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--moving-ratio", type=float, default=0.2, help="합성 영상에서 움직이는 프레임 비율")
+    args = parser.parse_args()
+
+    for mode, decoder in (("full", FullFrameDecoder(pyzbar.decode)),
+                          ("motion", MotionGatedDecoder(pyzbar.decode))):
+        frames = video_frames(args.video) if args.video else synthetic_frames(args.frames, args.moving_ratio)
+        codes = set()
+        for frame in frames:
+            codes.update(r["data"] for r in decoder(frame))
+        print(decoder.stats.format(mode), f"| 인식된 바코드 {len(codes)}개")
+
+
+if __name__ == '__main__':
+    main()
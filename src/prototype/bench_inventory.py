@@ -0,0 +1,79 @@
+import argparse
+import datetime
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from inventory_store import InventoryStore
+
+
+def percentiles(samples):
+    arr = np.asarray(samples) * 1e6
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InventoryStore 쓰기 처리량 / 조회 지연 시간 벤치마크")
+    parser.add_argument("--items", type=int, default=300_000)
+    parser.add_argument("--codes", type=int, default=5_000, help="서로 다른 상품 코드 수")
+    parser.add_argument("--queries", type=int, default=2_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    today = datetime.date.today()
+    codes = [str(8800000000000 + c) for c in rng.integers(0, 10 ** 10, size=args.codes)]
+    code_ids = rng.integers(0, args.codes, size=args.items)
+    exp_offsets = rng.integers(-30, 500, size=args.items)
+    exps = [(today + datetime.timedelta(days=int(d))).isoformat() for d in exp_offsets]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "inventory.db")
+        store = InventoryStore(path)
+
+        # 쓰기: add()는 메모리 인덱스만 갱신하고 디스크 쓰기는 백그라운드에서 일괄 커밋
+        t0 = time.perf_counter()
+        for c, e in zip(code_ids, exps):
+            store.add(codes[c], "상품", e)
+        enqueue = time.perf_counter() - t0
+        store.flush()
+        total = time.perf_counter() - t0
+        print(f"입고 {args.items:,}건 | add() 평균 {enqueue / args.items * 1e6:.2f}us | "
+              f"디스크 반영까지 {total:.2f}s ({args.items / total:,.0f}건/s, 커밋 {store.commits}회)")
+
+        days = [today + datetime.timedelta(days=int(d)) for d in rng.integers(0, 30, size=args.queries)]
+        samples = []
+        for d in days:
+            t = time.perf_counter()
+            store.count_expiring_before(d)
+            samples.append(time.perf_counter() - t)
+        p50, p99 = percentiles(samples)
+        print(f"count_expiring_before   p50 {p50:8.2f}us  p99 {p99:8.2f}us")
+
+        samples = []
+        for d in days:
+            t = time.perf_counter()
+            store.expiring_before(d, limit=50)
+            samples.append(time.perf_counter() - t)
+        p50, p99 = percentiles(samples)
+        print(f"expiring_before(50개)   p50 {p50:8.2f}us  p99 {p99:8.2f}us")
+
+        samples = []
+        for c in rng.integers(0, args.codes, size=args.queries):
+            t = time.perf_counter()
+            store.count(codes[c])
+            samples.append(time.perf_counter() - t)
+        p50, p99 = percentiles(samples)
+        print(f"count(code)             p50 {p50:8.2f}us  p99 {p99:8.2f}us")
+        store.close()
+
+        # 재시작 시 디스크에서 현재 재고를 다시 읽는 시간
+        t0 = time.perf_counter()
+        reopened = InventoryStore(path)
+        print(f"재시작 로드 {len(reopened):,}건 {time.perf_counter() - t0:.2f}s")
+        reopened.close()
+
+
+if __name__ == '__main__':
+    main()
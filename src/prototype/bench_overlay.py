@@ -0,0 +1,66 @@
+import argparse
+import time
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+from text_overlay import find_korean_font, LabelRenderer, KOREAN_FONT_PATHS
+
+
+def put_text_korean_legacy(frame, text, pos, font_path, font_size, color):
+    """비교용: 기존 put_text_korean (매번 폰트 로드 + 프레임 전체 변환)."""
+    img_pil = Image.fromarray(frame)
+    draw = ImageDraw.Draw(img_pil)
+    font = ImageFont.truetype(font_path, font_size)
+    draw.text(pos, text, font=font, fill=color)
+    return np.array(img_pil)
+
+
+def make_labels(count, rng, size):
+    h, w = size
+    labels = []
+    for i in range(count):
+        text = f"상품{i % 50:02d} | 유통기한: 2026-0{1 + i % 9}-1{i % 10}"
+        pos = (int(rng.integers(0, w - 200)), int(rng.integers(0, h - 40)))
+        labels.append((text, pos))
+    return labels
+
+
+def bench(draw_fn, frame, labels, repeat):
+    samples = []
+    for _ in range(repeat):
+        f = frame.copy()
+        t0 = time.perf_counter()
+        for text, pos in labels:
+            f = draw_fn(f, text, pos)
+        samples.append(time.perf_counter() - t0)
+    return np.median(samples) * 1000.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="프레임당 라벨 오버레이 비용 비교 (기존 vs 스프라이트 캐시)")
+    parser.add_argument("--font", default=find_korean_font(), help=f"TrueType 폰트 (기본: {KOREAN_FONT_PATHS})")
+    parser.add_argument("--labels", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--font-size", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+    if args.font is None:
+        parser.error("한글 폰트를 찾을 수 없습니다. --font로 경로를 지정하세요.")
+
+    rng = np.random.default_rng(0)
+    size = (720, 1280)
+    frame = rng.integers(0, 255, size=(*size, 3), dtype=np.uint8)
+    color = (255, 255, 0)
+    renderer = LabelRenderer(args.font)
+
+    for count in args.labels:
+        labels = make_labels(count, rng, size)
+        legacy = bench(lambda f, t, p: put_text_korean_legacy(f, t, p, args.font, args.font_size, color),
+                       frame, labels, args.repeat)
+        cached = bench(lambda f, t, p: renderer.draw(f, t, p, args.font_size, color),
+                       frame, labels, args.repeat)
+        print(f"라벨 {count:>3}개 | 기존 {legacy:8.2f}ms/프레임 | 캐시 {cached:7.3f}ms/프레임 | {legacy / cached:6.1f}배")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+
+from product_index import ProductIndex, key_code, numeric_keys
+
+# 합성 상품명 (실제 카탈로그처럼 길이가 제각각인 한글 이름)
+NAME_POOL = ["농심 신라면", "서울우유", "바나나맛 우유", "비비고 왕교자", "햇반",
+             "코카콜라", "삼다수", "초코파이", "청정원 순창고추장", "깨끗한나라 휴지"]
+
+
+def synthetic_index(n, rng):
+    """n개의 880 바코드를 가진 ProductIndex를 벡터 연산만으로 만듭니다."""
+    codes = np.unique(8800000000000 + rng.integers(0, 10 ** 10, size=n, dtype=np.int64))
+    while len(codes) < n:
+        extra = 8800000000000 + rng.integers(0, 10 ** 10, size=n - len(codes), dtype=np.int64)
+        codes = np.unique(np.concatenate([codes, extra]))
+    codes = numeric_keys(codes, 13)
+
+    # 상품명: 이름 풀에서 고른 바이트열을 오프셋 기반으로 한 번에 이어 붙임
+    pool = [name.encode("utf-8") for name in NAME_POOL]
+    pool_blob = np.frombuffer(b"".join(pool), dtype=np.uint8)
+    pool_len = np.array([len(p) for p in pool], dtype=np.int64)
+    pool_start = np.concatenate([[0], np.cumsum(pool_len)[:-1]])
+    ids = rng.integers(0, len(pool), size=n)
+    lengths = pool_len[ids]
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    pos = np.repeat(pool_start[ids] - offsets[:-1], lengths) + np.arange(offsets[-1])
+    blob = pool_blob[pos]
+
+    exp_days = rng.integers(20000, 21000, size=n).astype(np.int32)
+    return ProductIndex(codes, blob, offsets, exp_days)
+
+
+def query_codes(index, count, miss_ratio, rng):
+    """존재하는 바코드와 존재하지 않는 바코드를 섞은 조회용 문자열 목록."""
+    hits = [key_code(k) for k in index.codes[rng.integers(0, len(index), size=count)]]
+    misses = 8800000000000 + rng.integers(0, 10 ** 10, size=count, dtype=np.int64)
+    use_miss = rng.random(count) < miss_ratio
+    return [str(m) if miss else h for h, m, miss in zip(hits, misses.tolist(), use_miss.tolist())]
+
+
+def percentiles(samples_ns):
+    arr = np.asarray(samples_ns, dtype=np.float64) / 1000.0
+    return np.percentile(arr, 50), np.percentile(arr, 99)
+
+
+def time_each(fn, items):
+    samples = []
+    for item in items:
+        t0 = time.perf_counter_ns()
+        fn(item)
+        samples.append(time.perf_counter_ns() - t0)
+    return samples
+
+
+def bench_size(n, args, rng):
+    t0 = time.perf_counter()
+    index = synthetic_index(n, rng)
+    build = time.perf_counter() - t0
+    codes = query_codes(index, args.queries, args.miss_ratio, rng)
+
+    # 단건 조회
+    p50, p99 = percentiles(time_each(index.lookup, codes))
+    print(f"{n:>10,} rows | build {build:6.2f}s | lookup      p50 {p50:8.2f}us  p99 {p99:8.2f}us")
+
+    # 배치 조회 (항목당 지연 시간으로 환산)
+    batches = [codes[i:i + args.batch] for i in range(0, len(codes), args.batch)]
+    samples = [s / args.batch for s in time_each(index.lookup_many, batches)]
+    p50, p99 = percentiles(samples)
+    print(f"{'':>10} rows | {'':13} | lookup_many p50 {p50:8.2f}us  p99 {p99:8.2f}us  (batch {args.batch}, per item)")
+
+    # 기존 방식: DataFrame 전체 비교
+    if n <= args.pandas_max:
+        names = [index.name_at(i) for i in range(n)]
+        db = pd.DataFrame({"code": [key_code(k) for k in index.codes], "name": names,
+                           "exp": [index.exp_at(i) for i in range(n)]})
+        sample = codes[:args.pandas_queries]
+
+        def query_product(code):
+            row = db.loc[db["code"] == str(code)]
+            if not row.empty:
+                return {"code": code, "name": str(row.iloc[0]["name"]), "exp": str(row.iloc[0]["exp"])}
+            return None
+
+        p50, p99 = percentiles(time_each(query_product, sample))
+        print(f"{'':>10} rows | {'':13} | pandas scan p50 {p50:8.2f}us  p99 {p99:8.2f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ProductIndex 조회 지연 시간 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 1_000_000, 10_000_000])
+    parser.add_argument("--queries", type=int, default=20_000)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--miss-ratio", type=float, default=0.1)
+    parser.add_argument("--pandas-max", type=int, default=1_000_000,
+                        help="이 크기 이하에서만 기존 pandas 조회와 비교")
+    parser.add_argument("--pandas-queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for n in args.sizes:
+        bench_size(n, args, rng)
+
+
+if __name__ == '__main__':
+    main()
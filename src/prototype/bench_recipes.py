@@ -0,0 +1,136 @@
+import argparse
+import datetime
+import heapq
+import sys
+import time
+
+import numpy as np
+
+from inventory_store import to_day
+from recipe_recommender import (BASIC_RECIPES, INGREDIENTS, COVERAGE_WEIGHT, RecipeRecommender, ingredient_of,
+                                synthetic_recipes, urgency)
+
+
+def naive_top(recipes, items, today, k, max_missing=None):
+    """비교용: 쿼리마다 모든 레시피의 모든 재료를 모든 재고 품목과 맞춰 보는 방식."""
+    scored = []
+    for r, (name, ings) in enumerate(recipes):
+        ings = set(ings)
+        present, soonest = set(), {}
+        for item in items:
+            ing = ingredient_of(item["name"])
+            day = to_day(item["exp"])
+            if ing in ings and (day is None or day >= today):
+                present.add(ing)
+                if day is not None:
+                    soonest[ing] = min(soonest.get(ing, day), day)
+        matched = len(present)
+        if not matched or (max_missing is not None and len(ings) - matched > max_missing):
+            continue
+        score = matched * (COVERAGE_WEIGHT / len(ings)) + sum(urgency(d - today) for d in soonest.values())
+        scored.append((-round(score, 9), r, name))
+    return [(name, -neg) for neg, _, name in heapq.nsmallest(k, scored)]
+
+
+def percentiles(values):
+    values = np.array(values) * 1000
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="레시피 추천 색인: 구축/증분 갱신/top-k 시간과 단순 방식 비교")
+    parser.add_argument("--recipes", type=int, default=100_000, help="합성 레시피 수")
+    parser.add_argument("--items", type=int, default=40, help="처음 재고 품목 수")
+    parser.add_argument("--events", type=int, default=2000, help="입고/출고 이벤트 수")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    today = datetime.date.today()
+
+    t0 = time.perf_counter()
+    recipes = BASIC_RECIPES + synthetic_recipes(args.recipes, args.seed)
+    t_gen = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    rec = RecipeRecommender(recipes)
+    t_build = time.perf_counter() - t0
+
+    next_id = 0
+
+    def random_item():
+        nonlocal next_id
+        next_id += 1
+        ing = INGREDIENTS[rng.integers(len(INGREDIENTS))]
+        exp = None if rng.random() < 0.1 else (today + datetime.timedelta(days=int(rng.integers(0, 15)))).isoformat()
+        return {"id": next_id, "code": str(8_800_000_000_000 + next_id), "name": f"국산 {ing}", "exp": exp}
+
+    items = {}
+    for _ in range(args.items):
+        item = random_item()
+        items[item["id"]] = item
+    t0 = time.perf_counter()
+    rec.track_many(items.values())
+    t_track = time.perf_counter() - t0
+
+    # 입고/출고 이벤트마다 증분 갱신 시간, 그리고 같은 상황에서 전체 다시 계산하는 시간
+    incremental, rebuild = [], []
+    for _ in range(args.events):
+        if items and rng.random() < 0.5:
+            item = items.pop(list(items)[rng.integers(len(items))])
+            t0 = time.perf_counter()
+            rec.on_inventory_event("remove", item)
+        else:
+            item = random_item()
+            items[item["id"]] = item
+            t0 = time.perf_counter()
+            rec.on_inventory_event("add", item)
+        incremental.append(time.perf_counter() - t0)
+    incremental_score = rec.score.copy()
+    for _ in range(20):
+        t0 = time.perf_counter()
+        with rec.lock:
+            rec._rebuild()
+        rebuild.append(time.perf_counter() - t0)
+    drift = float(np.abs(incremental_score - rec.score).max())
+
+    queries = {}
+    for max_missing in (None, 1, 0):
+        lat = []
+        for _ in range(args.queries):
+            t0 = time.perf_counter()
+            rec.top(args.top, max_missing)
+            lat.append(time.perf_counter() - t0)
+        queries[max_missing] = lat
+
+    # 단순 방식과 결과 비교 (느리므로 몇 번만)
+    failures = 0
+    naive_times = []
+    today_day = to_day(today)
+    for max_missing in (None, 1, 0):
+        t0 = time.perf_counter()
+        expected = naive_top(recipes, list(items.values()), today_day, args.top, max_missing)
+        naive_times.append(time.perf_counter() - t0)
+        got = [(r["name"], r["score"]) for r in rec.top(args.top, max_missing)]
+        if [n for n, _ in got] != [n for n, _ in expected] or \
+                any(abs(a - b) > 1e-3 for (_, a), (_, b) in zip(got, expected)):
+            failures += 1
+            print(f"❌ max_missing={max_missing}: 기대 {expected[:3]}, 결과 {got[:3]}")
+
+    print(f"레시피 {len(rec):,}개, 재료 {len(rec.ingredients)}종, 재고 {len(items)}개, 이벤트 {args.events}건")
+    print(f"합성 레시피 생성 {t_gen * 1000:.0f}ms, 색인 구축 {t_build * 1000:.0f}ms, 재고 일괄 등록 {t_track * 1000:.2f}ms")
+    p50, p99 = percentiles(incremental)
+    print(f"입고/출고 증분 갱신: p50 {p50:.3f}ms, p99 {p99:.3f}ms (전체 다시 계산 {np.median(rebuild) * 1000:.2f}ms, "
+          f"누적 오차 {drift:.1e})")
+    for max_missing, lat in queries.items():
+        p50, p99 = percentiles(lat)
+        label = "제한 없음" if max_missing is None else f"부족 {max_missing}개 이하"
+        print(f"top-{args.top} ({label}): p50 {p50:.3f}ms, p99 {p99:.3f}ms")
+    print(f"단순 방식 (모든 레시피 × 모든 품목) 쿼리당 {np.mean(naive_times) * 1000:.0f}ms, 결과 불일치 {failures}건")
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from live_product_db import LiveProductIndex
+from product_index import ProductIndex, key_code
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class LookupProbe:
+    """백그라운드에서 계속 조회하며 (시각, 지연 시간)을 기록합니다 (캡처 루프 흉내)."""
+
+    def __init__(self, index, codes):
+        self.index = index
+        self.codes = codes
+        self.samples = []
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        i = 0
+        while not self.stop_event.is_set():
+            code = self.codes[i % len(self.codes)]
+            t0 = time.perf_counter()
+            self.index.lookup(code)
+            self.samples.append((t0, time.perf_counter() - t0))
+            i += 1
+            if i % 64 == 0:
+                time.sleep(0)  # 갱신 스레드에 GIL 양보
+
+    def window(self, start, end):
+        lat = np.array([s for t, s in self.samples if start <= t <= end]) * 1e6
+        if not len(lat):
+            return 0, 0.0, 0.0
+        return len(lat), float(np.percentile(lat, 50)), float(np.percentile(lat, 99))
+
+
+def wait_until(predicate, timeout=120.0):
+    t0 = time.perf_counter()
+    while not predicate():
+        if time.perf_counter() - t0 > timeout:
+            raise TimeoutError("갱신이 반영되지 않았습니다.")
+        time.sleep(0.001)
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="상품 DB 실시간 갱신 지연 시간과 갱신 중 조회 지연 시간 측정")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--append", type=int, default=1000, help="CSV 끝에 추가할 행 수")
+    parser.add_argument("--delta", type=int, default=1000, help="델타 파일의 add/change/remove 행 수 (각각)")
+    parser.add_argument("--interval", type=float, default=0.05, help="감시 주기 (초)")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="reload_bench_")
+    csv_path = os.path.join(tmp, "product_db.csv")
+    delta_dir = os.path.join(tmp, "deltas")
+    os.makedirs(delta_dir)
+    subprocess.run([sys.executable, os.path.join(HERE, "create_db.py"), "--rows", str(args.rows), "--snapshot",
+                    "--out", csv_path, "--seed", "0"], check=True, stdout=subprocess.DEVNULL)
+
+    base, _ = ProductIndex.load_or_build(csv_path)
+    live = LiveProductIndex(base, csv_path=csv_path, delta_dir=delta_dir, interval=args.interval).start()
+    rng = np.random.default_rng(0)
+    existing = [key_code(k) for k in base.codes[rng.integers(0, len(base), size=4096)]]
+    probe = LookupProbe(live, existing)
+    probe.thread.start()
+    time.sleep(0.5)
+
+    rows = []
+    t_idle = time.perf_counter()
+    time.sleep(0.5)
+    rows.append(("유휴", None, None, t_idle, time.perf_counter()))
+
+    # 1) CSV 끝에 행 추가 → 추가된 부분만 읽음
+    new_codes = [str(8_899_000_000_000 + i) for i in range(args.append)]
+    t0 = time.perf_counter()
+    with open(csv_path, "a", encoding="utf-8") as f:
+        f.writelines(f"{c},추가상품 {i},2027-01-01\n" for i, c in enumerate(new_codes))
+    visible = wait_until(lambda: live.lookup(new_codes[-1]) is not None)
+    rows.append((f"CSV 끝에 {args.append}행 추가", visible, live.reloads[-1][2], t0, time.perf_counter()))
+
+    # 2) 델타 파일 (add/change/remove)
+    change = existing[:args.delta]
+    remove = existing[-args.delta:]
+    add = [str(8_898_000_000_000 + i) for i in range(args.delta)]
+    t0 = time.perf_counter()
+    tmp_delta = os.path.join(delta_dir, "0001.tmp")
+    with open(tmp_delta, "w", encoding="utf-8") as f:
+        f.write("op,code,name,exp\n")
+        f.writelines(f"add,{c},델타상품,2027-02-02\n" for c in add)
+        f.writelines(f"change,{c},변경상품,2027-03-03\n" for c in change)
+        f.writelines(f"remove,{c},,\n" for c in remove)
+    os.replace(tmp_delta, os.path.join(delta_dir, "0001.csv"))
+    visible = wait_until(lambda: live.lookup(remove[-1]) is None)
+    rows.append((f"델타 {3 * args.delta}행", visible, live.reloads[-1][2], t0, time.perf_counter()))
+
+    # 3) overlay를 기본 인덱스에 합치기
+    t0 = time.perf_counter()
+    live.compact()
+    compact = time.perf_counter() - t0
+    rows.append(("overlay 합치기", None, compact, t0, time.perf_counter()))
+
+    # 4) CSV 전체 수정 (수정 시각만 바꿔도 전체 다시 읽기 경로)
+    n_reloads = len(live.reloads)
+    t0 = time.perf_counter()
+    os.utime(csv_path)
+    visible = wait_until(lambda: len(live.reloads) > n_reloads)
+    rows.append(("CSV 전체 다시 읽기", visible, live.reloads[-1][2], t0, time.perf_counter()))
+
+    probe.stop_event.set()
+    probe.thread.join()
+    live.stop()
+    shutil.rmtree(tmp, ignore_errors=True)
+
+    assert live.lookup(new_codes[0]) is not None and live.lookup(add[0])["name"] == "델타상품"
+    assert live.lookup(change[0])["exp"] == "2027-03-03" and live.lookup(remove[0]) is None
+
+    print(f"상품 {args.rows:,}개, 감시 주기 {args.interval * 1000:.0f}ms")
+    print(f"{'상황':<22}{'반영까지':>11}{'적용 시간':>11}{'조회 수':>10}{'조회 p50':>11}{'조회 p99':>11}")
+    for name, visible, apply_s, start, end in rows:
+        n, p50, p99 = probe.window(start, end)
+        vis = f"{visible * 1000:.1f}ms" if visible is not None else "-"
+        app = f"{apply_s * 1000:.1f}ms" if apply_s is not None else "-"
+        print(f"{name:<22}{vis:>11}{app:>11}{n:>10}{p50:>9.1f}µs{p99:>9.1f}µs")
+
+
+if __name__ == '__main__':
+    main()
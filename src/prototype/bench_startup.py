@@ -0,0 +1,47 @@
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+
+from product_index import default_snapshot_dir
+
+# 새 파이썬 프로세스에서 측정해야 import 캐시 없이 실제 콜드 스타트와 같은 조건이 됨
+PROBE = r"""
+import time
+t0 = time.perf_counter()
+import barcode_food_manager
+t_import = time.perf_counter()
+from product_index import ProductIndex
+index, rebuilt = ProductIndex.load_or_build({csv!r})
+t_index = time.perf_counter()
+index.lookup("8800000000000")
+t_lookup = time.perf_counter()
+print(f"{{(t_import - t0) * 1000:.1f}} {{(t_index - t_import) * 1000:.1f}} {{(t_lookup - t0) * 1000:.1f}} {{int(rebuilt)}}")
+"""
+
+
+def run_probe(csv):
+    out = subprocess.run([sys.executable, "-c", PROBE.format(csv=csv)], capture_output=True, text=True,
+                         check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    imp, idx, first, rebuilt = out.stdout.split()
+    return float(imp), float(idx), float(first), rebuilt == "1"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="스캐너 콜드 스타트: 모듈 import / 상품 DB 로드 / 첫 조회까지 시간")
+    parser.add_argument("--db", default="product_db.csv")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    csv = os.path.abspath(args.db)
+
+    # 스냅샷을 지워 CSV 파싱 경로를 한 번 측정한 뒤, 이후 실행은 스냅샷 경로를 측정
+    shutil.rmtree(default_snapshot_dir(csv), ignore_errors=True)
+    for run in range(args.runs + 1):
+        imp, idx, first, rebuilt = run_probe(csv)
+        label = "CSV 파싱 + 스냅샷 생성" if rebuilt else "스냅샷 메모리 매핑"
+        print(f"{label:<22} | import {imp:7.1f}ms | DB 로드 {idx:8.1f}ms | 시작 → 첫 조회 {first:8.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
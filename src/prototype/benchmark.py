@@ -0,0 +1,225 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+
+import cv2
+import numpy as np
+import pandas as pd
+
+import barcode_food_manager as bfm
+from ean13 import check_digits, render
+from product_index import ProductIndex
+from text_overlay import find_korean_font
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "test"))
+import test2
+
+# 카메라/네트워크 없이 전체 스캔 경로의 단계별 시간을 재는 벤치마크.
+# 결과는 JSON으로 저장되며 --compare로 이전 결과와 비교해 회귀를 찾습니다.
+
+
+def random_codes(n, rng):
+    """체크 숫자가 맞는 880 바코드 n개 (중복 없음)."""
+    body = np.unique(880 * 10 ** 9 + rng.integers(0, 10 ** 9, size=n))
+    while len(body) < n:
+        body = np.unique(np.concatenate([body, 880 * 10 ** 9 + rng.integers(0, 10 ** 9, size=n - len(body))]))
+    rng.shuffle(body)
+    return [str(c) for c in body * 10 + check_digits(body)]
+
+
+def synthetic_db(codes, rng):
+    today = datetime.date.today()
+    exps = [(today + datetime.timedelta(days=int(d))).isoformat() for d in rng.integers(-10, 500, size=len(codes))]
+    names = [f"합성상품 {i}" for i in range(len(codes))]
+    return pd.DataFrame({"code": codes, "name": names, "exp": exps})
+
+
+def paste(frame, label, center, angle):
+    """label을 angle도 회전해 frame의 center에 붙입니다."""
+    h, w = label.shape[:2]
+    m = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    cos, sin = abs(m[0, 0]), abs(m[0, 1])
+    nw, nh = int(h * sin + w * cos), int(h * cos + w * sin)
+    m[0, 2] += nw / 2 - w / 2
+    m[1, 2] += nh / 2 - h / 2
+    rotated = cv2.warpAffine(label, m, (nw, nh), borderValue=255)
+    mask = cv2.warpAffine(np.full((h, w), 255, np.uint8), m, (nw, nh)) > 127
+
+    x0, y0 = int(center[0] - nw / 2), int(center[1] - nh / 2)
+    H, W = frame.shape[:2]
+    fx0, fy0, fx1, fy1 = max(x0, 0), max(y0, 0), min(x0 + nw, W), min(y0 + nh, H)
+    if fx1 <= fx0 or fy1 <= fy0:
+        return
+    sub = (slice(fy0 - y0, fy1 - y0), slice(fx0 - x0, fx1 - x0))
+    roi = frame[fy0:fy1, fx0:fx1]
+    roi[mask[sub]] = rotated[sub][mask[sub]][:, None]
+
+
+def synthetic_frame(codes, rng, size, noise, blur, max_angle, module_px):
+    """바코드 여러 개가 회전/블러/노이즈와 함께 찍힌 BGR 프레임."""
+    h, w = size
+    bg = rng.integers(40, 200, size=(h // 8, w // 8, 3), dtype=np.uint8)
+    frame = cv2.resize(bg, (w, h), interpolation=cv2.INTER_LINEAR)
+    cols = max(1, len(codes))
+    for i, code in enumerate(codes):
+        label = render(code, module_px=module_px, height=30 * module_px)
+        cx = (i + 0.5) * w / cols + rng.uniform(-0.05, 0.05) * w
+        cy = h / 2 + rng.uniform(-0.2, 0.2) * h
+        paste(frame, label, (cx, cy), rng.uniform(-max_angle, max_angle))
+    if blur > 1:
+        frame = cv2.GaussianBlur(frame, (blur | 1, blur | 1), 0)
+    if noise > 0:
+        frame = np.clip(frame + rng.normal(0, noise, frame.shape), 0, 255).astype(np.uint8)
+    return frame
+
+
+def timed(fn, inputs, repeat=1):
+    samples = []
+    for _ in range(repeat):
+        for item in inputs:
+            t0 = time.perf_counter()
+            fn(item)
+            samples.append(time.perf_counter() - t0)
+    return samples
+
+
+def summarize(samples):
+    ms = np.asarray(samples) * 1000.0
+    return {"n": len(ms), "mean_ms": float(ms.mean()), "p50_ms": float(np.percentile(ms, 50)),
+            "p99_ms": float(np.percentile(ms, 99))}
+
+
+def compare(results, baseline, tolerance):
+    """baseline 대비 p50이 tolerance 비율 이상 느려진 단계 목록을 반환합니다."""
+    regressions = []
+    print(f"\n{'단계':<28}{'기준 p50':>12}{'현재 p50':>12}{'변화':>9}")
+    for stage, cur in results["stages"].items():
+        old = baseline.get("stages", {}).get(stage)
+        if old is None:
+            continue
+        ratio = cur["p50_ms"] / max(old["p50_ms"], 1e-9)
+        flag = "  ⚠️" if ratio > 1 + tolerance else ""
+        print(f"{stage:<28}{old['p50_ms']:>10.3f}ms{cur['p50_ms']:>10.3f}ms{(ratio - 1) * 100:>+8.1f}%{flag}")
+        if flag:
+            regressions.append(stage)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="합성 프레임 기반 스캔 경로 벤치마크 (카메라 불필요)")
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--codes-per-frame", type=int, default=3)
+    parser.add_argument("--db-size", type=int, default=100_000)
+    parser.add_argument("--resolution", default="1280x720")
+    parser.add_argument("--noise", type=float, default=6.0, help="가우시안 노이즈 표준편차")
+    parser.add_argument("--blur", type=int, default=3, help="가우시안 블러 커널 크기 (0이면 없음)")
+    parser.add_argument("--max-angle", type=float, default=10.0, help="바코드 최대 회전 각도")
+    parser.add_argument("--module-px", type=int, default=3, help="바코드 모듈 1개의 픽셀 폭")
+    parser.add_argument("--pandas-queries", type=int, default=200, help="pandas 조회는 느리므로 이 횟수만 측정")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="결과 JSON 파일")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 파일")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="p50이 이 비율 이상 느려지면 회귀로 판단")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    w, h = (int(v) for v in args.resolution.lower().split("x"))
+
+    codes = random_codes(args.db_size, rng)
+    db = synthetic_db(codes, rng)
+    index = ProductIndex.from_dataframe(db)
+    frame_codes = [[codes[i] for i in rng.integers(0, len(codes), size=args.codes_per_frame)]
+                   for _ in range(args.frames)]
+    frames = [synthetic_frame(fc, rng, (h, w), args.noise, args.blur, args.max_angle, args.module_px)
+              for fc in frame_codes]
+    lookups = [c for fc in frame_codes for c in fc]
+    font_path = find_korean_font()
+
+    stages = {}
+
+    # 1) 바코드 디코딩 + 인식률
+    decoded = []
+    stages["decode_barcode"] = timed(lambda f: decoded.append(bfm.decode_barcode(f)), frames)
+    found = sum(len({b["data"] for b in d} & set(fc)) for d, fc in zip(decoded, frame_codes))
+    recall = found / max(1, sum(len(set(fc)) for fc in frame_codes))
+
+    # 2) 상품 조회: 기존 pandas 비교 vs ProductIndex
+    stages["query_product_pandas"] = timed(lambda c: bfm.query_product(db, c), lookups[:args.pandas_queries])
+    stages["product_index_lookup"] = timed(index.lookup, lookups)
+
+    # 3) 한글 오버레이 (폰트가 있을 때만)
+    def overlay(frame_and_codes):
+        frame, fc = frame_and_codes
+        for i, c in enumerate(fc):
+            info = index.lookup(c)
+            bfm.put_text_korean(frame, f"{info['name']} | 유통기한: {info['exp']}", (20, 40 * i + 10),
+                                font_path, 30, (255, 255, 0))
+
+    if font_path:
+        stages["put_text_korean"] = timed(overlay, [(f.copy(), fc) for f, fc in zip(frames, frame_codes)])
+
+    # 4) 유통기한 문자열 파싱
+    texts = [f"EXP {c[-4:]} 제조 {d}" for c, d in zip(lookups, db["exp"].sample(len(lookups), replace=True,
+                                                                                   random_state=args.seed))]
+    stages["extract_exp_from_text"] = timed(bfm.extract_exp_from_text, texts)
+
+    # 5) OCR 전처리 (test2.preprocess)
+    stages["test2_preprocess"] = timed(test2.preprocess, frames[:max(1, args.frames // 4)])
+
+    # 6) 전체: 디코딩 → 조회 → 사각형/라벨 그리기
+    def end_to_end(frame):
+        frame = frame.copy()
+        for b in bfm.decode_barcode(frame):
+            info = index.lookup(b["data"]) or {"name": "미등록 상품", "exp": "N/A"}
+            x, y, bw, bh = b["rect"]
+            cv2.rectangle(frame, (x, y), (x + bw, y + bh), (0, 255, 0), 2)
+            if font_path:
+                bfm.put_text_korean(frame, f"{info['name']} | 유통기한: {info['exp']}", (x, y - 40),
+                                    font_path, 30, (255, 255, 0))
+
+    stages["end_to_end"] = timed(end_to_end, frames)
+
+    results = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "machine": platform.machine(),
+            "frames": args.frames,
+            "codes_per_frame": args.codes_per_frame,
+            "db_size": args.db_size,
+            "resolution": args.resolution,
+            "noise": args.noise,
+            "blur": args.blur,
+            "max_angle": args.max_angle,
+            "font": font_path,
+        },
+        "decode_recall": recall,
+        "stages": {name: summarize(samples) for name, samples in stages.items()},
+    }
+
+    print(f"{'단계':<28}{'n':>6}{'p50':>12}{'p99':>12}")
+    for name, s in results["stages"].items():
+        print(f"{name:<28}{s['n']:>6}{s['p50_ms']:>10.3f}ms{s['p99_ms']:>10.3f}ms")
+    print(f"디코딩 인식률 {recall * 100:.1f}%")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n회귀 발견: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
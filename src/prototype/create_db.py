@@ -1,6 +1,11 @@
-import pandas as pd
-import random
-from datetime import datetime, timedelta
+import argparse
+import datetime
+import time
+
+import numpy as np
+
+from ean13 import check_digits
+from product_index import EPOCH_ORDINAL, SnapshotWriter, default_snapshot_dir, numeric_keys
 
 # 50개의 샘플 상품명 리스트 (원하는 상품으로 자유롭게 변경 가능)
 product_names = [
@@ -16,41 +21,144 @@ product_names = [
     "페리오 치약", "리스테린", "도브 비누", "질레트 면도기", "깨끗한나라 휴지"
 ]
 
-# 이미 사용된 바코드를 추적하기 위한 집합(set)
-used_codes = set()
-
-def generate_unique_barcode():
-    """대한민국 국가코드(880)로 시작하는 13자리 유니크 바코드를 생성합니다."""
-    while True:
-        # 880 + 랜덤 10자리 숫자
-        code = "880" + str(random.randint(1000000000, 9999999999))
-        if code not in used_codes:
-            used_codes.add(code)
-            return code
-
-def generate_random_exp_date():
-    """오늘 날짜로부터 30일에서 500일 사이의 유통기한을 YYYY-MM-DD 형식으로 생성합니다."""
-    days_to_add = random.randint(30, 500)
-    future_date = datetime.now() + timedelta(days=days_to_add)
-    return future_date.strftime('%Y-%m-%d')
-
-# 데이터를 저장할 리스트
-data = []
-
-# 상품명 리스트를 기반으로 데이터 생성
-for name in product_names:
-    product_data = {
-        "code": generate_unique_barcode(),
-        "name": name,
-        "exp": generate_random_exp_date()
-    }
-    data.append(product_data)
-
-# 리스트를 Pandas DataFrame으로 변환
-df = pd.DataFrame(data)
-
-# CSV 파일로 저장
-output_filename = "product_db.csv"
-df.to_csv(output_filename, index=False, encoding='utf-8-sig')
-
-print(f"✅ 총 {len(df)}개의 샘플 데이터가 포함된 '{output_filename}' 파일이 성공적으로 생성되었습니다.")
\ No newline at end of file
+# 대용량 카탈로그에서는 샘플 상품명에 규격을 붙여 이름을 다양하게 만듦
+VARIANTS = ["", " 소용량", " 대용량", " 2입", " 4입", " 6입", " 묶음", " 기획팩"]
+
+# 대한민국 국가코드(880) + 9자리 상품 번호 + 체크 숫자 = 13자리 EAN-13
+CODE_PREFIX = 880 * 10 ** 9
+CODE_SPACE = 10 ** 9
+
+EXP_MIN_DAYS, EXP_MAX_DAYS = 30, 500  # 오늘로부터 30일에서 500일 사이의 유통기한
+
+
+def name_vocab(rows):
+    """rows가 샘플 수 이하이면 샘플 상품명을 그대로, 더 많으면 규격을 붙인 이름까지 사용합니다."""
+    if rows <= len(product_names):
+        return list(product_names)
+    return [name + variant for variant in VARIANTS for name in product_names]
+
+
+def split_counts(rows, chunk_size, rng):
+    """바코드 공간을 구간으로 나누고 각 구간에서 뽑을 개수를 정합니다 (합계는 정확히 rows).
+    구간을 순서대로 처리하면 바코드가 전체적으로 오름차순이 되어 스냅샷을 바로 쓸 수 있습니다."""
+    blocks = max(1, -(-rows // chunk_size))
+    bounds = np.linspace(0, CODE_SPACE, blocks + 1).astype(np.int64)
+    sizes = np.diff(bounds)
+    counts = np.minimum(rng.multinomial(rows, sizes / CODE_SPACE), sizes)
+    # 구간 크기를 넘친 개수는 남은 자리에 다시 나눔 (카탈로그가 코드 공간 대부분을 채울 때만 발생)
+    while (deficit := rows - int(counts.sum())) > 0:
+        room = sizes - counts
+        counts = np.minimum(counts + rng.multinomial(deficit, room / room.sum()), sizes)
+    return bounds[:-1], sizes, counts
+
+
+def sorted_unique(values):
+    # np.unique보다 정렬 + 인접 비교가 훨씬 빠름 (정수 배열 전용)
+    values.sort()
+    return values[np.concatenate(([True], values[1:] != values[:-1]))]
+
+
+def sample_block(rng, size, k):
+    """[0, size)에서 중복 없는 k개를 뽑아 정렬해 반환합니다 (Python set 없이 정렬로 중복 제거)."""
+    values = sorted_unique(rng.integers(0, size, size=k + k // 8 + 16))
+    while len(values) < k:
+        extra = rng.integers(0, size, size=k - len(values) + k // 8 + 16)
+        values = sorted_unique(np.concatenate([values, extra]))
+    if len(values) > k:
+        values = values[np.sort(rng.choice(len(values), k, replace=False))]
+    return values
+
+
+def generate_chunks(rows, chunk_size, seed):
+    """(codes, name_ids, exp_days) 청크를 바코드 오름차순으로 하나씩 만듭니다."""
+    rng = np.random.default_rng(seed)
+    today = datetime.date.today().toordinal() - EPOCH_ORDINAL
+    vocab_size = len(name_vocab(rows))
+    if rows <= len(product_names):
+        sample_ids = rng.permutation(len(product_names))[:rows]
+    pos = 0
+    for start, size, k in zip(*split_counts(rows, chunk_size, rng)):
+        if k == 0:
+            continue
+        body = CODE_PREFIX + start + sample_block(rng, size, int(k))
+        codes = body * 10 + check_digits(body)
+        if rows <= len(product_names):
+            # 청크마다 이어지는 구간을 잘라 써야 이름이 겹치지 않고 길이도 청크와 같음
+            name_ids = sample_ids[pos:pos + len(codes)]
+            pos += len(codes)
+        else:
+            name_ids = rng.integers(0, vocab_size, size=len(codes))
+        exp_days = (today + rng.integers(EXP_MIN_DAYS, EXP_MAX_DAYS + 1, size=len(codes))).astype(np.int32)
+        yield codes, name_ids, exp_days
+
+
+def csv_field(text):
+    if any(ch in text for ch in ',"\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+POW10 = 10 ** np.arange(12, -1, -1, dtype=np.int64)
+
+
+def csv_lines(codes, names, exp_days):
+    """한 청크를 CSV 바이트열로 만듭니다. names는 CSV용으로 인코딩된 바이트열 배열입니다."""
+    # 13자리 바코드는 자릿수를 한 번에 뽑아 ASCII 바이트로, 날짜는 범위가 좁으니 표에서 찾아 씀
+    code_col = ((codes[:, None] // POW10) % 10 + ord("0")).astype(np.uint8).view("S13").ravel()
+    first = int(exp_days.min())
+    table = np.datetime_as_string(np.arange(first, int(exp_days.max()) + 1).astype("datetime64[D]"), unit="D")
+    exp_col = table.astype("S10")[exp_days - first]
+    return b"".join(b"%s,%s,%s\n" % row for row in zip(code_col.tolist(), names.tolist(), exp_col.tolist()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="검증된 EAN-13 바코드를 가진 상품 데이터베이스 생성")
+    parser.add_argument("--rows", type=int, default=len(product_names), help="생성할 상품 수")
+    parser.add_argument("--out", default="product_db.csv", help="CSV 파일 경로 (--no-csv면 스냅샷 기준 경로로만 사용)")
+    parser.add_argument("--no-csv", action="store_true", help="CSV를 쓰지 않고 스냅샷만 생성")
+    parser.add_argument("--snapshot", action="store_true",
+                        help="스캐너가 바로 메모리 매핑할 수 있는 ProductIndex 스냅샷(.idx)도 생성")
+    parser.add_argument("--chunk", type=int, default=1_000_000, help="한 번에 만들고 쓰는 행 수")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    if not 0 < args.rows <= CODE_SPACE:
+        parser.error(f"--rows는 1 이상 {CODE_SPACE} 이하여야 합니다.")
+    if args.no_csv and not args.snapshot:
+        parser.error("--no-csv를 쓰려면 --snapshot이 필요합니다.")
+
+    # 이름 목록은 작으므로 행마다 문자열을 만들지 않고 미리 인코딩해 둔 바이트열을 이어 붙임
+    vocab = name_vocab(args.rows)
+    vocab_bytes = np.array([name.encode("utf-8") for name in vocab], dtype=object)
+    vocab_csv = np.array([csv_field(name).encode("utf-8") for name in vocab], dtype=object)
+    vocab_len = np.array([len(b) for b in vocab_bytes], dtype=np.int64)
+
+    csv_file = None if args.no_csv else open(args.out, "wb")
+    writer = SnapshotWriter(default_snapshot_dir(args.out), args.rows) if args.snapshot else None
+
+    t0 = time.perf_counter()
+    written = 0
+    for codes, name_ids, exp_days in generate_chunks(args.rows, args.chunk, args.seed):
+        if csv_file is not None:
+            if written == 0:
+                csv_file.write("\ufeffcode,name,exp\n".encode("utf-8"))  # 기존과 같은 utf-8-sig
+            csv_file.write(csv_lines(codes, vocab_csv[name_ids], exp_days))
+        if writer is not None:
+            writer.append(numeric_keys(codes, 13), np.frombuffer(b"".join(vocab_bytes[name_ids]), dtype=np.uint8),
+                          vocab_len[name_ids], exp_days)
+        written += len(codes)
+        if args.rows > args.chunk:
+            print(f"  {written:,}/{args.rows:,}행 ({written / (time.perf_counter() - t0):,.0f}행/초)")
+
+    if csv_file is not None:
+        csv_file.close()
+    if writer is not None:
+        writer.close(source=None if args.no_csv else args.out)
+
+    outputs = ([] if args.no_csv else [f"'{args.out}'"]) + ([f"'{default_snapshot_dir(args.out)}'"] if writer else [])
+    print(f"✅ 총 {written:,}개의 상품 데이터가 포함된 {', '.join(outputs)} 파일이 성공적으로 생성되었습니다. "
+          f"({time.perf_counter() - t0:.1f}초)")
+
+
+if __name__ == '__main__':
+    main()
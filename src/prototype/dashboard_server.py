@@ -0,0 +1,391 @@
+import argparse
+import asyncio
+import collections
+import datetime
+import json
+import threading
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from expiry_alerts import STATUS_EXPIRED, STATUS_SOON, CallbackSink, ExpiryAlertScheduler, InventoryAlertSink
+from inventory_store import InventoryStore, from_day, to_day
+from metrics import registry as metrics
+
+SOON_DAYS = 3  # ExpiryAlertScheduler 기본 warn_days와 맞춤
+HISTORY_LIMIT = 100
+MAX_HISTORY_CODES = 4096  # 이력 응답을 캐시해 두는 최대 코드 수
+REPLAY_EVENTS = 1024      # 다시 연결한 SSE 클라이언트에게 Last-Event-ID 이후로 보내 줄 최근 이벤트 수
+MAX_CLIENT_BUFFER = 256 * 1024  # 전송 버퍼가 이만큼 밀린 SSE 클라이언트는 끊음 (느린 클라이언트가 메모리를 잡지 않게)
+HEARTBEAT_INTERVAL = 15.0
+
+JSON_TYPE = "application/json; charset=utf-8"
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed"}
+SSE_HEADER = (b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+              b"Cache-Control: no-cache\r\nConnection: keep-alive\r\n\r\nretry: 2000\n\n")
+
+INDEX_HTML = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>스마트 냉장고</title></head>
+<body>
+<h2>유통기한 임박</h2><ul id="expiring"></ul>
+<h2>추천 레시피</h2><ul id="recipes"></ul>
+<h2>현재 재고 (<span id="count">0</span>)</h2><ul id="items"></ul>
+<h2>이벤트</h2><ul id="events"></ul>
+<script>
+function fill(id, items, fmt) {
+  // 상품명/레시피명은 외부 데이터이므로 HTML로 해석하지 않고 textContent로만 넣음
+  document.getElementById(id).replaceChildren(...items.map(i => {
+    const li = document.createElement("li");
+    li.textContent = fmt(i);
+    return li;
+  }));
+}
+async function refresh() {
+  const items = await (await fetch("/api/items")).json();
+  const soon = await (await fetch("/api/expiring")).json();
+  document.getElementById("count").textContent = items.count;
+  fill("items", items.items, i => `${i.name || i.code} | ${i.exp || "-"}`);
+  fill("expiring", soon.items, i => `[${i.status}] ${i.name || i.code} | ${i.exp} (${i.days_left}일)`);
+  const recipes = await fetch("/api/recipes");
+  if (recipes.ok) {
+    fill("recipes", (await recipes.json()).recipes,
+         r => r.name + (r.missing.length ? ` (부족: ${r.missing.join(", ")})` : ""));
+  }
+}
+function log(text) {
+  const li = document.createElement("li");
+  li.textContent = text;
+  document.getElementById("events").prepend(li);
+}
+const events = new EventSource("/events");
+events.addEventListener("scan", e => {
+  const d = JSON.parse(e.data);
+  const label = {add: "입고", remove: "출고", update: "유통기한 변경"}[d.kind] || d.kind;
+  log(`${label}: ${d.name || d.code}${d.kind === "update" ? " → " + (d.exp || "-") : ""}`);
+  refresh();
+});
+events.addEventListener("expiry", e => log("🔔 " + JSON.parse(e.data).message));
+refresh();
+</script>
+</body></html>
+""".encode("utf-8")
+
+
+def http_response(status, body, content_type=JSON_TYPE, keep_alive=True):
+    head = (f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\nCache-Control: no-cache\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode("ascii") + body
+
+
+def to_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def int_param(query, name, default, lo, hi):
+    """쿼리 문자열의 정수 인자. 형식이나 범위가 틀리면 ValueError."""
+    values = query.get(name)
+    if not values:
+        return default
+    value = int(values[0])
+    if not lo <= value <= hi:
+        raise ValueError(f"{name}는 {lo}~{hi} 사이여야 합니다")
+    return value
+
+
+class DashboardServer:
+    """재고 대시보드용 로컬 HTTP 서버. asyncio 이벤트 루프를 전용 스레드에서 돌리므로 캡처 루프를 막지 않습니다.
+
+    - GET /api/items: 현재 재고 (유통기한 순)
+    - GET /api/expiring?days=N: N일 안에 만료되거나 이미 만료된 품목 (기본 3일)
+    - GET /api/history/<code>?limit=N: 코드의 입고/출고 이력 (최근 순)
+    - GET /api/recipes?k=N&missing=M: 추천 레시피 (recommender를 준 경우. 부족한 재료 M개 이하, 기본 1)
+    - GET /events: 입고/출고("scan")와 유통기한 알림("expiry")을 보내는 Server-Sent Events 스트림
+
+    조회 응답은 인코딩한 바이트로 캐시하고, 입고/출고 이벤트가 오면 그 품목이 영향을 주는 항목만 지웁니다
+    (전체 목록, 해당 날짜가 들어가는 임박 목록, 해당 코드의 이력). 캐시가 빈 동안 들어온 같은 요청은 한 번의
+    계산 결과를 함께 기다립니다. 이벤트는 한 번만 인코딩해 모든 SSE 연결의 전송 버퍼에 바로 씁니다.
+    recommender(RecipeRecommender)는 서버보다 먼저 InventoryStore.add_listener에 등록해야 이벤트로 캐시를
+    지운 뒤 다시 계산할 때 새 재고가 반영되어 있습니다.
+    """
+
+    def __init__(self, inventory, host="127.0.0.1", port=8080, soon_days=SOON_DAYS, cache=True, recommender=None):
+        self.inventory = inventory
+        self.recommender = recommender
+        self.host = host
+        self.port = port
+        self.soon_days = soon_days
+        self.cache_enabled = cache
+        self.cache = {}          # ("items",) / ("expiring", 오늘, days) / ("recipes", 오늘, k, missing) -> 본문 bytes 또는 Future
+        self.history_cache = {}  # code -> {limit: 본문 bytes 또는 계산 중인 Future}
+        self.clients = set()     # SSE 연결의 StreamWriter
+        self.recent = collections.deque(maxlen=REPLAY_EVENTS)  # (이벤트 id, 인코딩된 이벤트)
+        self.event_id = 0
+        self.stats = collections.Counter()
+        self.connections = {}  # StreamWriter -> 처리 중인 Task
+        self.loop = None
+        self.stopping = None
+        self.thread = None
+        self.error = None
+        self.ready = threading.Event()
+
+    # --- 실행 ---
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="dashboard", daemon=True)
+        self.thread.start()
+        self.ready.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        if self.thread is not None and self.thread.is_alive():
+            self.loop.call_soon_threadsafe(self.stopping.set)
+            self.thread.join()
+
+    def _run(self):
+        self.loop = asyncio.new_event_loop()
+        try:
+            self.loop.run_until_complete(self._serve())
+        finally:
+            self.loop.close()
+
+    async def _serve(self):
+        self.stopping = asyncio.Event()
+        try:
+            server = await asyncio.start_server(self._handle, self.host, self.port, backlog=4096)
+        except OSError as e:
+            self.error = e
+            self.ready.set()
+            return
+        self.port = server.sockets[0].getsockname()[1]  # port=0이면 실제로 열린 포트
+        self.ready.set()
+        heartbeat = asyncio.create_task(self._heartbeat())
+        await self.stopping.wait()
+        heartbeat.cancel()
+        server.close()
+        # 처리 중인 연결은 취소 대신 소켓을 끊어 각 처리 코루틴이 스스로 끝나게 함
+        for writer in list(self.connections):
+            writer.transport.abort()
+        await asyncio.gather(heartbeat, *self.connections.values(), return_exceptions=True)
+        await server.wait_closed()
+
+    async def _heartbeat(self):
+        # 주석 줄을 주기적으로 보내 중간 장비의 유휴 타임아웃을 막고 끊긴 연결을 정리
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            self._broadcast(b": ping\n\n")
+
+    # --- 이벤트 입력 (다른 스레드에서 호출) ---
+
+    def on_inventory_event(self, kind, item):
+        """InventoryStore.add_listener에 등록합니다. 캡처 스레드에서는 이벤트 루프에 넘기기만 합니다."""
+        self._post("scan", {"kind": kind, **item})
+
+    def on_alert(self, alert):
+        """ExpiryAlertScheduler에 CallbackSink(server.on_alert)로 등록합니다."""
+        self._post("expiry", alert)
+
+    def _post(self, event, data):
+        loop = self.loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            loop.call_soon_threadsafe(self._publish, event, data)
+        except RuntimeError:
+            pass  # 종료 중
+
+    def _publish(self, event, data):
+        if event == "scan":
+            self._invalidate(data)
+        self.event_id += 1
+        payload = (f"id: {self.event_id}\nevent: {event}\n"
+                   f"data: {json.dumps(data, ensure_ascii=False)}\n\n").encode("utf-8")
+        self.recent.append((self.event_id, payload))
+        self.stats["events"] += 1
+        self._broadcast(payload)
+
+    def _invalidate(self, item):
+        """입고/출고된 품목이 바꾸는 응답만 캐시에서 지웁니다.
+        알림은 재고를 바꾸지 않고, 임박 목록/추천은 오늘 날짜가 캐시 키에 들어 있어 날이 바뀌면 새로 계산됩니다."""
+        self.cache.pop(("items",), None)
+        exp_day = to_day(item.get("exp"))
+        # 유통기한 변경은 이전 날짜를 모르므로 임박 목록을 모두 지움
+        updated = item.get("kind") == "update"
+        for key in [k for k in self.cache if k[0] == "recipes"
+                    or (k[0] == "expiring" and (updated or exp_day is not None and exp_day <= k[1] + k[2]))]:
+            del self.cache[key]
+        self.history_cache.pop(item.get("code"), None)
+
+    def _broadcast(self, payload):
+        slow = []
+        for writer in self.clients:
+            if writer.transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+                slow.append(writer)
+            else:
+                writer.write(payload)
+        for writer in slow:
+            self.clients.discard(writer)
+            writer.transport.abort()
+            self.stats["dropped_clients"] += 1
+
+    # --- HTTP ---
+
+    async def _handle(self, reader, writer):
+        self.connections[writer] = asyncio.current_task()
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                parts = lines[0].split(" ")
+                if len(parts) != 3:
+                    writer.write(http_response(400, b"{}", keep_alive=False))
+                    return
+                method, target, version = parts
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                if method != "GET":
+                    writer.write(http_response(405, b"{}", keep_alive=False))
+                    return
+                url = urlsplit(target)
+                if url.path == "/events":
+                    await self._stream(reader, writer, headers.get("last-event-id"))
+                    return
+                status, body, content_type = await self._route(url.path, parse_qs(url.query))
+                self.stats["requests"] += 1
+                writer.write(http_response(status, body, content_type, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            self.connections.pop(writer, None)
+            writer.close()
+
+    async def _route(self, path, query):
+        try:
+            if path == "/api/items":
+                return 200, await self._cached(self.cache, ("items",), self._items_body), JSON_TYPE
+            if path == "/api/expiring":
+                days = int_param(query, "days", self.soon_days, 0, 3650)
+                today = to_day(datetime.date.today())
+                body = await self._cached(self.cache, ("expiring", today, days),
+                                          lambda: self._expiring_body(today, days))
+                return 200, body, JSON_TYPE
+            if path.startswith("/api/history/"):
+                code = unquote(path[len("/api/history/"):])
+                limit = int_param(query, "limit", HISTORY_LIMIT, 1, 10_000)
+                per_code = self.history_cache.get(code)
+                if per_code is None:
+                    if len(self.history_cache) >= MAX_HISTORY_CODES:
+                        del self.history_cache[next(iter(self.history_cache))]
+                    per_code = self.history_cache[code] = {}
+                body = await self._cached(per_code, limit, lambda: self._history_body(code, limit))
+                return 200, body, JSON_TYPE
+            if path == "/api/recipes" and self.recommender is not None:
+                k = int_param(query, "k", 5, 1, 100)
+                missing = int_param(query, "missing", 1, 0, 20)
+                key = ("recipes", to_day(datetime.date.today()), k, missing)
+                body = await self._cached(self.cache, key, lambda: to_json({"recipes": self.recommender.top(k, missing)}))
+                return 200, body, JSON_TYPE
+        except ValueError as e:
+            return 400, to_json({"error": str(e)}), JSON_TYPE
+        if path in ("/", "/index.html"):
+            return 200, INDEX_HTML, "text/html; charset=utf-8"
+        return 404, to_json({"error": "not found"}), JSON_TYPE
+
+    async def _cached(self, cache, key, build):
+        """캐시된 응답 본문. 없으면 스레드 풀에서 한 번만 만들고, 그동안 온 같은 요청은 같은 결과를 기다립니다."""
+        if not self.cache_enabled:
+            return await self.loop.run_in_executor(None, build)
+        entry = cache.get(key)
+        if isinstance(entry, bytes):
+            self.stats["cache_hits"] += 1
+            metrics.inc("dashboard_cache_hits")
+            return entry
+        if entry is None:
+            self.stats["cache_misses"] += 1
+            metrics.inc("dashboard_cache_misses")
+            entry = cache[key] = self.loop.run_in_executor(None, build)
+            entry.add_done_callback(lambda fut: self._store(cache, key, fut))
+        # 기다리던 클라이언트가 끊겨도 다른 요청이 기다리는 계산은 취소되지 않도록 shield
+        return await asyncio.shield(entry)
+
+    @staticmethod
+    def _store(cache, key, fut):
+        # 계산 중에 이벤트로 지워졌다면(이미 낡은 결과) 다시 넣지 않음
+        if cache.get(key) is not fut:
+            return
+        if fut.cancelled() or fut.exception() is not None:
+            del cache[key]
+        else:
+            cache[key] = fut.result()
+
+    async def _stream(self, reader, writer, last_event_id):
+        writer.write(SSE_HEADER)
+        if last_event_id and last_event_id.isdigit():
+            last = int(last_event_id)
+            for event_id, payload in self.recent:
+                if event_id > last:
+                    writer.write(payload)
+        self.clients.add(writer)
+        metrics.set_gauge("dashboard_clients", len(self.clients))
+        try:
+            # 보내기는 _broadcast가 하므로 여기서는 클라이언트가 끊을 때까지 기다리기만 함
+            while await reader.read(1024):
+                pass
+        except ConnectionError:
+            pass
+        finally:
+            self.clients.discard(writer)
+            metrics.set_gauge("dashboard_clients", len(self.clients))
+
+    # --- 응답 본문 (스레드 풀에서 실행) ---
+
+    def _items_body(self):
+        items = self.inventory.current_items()
+        return to_json({"count": len(items), "items": items})
+
+    def _expiring_body(self, today, days):
+        items = self.inventory.expiring_before(from_day(today + days + 1))
+        for item in items:
+            item["days_left"] = to_day(item["exp"]) - today
+            item["status"] = STATUS_EXPIRED if item["days_left"] < 0 else STATUS_SOON
+        return to_json({"days": days, "count": len(items), "items": items})
+
+    def _history_body(self, code, limit):
+        history = self.inventory.history(code, limit)
+        return to_json({"code": code, "count": len(history), "history": history})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="재고 대시보드 서버 (스캐너 없이 저장된 재고만 보여줌)")
+    parser.add_argument("--inventory", default="inventory.db", help="재고 기록 SQLite 파일")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    # 스캔 이벤트까지 실시간으로 보려면 barcode_food_manager.py --dashboard-port 로 스캐너와 함께 실행
+    with InventoryStore(args.inventory) as inventory:
+        server = DashboardServer(inventory, host=args.host, port=args.port).start()
+        alerts = ExpiryAlertScheduler([CallbackSink(server.on_alert), InventoryAlertSink(inventory)])
+        alerts.track_many(inventory.current_items(), fired=inventory.alert_states())
+        alerts.start()
+        print(f"대시보드: http://{args.host}:{server.port}/ (재고 {len(inventory)}개, 종료하려면 Ctrl+C)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            alerts.stop()
+            server.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import datetime
+import re
+from functools import lru_cache
+
+# 스캐너(extract_exp_from_text)와 test2(extract_date)가 함께 쓰는 유통기한 추출 엔진.
+# 모든 날짜 형태를 하나의 정규식 대안(alternation)으로 묶어 문자열을 한 번만 훑고,
+# strptime 형식을 하나씩 시도하는 대신 정수로 바로 날짜를 만듭니다.
+# 겹치는 후보도 모두 보도록 전방 탐색 (?=...) 안에서 매칭하므로 위치마다 최대 한 개의 후보가 나옵니다.
+DATE_RE = re.compile(r"""
+(?=(?P<tok>
+    (?P<y>\d{4})
+    (?:
+        (?P<sep>[-/.])(?P<m>\d{1,2})(?P=sep)(?P<d>\d{1,2})                            # 2024-12-31, 2024/1/5, 2024.07.19
+      | [ \t]*년[ \t]*(?P<km>\d{1,2})[ \t]*월[ \t]*(?P<kd>\d{1,2})(?:[ \t]*일)?      # 2024년 12월 31일
+    )
+  | (?P<a>\d{1,2})(?P<nsep>[-/.])(?P<b>\d{1,2})(?P=nsep)(?P<ny>\d{4})             # 12/31/2024 (미국), 31.12.2024 (유럽)
+))
+""", re.VERBOSE)
+
+CACHE_SIZE = 4096  # OCR은 같은 문자열을 프레임마다 반복해서 읽으므로 결과를 기억해 둠
+
+# 스캐너의 기존 우선순위: YYYY-M-D → NN/NN/YYYY → YYYY/M/D → YYYY.M.D
+# 형식 우선순위가 위치보다 앞서므로 DATE_RE로 모든 후보를 훑는 것보다 미리 컴파일한 검색을 차례로 하는 편이 빠름
+SCANNER_SEARCHES = [re.compile(p).search for p in (
+    r"\d{4}-\d{1,2}-\d{1,2}",
+    r"\d{2}/\d{2}/\d{4}",
+    r"\d{4}/\d{1,2}/\d{1,2}",
+    r"\d{4}\.\d{1,2}\.\d{1,2}",
+)]
+
+DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+
+def make_date(year, month, day):
+    """유효한 날짜(1900~2099년)면 date, 아니면 None. 예외를 쓰지 않고 범위만 확인합니다."""
+    if not (1900 <= year <= 2099 and 1 <= month <= 12 and day >= 1):
+        return None
+    limit = DAYS_IN_MONTH[month]
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        limit = 29
+    if day > limit:
+        return None
+    return datetime.date(year, month, day)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def find_exp(text):
+    """스캐너용: 날짜처럼 보이는 원문 부분 문자열을 반환합니다 (없으면 None).
+
+    기존 extract_exp_from_text와 같은 결과를 냅니다. 날짜 유효성은 확인하지 않고,
+    네 가지 형식의 우선순위가 위치보다 앞섭니다.
+    """
+    for search in SCANNER_SEARCHES:
+        m = search(text)
+        if m is not None:
+            return m.group()
+    return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse(text):
+    """문자열에서 유통기한 날짜(date)를 찾습니다 (없으면 None).
+
+    연-월-일 형식(한글 년월일 포함)이 위치와 관계없이 먼저이고, 없으면 가장 앞의 일-월-연도 형식을
+    미국식(월/일)으로, 날짜가 안 되면 유럽식(일/월)으로 읽습니다.
+    """
+    fallback = None
+    for m in DATE_RE.finditer(text):
+        y = m.group("y")
+        if y is not None:
+            if m.group("sep") is not None:
+                found = make_date(int(y), int(m.group("m")), int(m.group("d")))
+            else:
+                found = make_date(int(y), int(m.group("km")), int(m.group("kd")))
+            if found is not None:
+                return found
+        elif fallback is None and not (m.start() and text[m.start() - 1].isdigit()):
+            # 숫자 중간에서 시작하는 후보(예: 32/13/2024의 2/13/2024)는 날짜로 보지 않음
+            year, a, b = int(m.group("ny")), int(m.group("a")), int(m.group("b"))
+            fallback = make_date(year, a, b) or make_date(year, b, a)
+    return fallback
+
+
+def parse_many(texts):
+    """문자열마다 parse 결과를 담은 리스트. 반복되는 OCR 문자열은 캐시에서 바로 나옵니다."""
+    return [parse(t) for t in texts]
+
+
+def parse_first(texts):
+    """texts를 순서대로 보며 처음 찾은 날짜를 반환합니다 (OCR 결과 목록용)."""
+    for t in texts:
+        found = parse(t)
+        if found is not None:
+            return found
+    return None
@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+
+# EAN-13 심볼 인코딩 표 (각 숫자는 7모듈, 1 = 검은 막대)
+L_CODES = ["0001101", "0011001", "0010011", "0111101", "0100011",
+           "0110001", "0101111", "0111011", "0110111", "0001011"]
+R_CODES = ["".join("1" if c == "0" else "0" for c in code) for code in L_CODES]
+G_CODES = [code[::-1] for code in R_CODES]
+# 첫 자리 숫자에 따라 왼쪽 6자리가 L/G 중 어느 인코딩을 쓰는지 결정됨
+PARITY = ["LLLLLL", "LLGLGG", "LLGGLG", "LLGGGL", "LGLLGG",
+          "LGGLLG", "LGGGLL", "LGLGLG", "LGLGGL", "LGGLGL"]
+WEIGHTS = np.array([1, 3] * 6, dtype=np.int64)
+
+
+def check_digit(code12):
+    """앞 12자리에 대한 EAN-13 체크 숫자."""
+    total = sum(int(d) * w for d, w in zip(code12, WEIGHTS))
+    return (10 - total % 10) % 10
+
+
+def check_digits(body):
+    """정수 배열 body(앞 12자리 값)의 체크 숫자를 벡터 연산으로 계산합니다."""
+    body = np.asarray(body, dtype=np.int64)
+    total = np.zeros(body.shape, dtype=np.int64)
+    for i in range(12):
+        digit = (body // 10 ** (11 - i)) % 10
+        total += digit * WEIGHTS[i]
+    return (10 - total % 10) % 10
+
+
+def is_valid(code):
+    code = str(code)
+    return len(code) == 13 and code.isdigit() and check_digit(code[:12]) == int(code[12])
+
+
+def modules(code):
+    """13자리 코드를 95개 모듈(0/1) 배열로 인코딩합니다."""
+    if not is_valid(code):
+        raise ValueError(f"유효한 EAN-13 코드가 아닙니다: {code}")
+    parity = PARITY[int(code[0])]
+    bits = "101"
+    for d, p in zip(code[1:7], parity):
+        bits += (L_CODES if p == "L" else G_CODES)[int(d)]
+    bits += "01010"
+    for d in code[7:]:
+        bits += R_CODES[int(d)]
+    bits += "101"
+    return np.frombuffer(bits.encode(), dtype=np.uint8) - ord("0")
+
+
+def render(code, module_px=3, height=120, quiet=11, with_text=True):
+    """EAN-13 바코드 라벨 이미지 (흰 바탕, uint8 그레이스케일)."""
+    bars = np.repeat(modules(code), module_px)
+    pad = quiet * module_px
+    row = np.full(len(bars) + 2 * pad, 255, dtype=np.uint8)
+    row[pad:pad + len(bars)][bars == 1] = 0
+    text_h = 8 * module_px if with_text else 0
+    img = np.full((height + text_h + 2 * module_px, len(row)), 255, dtype=np.uint8)
+    img[module_px:module_px + height] = row
+    if with_text:
+        scale = module_px / 4.0
+        cv2.putText(img, code, (pad, module_px + height + text_h - module_px),
+                    cv2.FONT_HERSHEY_SIMPLEX, scale, 0, max(1, module_px // 2), cv2.LINE_AA)
+    return img
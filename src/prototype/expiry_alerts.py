@@ -0,0 +1,256 @@
+import datetime
+import heapq
+import json
+import socket
+import threading
+import time
+from functools import lru_cache
+
+# format_output(test2.py)의 상태 이름과 맞춤
+STATUS_SOON = "임박"
+STATUS_EXPIRED = "만료"
+
+
+def day_start(d):
+    """날짜 d의 0시 (로컬 시간) 타임스탬프."""
+    return time.mktime(datetime.datetime.combine(d, datetime.time()).timetuple())
+
+
+@lru_cache(maxsize=8192)
+def due_times(exp, warn_days):
+    """유통기한 문자열의 ("임박" 시각, "만료" 시각). 날짜가 아니면 None.
+    같은 날짜를 가진 품목이 많으므로 캐시해 둠."""
+    try:
+        exp_date = datetime.date.fromisoformat(exp.strip())
+    except ValueError:
+        return None
+    return (day_start(exp_date - datetime.timedelta(days=warn_days)),
+            day_start(exp_date + datetime.timedelta(days=1)))
+
+
+class CallbackSink:
+    """알림마다 fn(alert)을 호출합니다."""
+
+    def __init__(self, fn):
+        self.fn = fn
+
+    def send(self, alert):
+        self.fn(alert)
+
+    def close(self):
+        pass
+
+
+class JsonlFileSink:
+    """알림을 JSON Lines 파일에 한 줄씩 추가합니다."""
+
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def send(self, alert):
+        self.file.write(json.dumps(alert, ensure_ascii=False) + "\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class InventoryAlertSink:
+    """보낸 알림 상태를 InventoryStore에 기록합니다. 다음 실행 때 track_many(fired=inventory.alert_states())로
+    넘기면 이미 보낸 알림을 다시 보내지 않습니다."""
+
+    def __init__(self, inventory):
+        self.inventory = inventory
+
+    def send(self, alert):
+        self.inventory.mark_alerted(alert["id"], alert["status"])
+
+    def close(self):
+        pass
+
+
+class UdpSink:
+    """푸시 알림 서버 대신 로컬 UDP 소켓으로 알림(JSON)을 보냅니다."""
+
+    def __init__(self, host="127.0.0.1", port=9999):
+        self.addr = (host, port)
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def send(self, alert):
+        try:
+            self.sock.sendto(json.dumps(alert, ensure_ascii=False).encode("utf-8"), self.addr)
+        except OSError:
+            pass  # 받는 쪽이 없어도 스캐너는 계속 동작
+
+    def close(self):
+        self.sock.close()
+
+
+class ExpiryAlertScheduler:
+    """품목별 "임박"/"만료" 시각을 힙에 넣어 두고, 시간이 흐르면 도래한 알림만 꺼내 보내는 스케줄러.
+
+    재고 전체를 주기적으로 훑지 않으므로 추가/삭제는 O(log n)이고, 다음 알림 시각까지는
+    스레드가 잠들어 있어 대기 중 CPU를 거의 쓰지 않습니다.
+    삭제는 힙에서 바로 빼지 않고 표시만 해 두었다가 꺼낼 때 건너뜁니다 (지연 삭제).
+    """
+
+    def __init__(self, sinks=(), warn_days=3, clock=time.time):
+        self.sinks = list(sinks)
+        self.warn_days = warn_days
+        self.clock = clock
+        self.heap = []      # (due_ts, seq, item_id, status)
+        self.items = {}     # item_id -> (seq, item dict, 힙에 남은 이 품목의 항목 수)
+        self.seq = 0
+        self.stale = 0
+        self.fired = 0
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopped = False
+
+    def __len__(self):
+        return len(self.items)
+
+    def _entries(self, item, seq, now, fired=None):
+        """품목의 알림 항목들. fired는 이미 보낸 마지막 알림 상태로, 그 알림까지는 다시 만들지 않습니다."""
+        exp = item.get("exp")
+        times = due_times(str(exp), self.warn_days) if exp else None
+        if times is None or fired == STATUS_EXPIRED:
+            return []
+        soon_at, expired_at = times
+        entries = [(expired_at, seq, item["id"], STATUS_EXPIRED)]
+        # 이미 만료된 품목은 "임박" 없이 "만료"만 보냄
+        if now < expired_at and fired != STATUS_SOON:
+            entries.append((soon_at, seq, item["id"], STATUS_SOON))
+        return entries
+
+    def track(self, item):
+        """item(dict: id, code, name, exp)의 알림을 예약합니다. 같은 id가 있으면 교체합니다."""
+        with self.cond:
+            if item["id"] in self.items:
+                self._untrack(item["id"])
+            self.seq += 1
+            entries = self._entries(item, self.seq, self.clock())
+            if not entries:
+                return
+            self.items[item["id"]] = (self.seq, item, len(entries))
+            wake = not self.heap or min(e[0] for e in entries) < self.heap[0][0]
+            for e in entries:
+                heapq.heappush(self.heap, e)
+            if wake:
+                self.cond.notify()
+
+    def track_many(self, items, fired=None):
+        """많은 품목을 한 번에 등록합니다 (한 번의 heapify로 O(n)).
+        fired({품목 id: 보낸 알림 상태}, 예: InventoryStore.alert_states())의 알림은 다시 보내지 않습니다."""
+        fired = fired or {}
+        with self.cond:
+            now = self.clock()
+            for item in items:
+                if item["id"] in self.items:
+                    self._untrack(item["id"])
+                self.seq += 1
+                entries = self._entries(item, self.seq, now, fired.get(item["id"]))
+                if entries:
+                    self.items[item["id"]] = (self.seq, item, len(entries))
+                    self.heap.extend(entries)
+            heapq.heapify(self.heap)
+            self.cond.notify()
+
+    def untrack(self, item_id):
+        with self.cond:
+            self._untrack(item_id)
+
+    def _untrack(self, item_id):
+        current = self.items.pop(item_id, None)
+        if current is not None:
+            self.stale += current[2]  # 힙에 아직 남아 있는 항목만 버려진 것으로 셈
+            # 버려진 항목이 절반을 넘으면 힙을 다시 만들어 메모리를 회수
+            if self.stale > len(self.heap) // 2:
+                self.heap = [e for e in self.heap if self._live(e)]
+                heapq.heapify(self.heap)
+                self.stale = 0
+
+    def _live(self, entry):
+        current = self.items.get(entry[2])
+        return current is not None and current[0] == entry[1]
+
+    def on_inventory_event(self, kind, item):
+        """InventoryStore.add_listener에 등록해 입고/출고를 그대로 반영합니다."""
+        if kind in ("add", "update"):
+            # 유통기한이 바뀌면 같은 id의 예약을 새 날짜로 교체
+            self.track(item)
+        elif kind == "remove":
+            self.untrack(item["id"])
+
+    def next_due(self):
+        with self.cond:
+            while self.heap and not self._live(self.heap[0]):
+                heapq.heappop(self.heap)
+                self.stale = max(0, self.stale - 1)
+            return self.heap[0][0] if self.heap else None
+
+    def advance(self, now=None):
+        """now까지 도래한 알림을 모두 보내고 보낸 알림 목록을 반환합니다."""
+        now = self.clock() if now is None else now
+        due = []
+        with self.cond:
+            while self.heap and self.heap[0][0] <= now:
+                entry = heapq.heappop(self.heap)
+                if not self._live(entry):
+                    self.stale = max(0, self.stale - 1)
+                    continue
+                due.append(self._alert(entry, now))
+                seq, item, left = self.items[entry[2]]
+                if entry[3] == STATUS_EXPIRED:
+                    del self.items[entry[2]]
+                    self.stale += left - 1  # 힙에 남은 다른 항목이 있다면 건너뛰도록
+                else:
+                    self.items[entry[2]] = (seq, item, left - 1)
+        for alert in due:
+            for sink in self.sinks:
+                sink.send(alert)
+        self.fired += len(due)
+        return due
+
+    def _alert(self, entry, now):
+        _, _, item_id, status = entry
+        item = self.items[item_id][1]
+        exp_date = datetime.date.fromisoformat(str(item["exp"]).strip())
+        days_left = (exp_date - datetime.date.fromtimestamp(now)).days
+        name = item.get("name") or item.get("code")
+        if status == STATUS_EXPIRED:
+            message = f"{name} 유통기한이 지났어요! ({item['exp']})"
+        else:
+            message = f"{name} 유통기한이 {days_left}일 남았어요!"
+        return {"status": status, "id": item_id, "code": item.get("code"), "name": item.get("name"),
+                "exp": item["exp"], "days_left": days_left, "ts": now, "message": message}
+
+    # --- 백그라운드 실행 ---
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="expiry-alerts", daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            self.advance()
+            with self.cond:
+                if self.stopped:
+                    return
+                due = self.next_due()
+                # 다음 알림 시각까지 잠듦. 더 이른 품목이 추가되면 notify로 깨어남
+                timeout = None if due is None else max(0.0, due - self.clock())
+                self.cond.wait(timeout)
+                if self.stopped:
+                    return
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,313 @@
+import bisect
+import datetime
+import queue
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import date_parser
+from product_index import EPOCH_ORDINAL
+
+# 유통기한을 모르는 품목은 항상 맨 뒤에 정렬되도록 큰 값을 사용
+NO_EXP_DAY = 2 ** 31 - 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    id INTEGER PRIMARY KEY,
+    code TEXT NOT NULL,
+    name TEXT,
+    exp_day INTEGER,
+    added_ts REAL NOT NULL,
+    removed_ts REAL,
+    source TEXT,
+    alert_status TEXT
+);
+CREATE INDEX IF NOT EXISTS items_open_exp ON items (exp_day) WHERE removed_ts IS NULL;
+CREATE INDEX IF NOT EXISTS items_code ON items (code);
+"""
+
+
+def to_day(value):
+    """date / 날짜 문자열을 1970-01-01 기준 일수로 바꿉니다. 날짜가 아니면 None.
+
+    ISO(YYYY-MM-DD)가 아니면 date_parser.parse로 읽으므로 OCR이 찾은 2024.07.19, 12/31/2030 같은 형식도 됩니다.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.date):
+        return value.toordinal() - EPOCH_ORDINAL
+    text = str(value).strip()
+    try:
+        return datetime.date.fromisoformat(text).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        parsed = date_parser.parse(text)
+        return None if parsed is None else parsed.toordinal() - EPOCH_ORDINAL
+
+
+@lru_cache(maxsize=8192)
+def from_day(day):
+    # 품목마다 날짜 문자열을 만들면 조회 시간 대부분을 차지하므로 일수별로 캐시 (같은 날짜가 많음)
+    if day is None or day == NO_EXP_DAY:
+        return None
+    return datetime.date.fromordinal(EPOCH_ORDINAL + day).isoformat()
+
+
+class InventoryStore:
+    """스캔 입고/출고를 SQLite(WAL)에 저장하는 재고 저장소.
+
+    현재 재고는 메모리에 유통기한 순 정렬 배열과 코드별 품목 집합으로 유지하므로
+    "D일 이전에 만료되는 품목", "코드별 수량" 조회는 디스크를 읽지 않습니다.
+    디스크 쓰기는 큐에 넣기만 하고, 별도 스레드가 모아서 한 트랜잭션으로 커밋합니다.
+    """
+
+    def __init__(self, path="inventory.db", batch_size=1024, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self.lock = threading.Lock()
+        self.items = {}    # id -> (code, name, exp_day, added_ts)
+        self.by_exp = []   # (exp_day, id) 정렬 목록
+        self.by_code = {}  # code -> {id, ...}
+        self.alerted = {}  # id -> 마지막으로 보낸 유통기한 알림 상태 ("임박"/"만료")
+        self.next_id = 1
+        self.listeners = []
+
+        self.queue = queue.Queue()
+        self.written = 0
+        self.commits = 0
+        self._load()
+        self.writer = threading.Thread(target=self._writer_loop, name="inventory-writer", daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        # 알림 상태 열이 없던 예전 DB에 열 추가
+        if "alert_status" not in {row[1] for row in conn.execute("PRAGMA table_info(items)")}:
+            conn.execute("ALTER TABLE items ADD COLUMN alert_status TEXT")
+        return conn
+
+    def _load(self):
+        conn = self.connect()
+        try:
+            row = conn.execute("SELECT MAX(id) FROM items").fetchone()
+            self.next_id = (row[0] or 0) + 1
+            rows = conn.execute("SELECT id, code, name, exp_day, added_ts, alert_status FROM items "
+                                "WHERE removed_ts IS NULL").fetchall()
+        finally:
+            conn.close()
+        for item_id, code, name, exp_day, added_ts, alert_status in rows:
+            if alert_status is not None:
+                self.alerted[item_id] = alert_status
+            exp_day = NO_EXP_DAY if exp_day is None else exp_day
+            self.items[item_id] = (code, name, exp_day, added_ts)
+            self.by_exp.append((exp_day, item_id))
+            self.by_code.setdefault(code, set()).add(item_id)
+        self.by_exp.sort()
+
+    # --- 쓰기 (캡처 스레드에서 호출해도 디스크를 기다리지 않음) ---
+
+    def add(self, code, name=None, exp=None, ts=None, source=None):
+        """입고 기록. 새 품목 id를 반환합니다."""
+        ts = time.time() if ts is None else ts
+        day = to_day(exp)
+        exp_day = NO_EXP_DAY if day is None else day
+        with self.lock:
+            item_id = self.next_id
+            self.next_id += 1
+            self.items[item_id] = (code, name, exp_day, ts)
+            bisect.insort(self.by_exp, (exp_day, item_id))
+            self.by_code.setdefault(code, set()).add(item_id)
+        self.queue.put(("add", (item_id, code, name, day, ts, source)))
+        self._notify("add", item_id, code, name, exp_day, ts)
+        return item_id
+
+    def remove(self, code, ts=None):
+        """출고 기록. 해당 코드 중 유통기한이 가장 빠른 품목을 꺼내고 id를 반환합니다. 없으면 None."""
+        ts = time.time() if ts is None else ts
+        with self.lock:
+            ids = self.by_code.get(code)
+            if not ids:
+                return None
+            item_id = min(ids, key=lambda i: (self.items[i][2], i))
+            _, name, exp_day, _ = self.items.pop(item_id)
+            ids.discard(item_id)
+            if not ids:
+                del self.by_code[code]
+            pos = bisect.bisect_left(self.by_exp, (exp_day, item_id))
+            del self.by_exp[pos]
+            self.alerted.pop(item_id, None)
+        self.queue.put(("remove", (ts, item_id)))
+        self._notify("remove", item_id, code, name, exp_day, ts)
+        return item_id
+
+    def update_exp(self, item_id, exp):
+        """현재 품목의 유통기한을 바꿉니다 (OCR로 포장의 날짜를 나중에 읽은 경우). 품목이 없으면 False."""
+        day = to_day(exp)
+        exp_day = NO_EXP_DAY if day is None else day
+        with self.lock:
+            entry = self.items.get(item_id)
+            if entry is None:
+                return False
+            code, name, old_day, ts = entry
+            if old_day == exp_day:
+                return True
+            del self.by_exp[bisect.bisect_left(self.by_exp, (old_day, item_id))]
+            bisect.insort(self.by_exp, (exp_day, item_id))
+            self.items[item_id] = (code, name, exp_day, ts)
+            # 날짜가 바뀌었으므로 새 날짜 기준으로 다시 알림
+            self.alerted.pop(item_id, None)
+        self.queue.put(("update", ("UPDATE items SET exp_day = ?, alert_status = NULL WHERE id = ?", (day, item_id))))
+        self._notify("update", item_id, code, name, exp_day, ts)
+        return True
+
+    def mark_alerted(self, item_id, status):
+        """품목에 보낸 유통기한 알림 상태를 기록합니다. 재시작해도 같은 알림을 다시 보내지 않는 데 씁니다."""
+        with self.lock:
+            if item_id not in self.items:
+                return
+            self.alerted[item_id] = status
+        self.queue.put(("update", ("UPDATE items SET alert_status = ? WHERE id = ?", (status, item_id))))
+
+    def alert_states(self):
+        """{품목 id: 마지막으로 보낸 알림 상태} (현재 재고 중 알림을 보낸 품목만)."""
+        with self.lock:
+            return dict(self.alerted)
+
+    def add_listener(self, fn):
+        """입고/출고가 생길 때마다 fn(kind, item)을 호출합니다.
+        kind는 "add", "remove", 또는 유통기한이 바뀐 "update"(item은 바뀐 뒤의 값)."""
+        self.listeners.append(fn)
+
+    def _notify(self, kind, item_id, code, name, exp_day, ts):
+        if not self.listeners:
+            return
+        item = self._item(item_id, (code, name, exp_day, ts))
+        for fn in self.listeners:
+            fn(kind, item)
+
+    # --- 조회 (메모리 인덱스) ---
+
+    def _item(self, item_id, entry):
+        code, name, exp_day, added_ts = entry
+        return {"id": item_id, "code": code, "name": name, "exp": from_day(exp_day), "added": added_ts}
+
+    def expiring_before(self, day, limit=None):
+        """유통기한이 day 이전인 현재 품목 목록 (유통기한 순)."""
+        bound = self._bound(day)
+        with self.lock:
+            end = bisect.bisect_left(self.by_exp, (bound, 0))
+            if limit is not None:
+                end = min(end, limit)
+            return [self._item(i, self.items[i]) for _, i in self.by_exp[:end]]
+
+    def count_expiring_before(self, day):
+        bound = self._bound(day)
+        with self.lock:
+            return bisect.bisect_left(self.by_exp, (bound, 0))
+
+    @staticmethod
+    def _bound(day):
+        bound = to_day(day)
+        if bound is None:
+            raise ValueError(f"날짜 형식이 아닙니다: {day!r}")
+        return bound
+
+    def count(self, code):
+        with self.lock:
+            return len(self.by_code.get(code, ()))
+
+    def counts(self):
+        with self.lock:
+            return {code: len(ids) for code, ids in self.by_code.items()}
+
+    def current_items(self):
+        """현재 재고 전체 (유통기한 순)."""
+        with self.lock:
+            return [self._item(i, self.items[i]) for _, i in self.by_exp]
+
+    def __len__(self):
+        return len(self.items)
+
+    def history(self, code, limit=100):
+        """코드의 입고/출고 이력 (최근 순). 디스크를 읽으므로 먼저 대기 중인 쓰기를 반영합니다."""
+        self.flush()
+        conn = sqlite3.connect(self.path)
+        try:
+            rows = conn.execute(
+                "SELECT id, name, exp_day, added_ts, removed_ts FROM items WHERE code = ? "
+                "ORDER BY added_ts DESC LIMIT ?", (code, limit)).fetchall()
+        finally:
+            conn.close()
+        return [{"id": i, "code": code, "name": name, "exp": from_day(d), "added": a, "removed": r}
+                for i, name, d, a, r in rows]
+
+    # --- 백그라운드 쓰기 ---
+
+    def _writer_loop(self):
+        conn = self.connect()
+        running = True
+        while running:
+            batch = [self.queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            # flush/stop 요청이 들어오면 더 모으지 않고 바로 커밋
+            while len(batch) < self.batch_size and batch[-1][0] in ("add", "remove", "update"):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            adds, removes, updates, waiters = [], [], [], []
+            for kind, payload in batch:
+                if kind == "add":
+                    adds.append(payload)
+                elif kind == "remove":
+                    removes.append(payload)
+                elif kind == "update":
+                    updates.append(payload)
+                elif kind == "flush":
+                    waiters.append(payload)
+                elif kind == "stop":
+                    waiters.append(payload)
+                    running = False
+            if adds or removes or updates:
+                with conn:
+                    conn.executemany("INSERT INTO items (id, code, name, exp_day, added_ts, source) "
+                                     "VALUES (?, ?, ?, ?, ?, ?)", adds)
+                    conn.executemany("UPDATE items SET removed_ts = ? WHERE id = ?", removes)
+                    # 유통기한 변경과 알림 기록은 같은 품목에 차례로 올 수 있으므로 순서대로 실행
+                    for sql, params in updates:
+                        conn.execute(sql, params)
+                self.written += len(adds) + len(removes) + len(updates)
+                self.commits += 1
+            for event in waiters:
+                event.set()
+        conn.close()
+
+    def flush(self, timeout=None):
+        """지금까지 기록한 내용이 디스크에 커밋될 때까지 기다립니다."""
+        if not self.writer.is_alive():
+            return
+        done = threading.Event()
+        self.queue.put(("flush", done))
+        done.wait(timeout)
+
+    def close(self):
+        if self.writer.is_alive():
+            done = threading.Event()
+            self.queue.put(("stop", done))
+            done.wait()
+            self.writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,246 @@
+import csv
+import glob
+import io
+import os
+import threading
+import time
+
+from metrics import registry
+from product_index import ProductIndex, days_to_exp, exp_to_day, index_key, source_signature
+
+DELTA_OPS = {"add", "change", "remove"}
+TAIL_CHECK_BYTES = 256  # CSV 끝에 행만 추가되었는지 확인할 때 비교하는 기존 끝부분 크기
+
+
+class LiveProductIndex:
+    """실행 중에 상품 DB 변경을 반영하는 ProductIndex 래퍼.
+
+    상태는 (기본 인덱스, 변경분 overlay, 상품 수) 튜플 하나이고, 변경은 새 튜플을 만들어 한 번에 교체합니다.
+    조회 쪽은 잠금 없이 self.state를 한 번 읽어서 쓰므로 캡처/렌더 루프가 갱신 때문에 멈추거나
+    반쯤 반영된 카탈로그를 보지 않습니다. overlay는 {index_key 키: (상품명, 유통기한 일수) 또는 삭제면 None}이며,
+    compact_threshold를 넘으면 기본 인덱스에 합쳐집니다 (ProductIndex.merged).
+
+    - CSV 감시: 끝에 행만 추가되었으면 추가된 부분만 읽고, 그 밖의 수정은 CSV 전체를 다시 읽어 교체합니다.
+    - 델타 파일: delta_dir에 op,code,name,exp 형식(op는 add/change/remove)의 CSV를 넣으면 해당 행만 반영하고
+      파일 이름 뒤에 .applied를 붙입니다 (형식이 틀리면 .rejected). 델타는 CSV를 다시 읽은 뒤에도 유지됩니다.
+    """
+
+    def __init__(self, base, csv_path=None, delta_dir=None, interval=1.0, compact_threshold=50_000,
+                 on_reload=None, metrics=registry):
+        self.state = (base, {}, len(base))
+        self.csv_path = csv_path
+        self.delta_dir = delta_dir
+        self.interval = interval
+        self.compact_threshold = compact_threshold
+        self.on_reload = on_reload
+        self.metrics = metrics
+        self.pinned = {}  # 델타 파일로 들어온 변경 (CSV를 다시 읽어도 유지)
+        self.write_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.reloads = []  # (종류, 반영 행 수, 걸린 초)
+        if csv_path:
+            self._remember_csv()
+        self.pending_sig = None
+
+    def __len__(self):
+        return self.state[2]
+
+    # --- 조회 (잠금 없음) ---
+
+    def lookup(self, code):
+        base, overlay, _ = self.state
+        if overlay:
+            key = index_key(code)
+            if key in overlay:
+                rec = overlay[key]
+                return None if rec is None else {"code": code, "name": rec[0], "exp": days_to_exp(rec[1])}
+        return base.lookup(code)
+
+    def lookup_many(self, codes):
+        base, overlay, _ = self.state
+        codes = list(codes)
+        results = base.lookup_many(codes)
+        if overlay:
+            for i, code in enumerate(codes):
+                key = index_key(code)
+                if key in overlay:
+                    rec = overlay[key]
+                    results[i] = None if rec is None else {"code": code, "name": rec[0], "exp": days_to_exp(rec[1])}
+        return results
+
+    # --- 변경 반영 ---
+
+    def apply(self, changes, kind="delta"):
+        """changes를 overlay에 반영하고 상태를 교체합니다. 반영한 행 수를 반환합니다."""
+        if not changes:
+            return 0
+        t0 = time.perf_counter()
+        with self.write_lock:
+            base, overlay, size = self.state
+            for key, rec in changes.items():
+                before = overlay[key] is not None if key in overlay else base.contains(key)
+                size += (rec is not None) - before
+            overlay = {**overlay, **changes}
+            if len(overlay) >= self.compact_threshold:
+                base, overlay = base.merged(overlay), {}
+            self.state = (base, overlay, size)
+        self._report(kind, len(changes), time.perf_counter() - t0)
+        return len(changes)
+
+    def compact(self):
+        """overlay를 기본 인덱스에 합칩니다 (조회 결과는 그대로)."""
+        with self.write_lock:
+            base, overlay, size = self.state
+            if overlay:
+                self.state = (base.merged(overlay), {}, size)
+
+    def apply_delta_file(self, path):
+        with open(path, encoding="utf-8-sig", newline="") as f:
+            rows = list(csv.DictReader(f))
+        bad = [r for r in rows if (r.get("op") or "").strip() not in DELTA_OPS]
+        if bad:
+            raise ValueError(f"{path}: op는 add/change/remove 중 하나여야 합니다 ({len(bad)}행)")
+        changes = {}
+        for r in rows:
+            key = index_key(r["code"])
+            if key is None:
+                continue
+            if r["op"].strip() == "remove":
+                changes[key] = None
+            else:
+                changes[key] = ((r.get("name") or "").strip(), exp_to_day(r.get("exp")))
+        self.pinned.update(changes)
+        return self.apply(changes, kind=f"delta {os.path.basename(path)}")
+
+    def reload_csv(self):
+        """CSV 변경을 반영합니다. 끝에 행만 추가되었으면 그 부분만, 아니면 전체를 다시 읽습니다."""
+        appended = self._read_appended_rows(final=True)
+        if appended is not None:
+            return self._apply_appended(*appended)
+        return self._reload_all()
+
+    def _apply_appended(self, rows, offset):
+        base, overlay, _ = self.state
+        changes = {}
+        # 전체를 다시 읽을 때와 같게: 이미 있는 바코드는 먼저 나온 행이 우선이므로 새 바코드만 추가
+        for r in rows:
+            key = index_key(r[0])
+            if key is None or key in changes or key in overlay or base.contains(key):
+                continue
+            changes[key] = (r[1].strip(), exp_to_day(r[2]))
+        self.apply(changes, kind="csv append")
+        self._remember_csv(offset)
+        return len(changes)
+
+    def _reload_all(self):
+        t0 = time.perf_counter()
+        # load_or_build는 CSV를 다시 읽고 다음 시작을 위해 스냅샷도 새로 저장함
+        base, _ = ProductIndex.load_or_build(self.csv_path)
+        with self.write_lock:
+            overlay = dict(self.pinned)
+            size = len(base)
+            for key, rec in overlay.items():
+                size += (rec is not None) - base.contains(key)
+            self.state = (base, overlay, size)
+        self._remember_csv()
+        self._report("csv reload", len(base), time.perf_counter() - t0)
+        return len(base)
+
+    def _remember_csv(self, offset=None):
+        """offset까지 읽었다고 기록합니다. csv_sig는 그때의 파일 상태이므로, 파일이 그대로인데 offset이 파일 끝보다
+        앞이면 줄바꿈 없이 끝난 마지막 행이 남아 있다는 뜻입니다 (poll에서 한 주기 뒤 완성된 행으로 처리)."""
+        sig = source_signature(self.csv_path)
+        self.csv_sig = sig
+        self.csv_offset = sig["size"] if offset is None else offset
+        with open(self.csv_path, "rb") as f:
+            f.seek(max(0, self.csv_offset - TAIL_CHECK_BYTES))
+            self.csv_tail = f.read(self.csv_offset - max(0, self.csv_offset - TAIL_CHECK_BYTES))
+
+    def _read_appended_rows(self, final=False):
+        """기존 내용 뒤에 행만 추가되었으면 ([(code, name, exp)], 새 오프셋), 아니면 None.
+        기존 끝부분만 비교하므로 파일이 커지지 않은 수정은 모두 전체 다시 읽기로 처리됩니다.
+        final이 아니면 줄바꿈으로 끝나지 않은 마지막 줄은 쓰는 중일 수 있으므로 남겨 둡니다."""
+        size = os.stat(self.csv_path).st_size
+        if size <= self.csv_offset:
+            return None
+        with open(self.csv_path, "rb") as f:
+            f.seek(self.csv_offset - len(self.csv_tail))
+            if f.read(len(self.csv_tail)) != self.csv_tail:
+                return None
+            data = f.read(size - self.csv_offset)
+        start = 0
+        if self.csv_tail and not self.csv_tail.endswith(b"\n"):
+            # 기존 마지막 행이 줄바꿈 없이 끝났던 경우 (직접 편집한 CSV에 흔함): 새 줄로 시작해야 행 추가이고,
+            # 아니면 기존 마지막 행을 고친 것이므로 전체 다시 읽기
+            if data.startswith(b"\r\n"):
+                start = 2
+            elif data.startswith(b"\n"):
+                start = 1
+            else:
+                return None
+        end = len(data) if final else max(start, data.rfind(b"\n") + 1)
+        rows = [r for r in csv.reader(io.StringIO(data[start:end].decode("utf-8"))) if len(r) >= 3]
+        return rows, self.csv_offset + end
+
+    def _report(self, kind, rows, seconds):
+        self.reloads.append((kind, rows, seconds))
+        self.metrics.observe("db_reload", seconds)
+        self.metrics.inc("db_reloads")
+        self.metrics.set_gauge("db_rows", len(self))
+        if self.on_reload is not None:
+            self.on_reload(kind, rows, seconds)
+
+    # --- 감시 스레드 ---
+
+    def poll(self):
+        """델타 파일과 CSV 변경을 한 번 확인해 반영합니다."""
+        if self.delta_dir:
+            for path in sorted(glob.glob(os.path.join(self.delta_dir, "*.csv"))):
+                try:
+                    self.apply_delta_file(path)
+                    os.replace(path, path + ".applied")
+                except (OSError, ValueError) as e:
+                    print(f"경고: 델타 파일을 적용하지 못했습니다 ({e})")
+                    os.replace(path, path + ".rejected")
+        if self.csv_path:
+            try:
+                sig = source_signature(self.csv_path)
+            except OSError:
+                return
+            if sig == self.csv_sig:
+                self.pending_sig = None
+                if self.csv_offset < sig["size"]:
+                    # 줄바꿈 없이 끝난 마지막 행: 한 주기 동안 파일이 그대로였으므로 완성된 행으로 반영
+                    appended = self._read_appended_rows(final=True)
+                    if appended is not None:
+                        self._apply_appended(*appended)
+                    else:
+                        self._reload_all()
+                return
+            appended = self._read_appended_rows()
+            if appended is not None:
+                self._apply_appended(*appended)
+            elif sig == self.pending_sig:
+                # 통째로 다시 쓰는 경우는 한 주기 동안 크기/수정 시각이 그대로일 때 읽음 (쓰는 중인 파일 방지)
+                self._reload_all()
+                self.pending_sig = None
+            else:
+                self.pending_sig = sig
+
+    def start(self):
+        def loop():
+            while not self.stop_event.wait(self.interval):
+                try:
+                    self.poll()
+                except Exception as e:  # 감시 스레드가 죽으면 이후 변경을 놓치므로 계속 진행
+                    print(f"경고: 상품 DB 갱신 실패 ({e})")
+
+        self.thread = threading.Thread(target=loop, name="product-db-watch", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
@@ -0,0 +1,221 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+# 지연 시간 히스토그램 구간 (초). 고정 구간이라 관측 한 번은 이진 탐색 + 정수 증가뿐
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """구간 안에서 선형 보간한 근사 분위수 (HUD 표시용)."""
+        with self.lock:
+            counts, total = list(self.counts), self.count
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for i, c in enumerate(counts):
+            if seen + c >= rank and c:
+                lo = self.bounds[i - 1] if i > 0 else 0.0
+                hi = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lo + (hi - lo) * (rank - seen) / c
+            seen += c
+        return self.bounds[-1]
+
+
+class _NullTimer:
+    """계측을 끈 상태에서 쓰는 아무 일도 하지 않는 타이머."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+class Metrics:
+    """스캐너 단계별 지연 시간 히스토그램, 카운터, 게이지 모음.
+
+    enabled가 False이면 stage()는 공유 no-op 타이머를, inc()/observe()는 바로 반환하므로
+    계측 코드를 그대로 두어도 비용이 거의 없습니다.
+    """
+
+    def __init__(self, enabled=False, prefix="scanner", buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.prefix = prefix
+        self.buckets = buckets
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.server = None
+        self.writer = None
+        self.stop_event = threading.Event()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+        return self
+
+    def histogram(self, name):
+        hist = self.histograms.get(name)
+        if hist is None:
+            with self.lock:
+                hist = self.histograms.setdefault(name, Histogram(self.buckets))
+        return hist
+
+    def stage(self, name):
+        """with metrics.stage("decode"): ... 형태로 단계 시간을 잽니다."""
+        if not self.enabled:
+            return NULL_TIMER
+        return _StageTimer(self.histogram(name))
+
+    def observe(self, name, seconds):
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+
+    def inc(self, name, n=1):
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = self.counters.get(name, 0) + n
+
+    def set_gauge(self, name, value):
+        if self.enabled:
+            with self.lock:
+                self.gauges[name] = value
+
+    # --- 내보내기 ---
+
+    def render_prometheus(self):
+        """Prometheus 텍스트 형식 문자열."""
+        p = self.prefix
+        # 다른 스레드가 처음 보는 이름을 추가하면 순회 중 dict 크기가 바뀌므로 잠금 안에서 복사해 둠
+        with self.lock:
+            histograms, counters, gauges = dict(self.histograms), dict(self.counters), dict(self.gauges)
+        lines = [f"# TYPE {p}_stage_seconds histogram"]
+        for stage, hist in sorted(histograms.items()):
+            with hist.lock:
+                counts, total, count = list(hist.counts), hist.sum, hist.count
+            cumulative = 0
+            for bound, c in zip(hist.bounds, counts):
+                cumulative += c
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {total:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {count}')
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        for name, value in sorted(gauges.items()):
+            lines.append(f"# TYPE {p}_{name} gauge")
+            lines.append(f"{p}_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        # node_exporter textfile 수집기가 쓰다 만 파일을 읽지 않도록 임시 파일 후 교체
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render_prometheus())
+        os.replace(tmp, path)
+
+    def start_textfile_writer(self, path, interval=5.0):
+        def write():
+            # 한 번 실패해도 (디스크 가득 참 등) 스레드가 죽지 않고 다음 주기에 다시 씀
+            try:
+                self.write_textfile(path)
+            except Exception as e:
+                print(f"경고: 메트릭 파일을 쓰지 못했습니다 ({type(e).__name__}: {e})")
+
+        def loop():
+            while not self.stop_event.wait(interval):
+                write()
+            write()
+
+        self.writer = threading.Thread(target=loop, name="metrics-writer", daemon=True)
+        self.writer.start()
+
+    def serve_http(self, port=9100, host="127.0.0.1"):
+        """localhost의 /metrics에서 Prometheus 텍스트를 제공합니다."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.render_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, name="metrics-http", daemon=True).start()
+        return self.server
+
+    def close(self):
+        self.stop_event.set()
+        if self.writer is not None:
+            self.writer.join()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # --- 화면 HUD ---
+
+    def draw_hud(self, frame, fps, stages=("decode", "lookup", "overlay", "display")):
+        """프레임 왼쪽 위에 FPS와 단계별 p50 지연 시간을 표시합니다."""
+        lines = [f"FPS {fps:5.1f}"]
+        for stage in stages:
+            hist = self.histograms.get(stage)
+            if hist is not None and hist.count:
+                lines.append(f"{stage:<8} p50 {hist.quantile(0.5) * 1000:6.1f}ms p99 {hist.quantile(0.99) * 1000:6.1f}ms")
+        for i, text in enumerate(lines):
+            y = 20 + 18 * i
+            cv2.putText(frame, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 3, cv2.LINE_AA)
+            cv2.putText(frame, text, (10, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1, cv2.LINE_AA)
+        return frame
+
+
+# 모듈 전역 레지스트리 (기본은 꺼짐). 스캐너나 test2에서 enable()로 켭니다.
+registry = Metrics()
@@ -0,0 +1,178 @@
+import threading
+import time
+
+import cv2
+import numpy as np
+
+
+def to_results(barcodes, offset=(0, 0), scale=1.0):
+    """pyzbar 결과를 decode_barcode와 같은 dict 형식으로 바꿉니다.
+
+    offset은 잘라낸 ROI의 원본 좌표, scale은 축소 이미지에서 찾았을 때의 축소 비율입니다.
+    """
+    ox, oy = offset
+    results = []
+    for b in barcodes:
+        x, y, w, h = b.rect
+        rect = (int(x / scale) + ox, int(y / scale) + oy, int(w / scale), int(h / scale))
+        results.append({"data": b.data.decode('utf-8'), "type": b.type, "rect": rect})
+    return results
+
+
+class DecodeStats:
+    """디코더 호출 횟수와 CPU 사용량 집계 (모드 간 비교용)."""
+
+    def __init__(self):
+        self.frames = 0
+        self.skipped = 0         # 정지 장면이라 디코딩을 건너뛴 프레임
+        self.decode_calls = 0    # pyzbar.decode 호출 횟수
+        self.decoded_pixels = 0  # pyzbar에 넘긴 픽셀 수
+        self.cpu_seconds = 0.0
+        self.started_at = time.monotonic()
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started_at, 1e-9)
+        return {
+            "frames": self.frames,
+            "skipped": self.skipped,
+            "decode_calls": self.decode_calls,
+            "decodes_per_sec": self.decode_calls / elapsed,
+            "mpixels_decoded": self.decoded_pixels / 1e6,
+            "cpu_percent": 100.0 * self.cpu_seconds / elapsed,
+            "cpu_ms_per_frame": 1000.0 * self.cpu_seconds / max(self.frames, 1),
+        }
+
+    def format(self, label):
+        s = self.summary()
+        return (f"[{label}] 프레임 {s['frames']} (건너뜀 {s['skipped']}) | "
+                f"디코딩 {s['decode_calls']}회, {s['decodes_per_sec']:.1f}/s, {s['mpixels_decoded']:.1f}MP | "
+                f"CPU {s['cpu_percent']:.1f}% ({s['cpu_ms_per_frame']:.2f}ms/프레임)")
+
+
+class FullFrameDecoder:
+    """기존 방식: 매 프레임 원본 해상도 전체를 디코딩합니다."""
+
+    def __init__(self, decode_fn):
+        self.decode_fn = decode_fn
+        self.stats = DecodeStats()
+
+    def __call__(self, frame):
+        t0 = time.thread_time()
+        results = to_results(self.decode_fn(frame))
+        self.stats.frames += 1
+        self.stats.decode_calls += 1
+        self.stats.decoded_pixels += frame.shape[0] * frame.shape[1]
+        self.stats.cpu_seconds += time.thread_time() - t0
+        return results
+
+
+class MotionGatedDecoder:
+    """움직임이 있을 때만, 필요한 영역만 디코딩하는 디코더.
+
+    1. 축소한 그레이스케일 프레임끼리 NumPy로 차분해 장면이 정지해 있으면 디코딩을 건너뛰고
+       직전 결과를 그대로 돌려줍니다.
+    2. 움직임이 있으면 축소 그레이스케일 전체 프레임을 한 번 디코딩해 새 바코드를 찾고(discovery),
+    3. 변화가 생긴 영역과 마지막으로 인식된 바코드 rect 주변만 원본 해상도로 잘라 디코딩합니다.
+
+    직전 프레임을 상태로 가지므로 여러 스레드에서 호출해도 한 번에 하나씩 처리합니다.
+    """
+
+    def __init__(self, decode_fn, diff_scale=0.25, diff_threshold=20, motion_ratio=0.002,
+                 discovery_scale=0.5, block=8, roi_margin=24, max_roi_ratio=0.5,
+                 refresh_interval=60):
+        self.decode_fn = decode_fn
+        self.diff_scale = diff_scale
+        self.diff_threshold = diff_threshold
+        self.motion_ratio = motion_ratio
+        self.discovery_scale = discovery_scale
+        self.block = block
+        self.roi_margin = roi_margin
+        self.max_roi_ratio = max_roi_ratio
+        self.refresh_interval = refresh_interval  # 정지 상태에서도 이 프레임 수마다 한 번은 다시 확인
+
+        self.prev_small = None
+        self.last_results = []
+        self.idle_frames = 0
+        self.lock = threading.Lock()
+        self.stats = DecodeStats()
+
+    def __call__(self, frame):
+        with self.lock:
+            t0 = time.thread_time()
+            try:
+                return self._decode(frame)
+            finally:
+                self.stats.frames += 1
+                self.stats.cpu_seconds += time.thread_time() - t0
+
+    def motion_mask(self, small):
+        """직전 프레임과 달라진 픽셀 마스크. 첫 프레임이면 None."""
+        prev, self.prev_small = self.prev_small, small
+        if prev is None or prev.shape != small.shape:
+            return None
+        diff = np.abs(small.astype(np.int16) - prev.astype(np.int16))
+        return diff > self.diff_threshold
+
+    def changed_rois(self, mask, frame_shape):
+        """변화 마스크를 블록 단위로 묶어 원본 해상도 기준 (x, y, w, h) 목록으로 만듭니다."""
+        b = self.block
+        bh, bw = mask.shape[0] // b, mask.shape[1] // b
+        if bh == 0 or bw == 0:
+            return []
+        blocks = mask[:bh * b, :bw * b].reshape(bh, b, bw, b).any(axis=(1, 3))
+        n, _, comp, _ = cv2.connectedComponentsWithStats(blocks.astype(np.uint8), connectivity=8)
+        unit = b / self.diff_scale
+        return [tuple(int(v * unit) for v in comp[i, :4]) for i in range(1, n)]
+
+    def expand(self, rect, frame_shape):
+        x, y, w, h = rect
+        m = self.roi_margin
+        H, W = frame_shape[:2]
+        x0, y0 = max(0, x - m), max(0, y - m)
+        x1, y1 = min(W, x + w + m), min(H, y + h + m)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        return x0, y0, x1, y1
+
+    def _run(self, img, offset=(0, 0), scale=1.0):
+        self.stats.decode_calls += 1
+        self.stats.decoded_pixels += img.shape[0] * img.shape[1]
+        return to_results(self.decode_fn(img), offset, scale)
+
+    def _decode(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        small = cv2.resize(gray, None, fx=self.diff_scale, fy=self.diff_scale,
+                           interpolation=cv2.INTER_AREA)
+        mask = self.motion_mask(small)
+
+        moving = mask is None or mask.mean() >= self.motion_ratio
+        if not moving and self.idle_frames < self.refresh_interval:
+            self.idle_frames += 1
+            self.stats.skipped += 1
+            return list(self.last_results)
+        self.idle_frames = 0
+
+        # discovery: 축소 그레이스케일 전체 프레임
+        s = self.discovery_scale
+        found = {}
+        small_full = cv2.resize(gray, None, fx=s, fy=s, interpolation=cv2.INTER_AREA)
+        for r in self._run(small_full, scale=s):
+            found[(r["data"], r["type"])] = r
+
+        # 변화 영역 + 마지막 바코드 위치를 원본 해상도로 디코딩
+        rois = [] if mask is None else self.changed_rois(mask, gray.shape)
+        rois += [r["rect"] for r in self.last_results]
+        boxes = [b for b in (self.expand(r, gray.shape) for r in rois) if b is not None]
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in boxes)
+        if area <= self.max_roi_ratio * gray.shape[0] * gray.shape[1]:
+            for x0, y0, x1, y1 in boxes:
+                for r in self._run(gray[y0:y1, x0:x1], offset=(x0, y0)):
+                    # 원본 해상도 결과의 rect가 더 정확하므로 덮어씀
+                    found[(r["data"], r["type"])] = r
+        else:
+            # 화면 대부분이 바뀌었으면 ROI 여러 개보다 원본 전체 한 번이 싸다
+            for r in self._run(gray):
+                found[(r["data"], r["type"])] = r
+
+        self.last_results = list(found.values())
+        return list(self.last_results)
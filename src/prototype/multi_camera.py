@@ -0,0 +1,248 @@
+import argparse
+import json
+import multiprocessing as mp
+import os
+import queue
+import sys
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from product_index import ProductIndex
+
+READ_INTERVAL = 2.0  # 같은 바코드를 다시 입고로 보지 않는 시간 (카메라와 무관)
+
+
+class SharedProductIndex:
+    """ProductIndex의 배열들을 하나의 공유 메모리 블록에 올려 여러 프로세스가 복사 없이 읽게 합니다.
+
+    create()는 부모 프로세스에서 한 번 호출하고, 자식 프로세스는 descriptor로 attach()합니다.
+    카메라를 늘려도 인덱스는 메모리에 한 벌만 존재합니다.
+    """
+
+    ALIGN = 64
+
+    @classmethod
+    def create(cls, index):
+        layout, offset = [], 0
+        for name in ProductIndex.ARRAYS:
+            arr = getattr(index, name)
+            offset = (offset + cls.ALIGN - 1) // cls.ALIGN * cls.ALIGN
+            layout.append((name, arr.dtype.str, arr.shape, offset))
+            offset += arr.nbytes
+        shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for name, dtype, shape, off in layout:
+            src = getattr(index, name)
+            np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)[...] = src
+        # 숫자가 아닌 코드(extra)는 작아서 공유 메모리 대신 descriptor에 담아 넘김
+        return shm, {"name": shm.name, "layout": layout, "size": offset, "extra": index.extra}
+
+    @staticmethod
+    def attach(descriptor):
+        """(공유 메모리 핸들, 읽기 전용 ProductIndex)를 반환합니다. 핸들은 사용이 끝날 때까지 살아 있어야 합니다."""
+        # 워커는 부모의 resource_tracker를 물려받으므로 attach로 블록이 지워지지 않음 (unlink는 부모만)
+        shm = shared_memory.SharedMemory(name=descriptor["name"])
+        arrays = []
+        for name, dtype, shape, off in descriptor["layout"]:
+            arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)
+            arr.flags.writeable = False
+            arrays.append(arr)
+        return shm, ProductIndex(*arrays, extra=descriptor.get("extra"))
+
+
+def parse_source(source):
+    """'0', '1' 같은 숫자는 카메라 번호로, 나머지는 영상 파일 경로로 봅니다."""
+    return int(source) if source.isdigit() else source
+
+
+def probe_cameras(max_index=5):
+    """test1.py처럼 0~max_index-1번 카메라를 차례로 열어 보고 열리는 번호 목록을 반환합니다."""
+    import cv2
+    found = []
+    for idx in range(max_index):
+        cap = cv2.VideoCapture(idx)
+        if cap.isOpened():
+            found.append(str(idx))
+        cap.release()
+    return found
+
+
+def peak_rss_mb():
+    """프로세스의 최대(peak) RSS를 MB로 반환합니다. 알 수 없으면 None."""
+    try:
+        import resource  # Unix 전용
+    except ImportError:
+        resource = None
+    if resource is not None:
+        # ru_maxrss 단위는 Linux는 KiB, macOS는 바이트
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024.0 * 1024.0) if sys.platform == "darwin" else peak / 1024.0
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    # Windows는 peak_wset이 최대 작업 집합
+    return getattr(info, "peak_wset", info.rss) / (1024.0 * 1024.0)
+
+
+def camera_worker(cam_id, source, descriptor, events, stop, decode_mode="full", realtime=False,
+                  stats_interval=2.0):
+    """카메라(또는 영상 파일) 하나를 맡는 워커 프로세스."""
+    import cv2
+    from barcode_food_manager import make_decoder
+
+    shm, index = SharedProductIndex.attach(descriptor)
+    cap = cv2.VideoCapture(parse_source(source))
+    if not cap.isOpened():
+        events.put(("error", cam_id, f"카메라/영상을 열 수 없습니다: {source}"))
+        shm.close()
+        return
+    frame_interval = 1.0 / (cap.get(cv2.CAP_PROP_FPS) or 30.0) if realtime else 0.0
+    decoder = make_decoder(decode_mode)
+    frames = 0
+    started = last_stats = time.monotonic()
+    try:
+        while not stop.is_set():
+            t0 = time.monotonic()
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames += 1
+            bars = decoder(frame)
+            if bars:
+                infos = index.lookup_many([b["data"] for b in bars])
+                now = time.time()
+                for b, info in zip(bars, infos):
+                    events.put(("scan", cam_id, now, b["data"], b["type"], list(b["rect"]), info))
+            if time.monotonic() - last_stats >= stats_interval:
+                last_stats = time.monotonic()
+                events.put(("stats", cam_id, frames, frames / (last_stats - started),
+                            decoder.stats.decode_calls, peak_rss_mb()))
+            if frame_interval:
+                time.sleep(max(0.0, frame_interval - (time.monotonic() - t0)))
+    finally:
+        elapsed = max(time.monotonic() - started, 1e-9)
+        events.put(("stats", cam_id, frames, frames / elapsed, decoder.stats.decode_calls, peak_rss_mb()))
+        events.put(("done", cam_id))
+        cap.release()
+        del index
+        shm.close()
+
+
+class EventMerger:
+    """여러 카메라의 인식 결과를 하나의 입고 이벤트 스트림으로 합칩니다.
+    같은 바코드가 READ_INTERVAL 안에 다시 보이면 어느 카메라든 중복으로 보고 버립니다."""
+
+    def __init__(self, interval=READ_INTERVAL):
+        self.interval = interval
+        self.last_seen = {}
+        self.merged = 0
+        self.duplicates = 0
+
+    def accept(self, code, ts):
+        last = self.last_seen.get(code)
+        self.last_seen[code] = ts
+        if last is not None and ts - last < self.interval:
+            self.duplicates += 1
+            return False
+        self.merged += 1
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="여러 카메라(또는 영상 파일)를 동시에 스캔해 하나의 입고 이벤트로 합침")
+    parser.add_argument("sources", nargs="+", help="카메라 번호(0, 1, ...), 영상 파일 경로, 또는 auto (0~4번 자동 탐색)")
+    parser.add_argument("--db", default="product_db.csv")
+    parser.add_argument("--decode-mode", choices=["full", "motion"], default="motion")
+    parser.add_argument("--out", help="합쳐진 입고 이벤트를 기록할 JSON Lines 파일 (기본: 표준 출력)")
+    parser.add_argument("--inventory", help="입고 이벤트를 기록할 SQLite 재고 파일")
+    parser.add_argument("--realtime", action="store_true", help="영상 파일을 원래 fps 속도로 재생")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"🚨 오류: '{args.db}' 파일을 찾을 수 없습니다.", file=sys.stderr)
+        return
+
+    if args.sources == ["auto"]:
+        args.sources = probe_cameras()
+        if not args.sources:
+            print("다양한 카메라를 시도해도 열리지 않습니다.", file=sys.stderr)
+            return
+        print(f"카메라 {', '.join(args.sources)} 열림!", file=sys.stderr)
+
+    index, _ = ProductIndex.load_or_build(args.db)
+    shm, descriptor = SharedProductIndex.create(index)
+    del index
+    print(f"공유 상품 인덱스 {descriptor['size'] / 1e6:.1f}MB ({shm.name})", file=sys.stderr)
+
+    inventory = None
+    if args.inventory:
+        from inventory_store import InventoryStore
+        inventory = InventoryStore(args.inventory)
+
+    events = mp.Queue(maxsize=10_000)
+    stop = mp.Event()
+    workers = [mp.Process(target=camera_worker, name=f"camera-{i}",
+                          args=(i, src, descriptor, events, stop, args.decode_mode, args.realtime))
+               for i, src in enumerate(args.sources)]
+    for w in workers:
+        w.start()
+
+    out = open(args.out, "w", encoding="utf-8") if args.out else sys.stdout
+    merger = EventMerger()
+    stats = {}
+    running = len(workers)
+    started = time.monotonic()
+    try:
+        while running:
+            try:
+                msg = events.get(timeout=0.5)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            kind = msg[0]
+            if kind == "scan":
+                _, cam_id, ts, code, typ, rect, info = msg
+                if not merger.accept(code, ts):
+                    continue
+                record = {"ts": ts, "camera": cam_id, "code": code, "type": typ, "rect": rect, "product": info}
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if inventory is not None:
+                    name = info["name"] if info else "미등록 상품"
+                    inventory.add(code, name, info["exp"] if info else None, ts=ts, source=f"camera-{cam_id}")
+            elif kind == "stats":
+                stats[msg[1]] = msg[2:]
+            elif kind == "error":
+                print(msg[2], file=sys.stderr)
+            elif kind == "done":
+                running -= 1
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        for w in workers:
+            w.join(timeout=5.0)
+        if out is not sys.stdout:
+            out.close()
+        if inventory is not None:
+            inventory.close()
+        shm.close()
+        shm.unlink()
+
+    elapsed = max(time.monotonic() - started, 1e-9)
+    total_frames = 0
+    for cam_id in sorted(stats):
+        frames, fps, decodes, rss = stats[cam_id]
+        total_frames += frames
+        print(f"[camera-{cam_id}] {args.sources[cam_id]} | 프레임 {frames} ({fps:.1f} fps) | "
+              f"디코딩 {decodes}회 | 최대 RSS {'n/a' if rss is None else f'{rss:.0f}MB'}", file=sys.stderr)
+    print(f"전체 {total_frames / elapsed:.1f} fps | 입고 이벤트 {merger.merged}건 (중복 제거 {merger.duplicates}건)",
+          file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,208 @@
+import importlib.util
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from metrics import registry as metrics
+
+# EasyOCR 설치 여부만 확인 (import와 모델 로드는 실제로 OCR을 요청할 때 처음 한 번)
+HAVE_EASYOCR = importlib.util.find_spec("easyocr") is not None
+
+_readers = {}
+_reader_lock = threading.Lock()
+
+
+def get_reader(langs=('en', 'ko'), gpu=False):
+    """EasyOCR 리더를 처음 호출될 때 한 번만 만들고 이후에는 공유합니다."""
+    key = (tuple(langs), gpu)
+    reader = _readers.get(key)
+    if reader is None:
+        with _reader_lock:
+            reader = _readers.get(key)
+            if reader is None:
+                if not HAVE_EASYOCR:
+                    raise ImportError("easyocr가 설치되어 있지 않습니다: pip install easyocr")
+                import easyocr
+                reader = easyocr.Reader(list(langs), gpu=gpu)
+                _readers[key] = reader
+    return reader
+
+
+def text_regions(gray, max_regions=4, min_height=8):
+    """그레이스케일 이미지에서 글자 줄처럼 보이는 영역 (x, y, w, h)를 큰 순서로 찾습니다."""
+    kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (3, 3))
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, kernel)
+    _, bw = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    # 가로로 이어 붙여 글자들을 한 줄 덩어리로 만듦
+    line_kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (15, 3))
+    bw = cv2.morphologyEx(bw, cv2.MORPH_CLOSE, line_kernel)
+    contours, _ = cv2.findContours(bw, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    boxes = []
+    for c in contours:
+        x, y, w, h = cv2.boundingRect(c)
+        if h < min_height or w < 2 * h:
+            continue
+        # 바코드 막대처럼 꽉 찬 영역은 제외하고 글자처럼 듬성한 영역만 남김
+        fill = cv2.countNonZero(bw[y:y + h, x:x + w]) / float(w * h)
+        if 0.2 < fill < 0.95:
+            boxes.append((x, y, w, h))
+    boxes.sort(key=lambda b: b[2] * b[3], reverse=True)
+    return boxes[:max_regions]
+
+
+def pad_batch(crops, fill=255):
+    """크기가 다른 crop들을 같은 크기로 패딩해 한 번에 추론할 수 있게 합니다."""
+    h = max(c.shape[0] for c in crops)
+    w = max(c.shape[1] for c in crops)
+    batch = []
+    for c in crops:
+        canvas = np.full((h, w) + c.shape[2:], fill, dtype=c.dtype)
+        canvas[:c.shape[0], :c.shape[1]] = c
+        batch.append(canvas)
+    return batch
+
+
+class OcrEngine:
+    """바코드 주변만 잘라 배치로 OCR하고, 찾은 유통기한을 상품 코드별로 캐시하는 엔진.
+
+    extract_fn(texts)는 OCR 문자열 목록에서 날짜를 찾아 반환하고 없으면 None을 반환해야 합니다.
+    날짜를 못 찾은 코드는 retry_interval초, OCR 중 예외가 난 코드는 error_ttl초가 지난 뒤에만 다시 OCR합니다.
+    on_result(code, value)를 주면 OCR이 끝날 때마다 (실패하면 value=None) OCR 스레드에서 호출합니다.
+    """
+
+    def __init__(self, extract_fn, preprocess=None, min_conf=0.4, langs=('en', 'ko'), gpu=False,
+                 cache_size=4096, retry_interval=3.0, error_ttl=10.0, max_regions=4, on_result=None):
+        self.extract_fn = extract_fn
+        self.on_result = on_result
+        self.preprocess = preprocess
+        self.min_conf = min_conf
+        self.langs = langs
+        self.gpu = gpu
+        self.cache_size = cache_size
+        self.retry_interval = retry_interval
+        self.error_ttl = error_ttl
+        self.max_regions = max_regions
+
+        self.cache = OrderedDict()  # code -> (날짜 또는 None, 다시 OCR할 시각)
+        self.lock = threading.Lock()
+        self.pending = set()
+        self.executor = None
+        self.ocr_calls = 0
+        self.cache_hits = 0
+        self.ocr_errors = 0
+
+    @property
+    def reader(self):
+        return get_reader(self.langs, self.gpu)
+
+    def read_batch(self, crops):
+        """crop 목록을 한 번에 OCR해 crop별 문자열 목록을 반환합니다."""
+        if not crops:
+            return []
+        if self.preprocess is not None:
+            crops = [self.preprocess(c) for c in crops]
+        self.ocr_calls += 1
+        reader = self.reader
+        if len(crops) > 1 and hasattr(reader, "readtext_batched"):
+            results = reader.readtext_batched(pad_batch(crops))
+        else:
+            results = [reader.readtext(c) for c in crops]
+        return [[r[1] for r in res if r[2] >= self.min_conf] for res in results]
+
+    def candidate_crops(self, frame, rect):
+        """바코드 rect 주변 (위/아래로 넓힌 영역)에서 글자처럼 보이는 부분만 잘라냅니다."""
+        x, y, w, h = rect
+        H, W = frame.shape[:2]
+        x0, x1 = max(0, x - w // 2), min(W, x + w + w // 2)
+        y0, y1 = max(0, y - 2 * h), min(H, y + 3 * h)
+        if x1 <= x0 or y1 <= y0:
+            return []
+        window = frame[y0:y1, x0:x1]
+        gray = cv2.cvtColor(window, cv2.COLOR_BGR2GRAY) if window.ndim == 3 else window
+
+        crops = []
+        for bx, by, bw, bh in text_regions(gray, self.max_regions):
+            # 바코드 영역 자체는 제외
+            if x0 + bx >= x and x0 + bx + bw <= x + w and y0 + by >= y and y0 + by + bh <= y + h:
+                continue
+            crops.append(window[max(0, by - 4):by + bh + 4, max(0, bx - 4):bx + bw + 4].copy())
+        return crops or [window.copy()]
+
+    def cached(self, code):
+        """캐시된 유통기한을 반환합니다. (찾음 여부, 값)"""
+        with self.lock:
+            entry = self.cache.get(code)
+            if entry is None:
+                return False, None
+            value, retry_at = entry
+            if value is None and time.monotonic() >= retry_at:
+                return False, None
+            self.cache.move_to_end(code)
+            self.cache_hits += 1
+            return True, value
+
+    def store(self, code, value, ttl=None):
+        """결과를 캐시합니다. 값이 None이면 ttl초(기본 retry_interval) 뒤에 다시 OCR합니다."""
+        retry_at = time.monotonic() + (self.retry_interval if ttl is None else ttl)
+        with self.lock:
+            self.cache[code] = (value, retry_at)
+            self.cache.move_to_end(code)
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+
+    def _ocr(self, code, crops):
+        """crop들을 OCR해 날짜를 찾고 캐시합니다. 예외가 나면 기록해 두고 error_ttl 동안은 다시 시도하지 않습니다."""
+        try:
+            texts = [t for res in self.read_batch(crops) for t in res]
+            value = self.extract_fn(texts)
+        except Exception as e:
+            self.ocr_errors += 1
+            metrics.inc("ocr_errors")
+            print(f"⚠️ OCR 실패 ({code}): {type(e).__name__}: {e}")
+            self.store(code, None, ttl=self.error_ttl)
+            value = None
+        else:
+            self.store(code, value)
+        if self.on_result is not None:
+            self.on_result(code, value)
+        return value
+
+    def _run(self, code, crops):
+        try:
+            self._ocr(code, crops)
+        finally:
+            with self.lock:
+                self.pending.discard(code)
+
+    def exp_for(self, code, frame, rect):
+        """바코드 code의 유통기한을 동기적으로 구합니다 (캐시에 있으면 OCR하지 않음)."""
+        hit, value = self.cached(code)
+        if hit:
+            return value
+        return self._ocr(code, self.candidate_crops(frame, rect))
+
+    def exp_async(self, code, frame, rect):
+        """캐시에 있으면 바로 반환하고, 없으면 백그라운드 OCR을 예약한 뒤 None을 반환합니다.
+        캡처/렌더 루프가 OCR 추론 때문에 멈추지 않도록 할 때 사용합니다."""
+        hit, value = self.cached(code)
+        if hit:
+            return value
+        with self.lock:
+            if code in self.pending:
+                return None
+            self.pending.add(code)
+            if self.executor is None:
+                self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ocr")
+        # crop은 복사본이므로 이후 프레임에 오버레이를 그려도 영향 없음
+        self.executor.submit(self._run, code, self.candidate_crops(frame, rect))
+        return None
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
@@ -0,0 +1,411 @@
+import datetime
+import json
+import os
+import shutil
+
+import numpy as np
+
+# pandas는 CSV를 새로 읽을 때만 필요하므로 함수 안에서 import (스냅샷 로드는 numpy만 사용)
+
+# 유통기한이 없거나 날짜 형식이 아닐 때 사용하는 값
+EXP_MISSING = np.iinfo(np.int32).min
+EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+
+
+# 스냅샷 배열 형식. 키 형식이 바뀌면 올려서 예전 스냅샷을 다시 만들게 함
+SNAPSHOT_FORMAT = 2
+
+# 숫자 바코드 키 = (자릿수 << KEY_LEN_SHIFT) | 값. 자릿수를 함께 넣어 0123과 123이 다른 키가 됨
+KEY_LEN_SHIFT = 59
+MAX_KEY_DIGITS = 17  # 10**17 < 2**59
+
+
+def code_key(code):
+    """숫자 바코드 문자열을 정수 키로 변환합니다. 숫자가 아니거나 17자리를 넘으면 None을 반환합니다.
+    (문자열이 다르면 키도 다르므로 앞자리 0도 구분합니다.)"""
+    code = str(code).strip()
+    if not code or len(code) > MAX_KEY_DIGITS or not code.isascii() or not code.isdigit():
+        return None
+    return (len(code) << KEY_LEN_SHIFT) | int(code)
+
+
+def numeric_keys(values, digits):
+    """digits자리 숫자 바코드 값 배열을 code_key와 같은 키 배열(uint64)로 바꿉니다."""
+    return np.asarray(values, dtype=np.uint64) | np.uint64(digits << KEY_LEN_SHIFT)
+
+
+def key_code(key):
+    """code_key의 역변환: 키에서 원래 바코드 문자열을 만듭니다."""
+    key = int(key)
+    return str(key & ((1 << KEY_LEN_SHIFT) - 1)).zfill(key >> KEY_LEN_SHIFT)
+
+
+def index_key(code):
+    """조회/변경에 쓰는 키: 숫자 바코드는 code_key, 그 밖의 코드(QR 등)는 앞뒤 공백을 뺀 문자열. 빈 코드는 None."""
+    key = code_key(code)
+    if key is not None:
+        return key
+    if code is None or (isinstance(code, float) and code != code):
+        return None
+    return str(code).strip() or None
+
+
+def exp_to_days(values):
+    """'YYYY-MM-DD' 문자열 배열을 1970-01-01 기준 일수(int32)로 변환합니다."""
+    import pandas as pd
+    values = pd.Series(values, dtype=object).astype(str).str.strip()
+    dates = pd.to_datetime(values, format="%Y-%m-%d", errors="coerce")
+    arr = dates.to_numpy().astype("datetime64[D]")
+    days = arr.astype(np.int64)
+    days[np.isnat(arr)] = EXP_MISSING
+    return days.astype(np.int32)
+
+
+def exp_to_day(value):
+    """exp_to_days의 한 값 버전. 몇 행만 바뀔 때 pandas를 import하지 않도록 씁니다."""
+    parts = str(value).strip().split("-")
+    if ([len(p) <= 2 for p in parts] != [False, True, True] or len(parts[0]) != 4
+            or not all(p.isascii() and p.isdigit() for p in parts)):
+        return int(EXP_MISSING)
+    try:
+        return datetime.date(*map(int, parts)).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return int(EXP_MISSING)
+
+
+def days_to_exp(days):
+    if days == EXP_MISSING:
+        return "N/A"
+    return datetime.date.fromordinal(EPOCH_ORDINAL + int(days)).isoformat()
+
+
+def clean_name(name):
+    # CSV의 빈 칸은 pandas에서 NaN으로 들어옴
+    return "" if name is None or (isinstance(name, float) and name != name) else str(name)
+
+
+def encode_names(names):
+    """상품명 목록을 하나의 UTF-8 바이트 배열과 오프셋 배열로 압축합니다."""
+    encoded = [clean_name(n).encode("utf-8") for n in names]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(e) for e in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def default_snapshot_dir(csv_path):
+    return os.path.splitext(csv_path)[0] + ".idx"
+
+
+def source_signature(path):
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def snapshot_is_fresh(snapshot_dir, csv_path):
+    """스냅샷이 있고 CSV의 크기/수정 시각이 스냅샷을 만들 때와 같으면 True."""
+    try:
+        with open(os.path.join(snapshot_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        return meta.get("format") == SNAPSHOT_FORMAT and meta.get("source") == source_signature(csv_path)
+    except (OSError, ValueError):
+        return False
+
+
+def make_snapshot_tmp(snapshot_dir):
+    tmp = f"{snapshot_dir}.tmp{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    return tmp
+
+
+def install_snapshot(tmp, snapshot_dir, rows, source=None):
+    """임시 디렉터리에 다 쓴 스냅샷에 meta.json을 붙이고 snapshot_dir과 교체합니다."""
+    meta = {"rows": rows, "format": SNAPSHOT_FORMAT, "source": source_signature(source) if source else None}
+    with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    old = f"{snapshot_dir}.old{os.getpid()}"
+    if os.path.exists(snapshot_dir):
+        os.replace(snapshot_dir, old)
+    os.replace(tmp, snapshot_dir)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+class ProductIndex:
+    """숫자 바코드를 정수 키(code_key)로 바꾼 정렬 배열 기반 상품 인덱스.
+
+    DataFrame 전체를 비교하는 query_product와 달리 이진 탐색(O(log n))으로 조회하며,
+    상품명은 UTF-8 바이트 배열 + 오프셋, 유통기한은 int32 일수로 압축해 저장합니다.
+    정수 키로 만들 수 없는 코드(QR/Code128 문자열 등)는 extra({코드: (상품명, 유통기한 일수)})에 둡니다.
+    """
+
+    def __init__(self, codes, name_blob, name_offsets, exp_days, extra=None):
+        # codes는 오름차순으로 정렬되어 있고 중복이 없어야 합니다.
+        self.codes = np.asarray(codes, dtype=np.uint64)
+        self.name_blob = np.asarray(name_blob, dtype=np.uint8)
+        self.name_offsets = np.asarray(name_offsets, dtype=np.int64)
+        self.exp_days = np.asarray(exp_days, dtype=np.int32)
+        self.extra = extra or {}
+
+    def __len__(self):
+        return len(self.codes) + len(self.extra)
+
+    @classmethod
+    def from_records(cls, codes, names, exps):
+        names, exps = list(names), list(exps)
+        keys = [index_key(c) for c in codes]
+        valid = np.array([isinstance(k, int) for k in keys], dtype=bool)
+        key_arr = np.array([k if isinstance(k, int) else 0 for k in keys], dtype=np.uint64)[valid]
+        exp_days = exp_to_days(exps)
+
+        # 숫자가 아닌 코드는 작은 dict로 (중복이면 먼저 나온 행)
+        extra = {}
+        for k, name, day in zip(keys, names, exp_days.tolist()):
+            if isinstance(k, str) and k not in extra:
+                extra[k] = (clean_name(name), day)
+        dropped = keys.count(None)
+        if dropped:
+            print(f"경고: 바코드가 비어 있는 {dropped}행은 상품 DB에서 제외했습니다.")
+
+        names = [n for n, ok in zip(names, valid) if ok]
+        exp_days = exp_days[valid]
+
+        # 중복 바코드는 query_product와 같이 먼저 나온 행을 사용
+        order = np.argsort(key_arr, kind="stable")
+        sorted_keys = key_arr[order]
+        _, first = np.unique(sorted_keys, return_index=True)
+        order = order[first]
+
+        blob, offsets = encode_names([names[i] for i in order])
+        return cls(key_arr[order], blob, offsets, exp_days[order], extra)
+
+    @classmethod
+    def from_dataframe(cls, db):
+        return cls.from_records(db["code"].tolist(), db["name"].tolist(), db["exp"].tolist())
+
+    @classmethod
+    def from_csv(cls, path):
+        import pandas as pd
+        db = pd.read_csv(path, dtype={"code": str}, encoding='utf-8-sig')
+        return cls.from_dataframe(db)
+
+    # --- 바이너리 스냅샷 ---
+
+    ARRAYS = ("codes", "name_blob", "name_offsets", "exp_days")
+
+    def save(self, snapshot_dir, source=None):
+        """배열들을 .npy 파일로 저장합니다. source(CSV 경로)의 크기/수정 시각을 함께 기록해
+        CSV가 바뀌었는지 확인할 수 있게 합니다. 다른 프로세스가 반쯤 쓴 스냅샷을 읽지 않도록
+        임시 디렉터리에 쓴 뒤 교체합니다."""
+        tmp = make_snapshot_tmp(snapshot_dir)
+        for name in self.ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+        if self.extra:
+            with open(os.path.join(tmp, "extra.json"), "w", encoding="utf-8") as f:
+                json.dump(self.extra, f, ensure_ascii=False)
+        install_snapshot(tmp, snapshot_dir, len(self), source)
+
+    @classmethod
+    def load(cls, snapshot_dir, mmap=True):
+        """스냅샷을 읽습니다. mmap이면 배열을 메모리 매핑하므로 행 수와 관계없이 바로 열립니다."""
+        mode = "r" if mmap else None
+        arrays = [np.load(os.path.join(snapshot_dir, f"{name}.npy"), mmap_mode=mode) for name in cls.ARRAYS]
+        extra = {}
+        extra_path = os.path.join(snapshot_dir, "extra.json")
+        if os.path.exists(extra_path):
+            with open(extra_path, encoding="utf-8") as f:
+                extra = {code: tuple(rec) for code, rec in json.load(f).items()}
+        return cls(*arrays, extra=extra)
+
+    @classmethod
+    def load_or_build(cls, csv_path, snapshot_dir=None):
+        """CSV에 대한 스냅샷이 최신이면 메모리 매핑해서 열고, 없거나 CSV가 바뀌었으면 새로 만듭니다.
+        (인덱스, 스냅샷 재생성 여부)를 반환합니다."""
+        snapshot_dir = snapshot_dir or default_snapshot_dir(csv_path)
+        if snapshot_is_fresh(snapshot_dir, csv_path):
+            return cls.load(snapshot_dir), False
+        index = cls.from_csv(csv_path)
+        try:
+            index.save(snapshot_dir, source=csv_path)
+        except OSError as e:
+            print(f"경고: 상품 DB 스냅샷을 저장하지 못했습니다 ({e})")
+        return index, True
+
+    def find(self, code):
+        """숫자 바코드의 행 번호를 반환합니다. 없거나 extra에 있는 코드면 -1."""
+        return self.find_key(code_key(code))
+
+    def find_key(self, key):
+        """code_key로 만든 키의 행 번호를 반환합니다. 없으면 -1."""
+        if key is None:
+            return -1
+        # 파이썬 int를 그대로 넘기면 배열 전체가 형변환되므로 uint64로 맞춰서 탐색
+        i = int(self.codes.searchsorted(np.uint64(key)))
+        if i < len(self.codes) and int(self.codes[i]) == key:
+            return i
+        return -1
+
+    def contains(self, key):
+        """index_key로 만든 키(정수 또는 문자열)가 있으면 True."""
+        if isinstance(key, str):
+            return key in self.extra
+        return self.find_key(key) >= 0
+
+    def find_many(self, codes):
+        """여러 바코드의 행 번호를 한 번에 찾습니다. 없는 바코드는 -1."""
+        keys = [code_key(c) for c in codes]
+        valid = np.array([k is not None for k in keys], dtype=bool)
+        key_arr = np.array([k if k is not None else 0 for k in keys], dtype=np.uint64)
+        rows = np.searchsorted(self.codes, key_arr)
+        in_range = rows < len(self.codes)
+        hit = valid & in_range
+        hit[hit] = self.codes[rows[hit]] == key_arr[hit]
+        return np.where(hit, rows, -1)
+
+    def name_at(self, i):
+        start, end = self.name_offsets[i], self.name_offsets[i + 1]
+        return self.name_blob[start:end].tobytes().decode("utf-8")
+
+    def exp_at(self, i):
+        return days_to_exp(self.exp_days[i])
+
+    def record(self, i, code):
+        return {"code": code, "name": self.name_at(i), "exp": self.exp_at(i)}
+
+    def extra_record(self, code):
+        rec = self.extra.get(str(code).strip()) if self.extra else None
+        if rec is None:
+            return None
+        return {"code": code, "name": rec[0], "exp": days_to_exp(rec[1])}
+
+    def lookup(self, code):
+        """query_product와 같은 형식의 dict를 반환합니다. 없으면 None."""
+        key = code_key(code)
+        if key is None:
+            return self.extra_record(code)
+        i = self.find_key(key)
+        if i < 0:
+            return None
+        return self.record(i, code)
+
+    def lookup_many(self, codes):
+        """여러 바코드를 한 번에 조회합니다. 결과는 입력 순서와 같고 없는 바코드는 None."""
+        codes = list(codes)
+        rows = self.find_many(codes)
+        results = [self.record(int(i), c) if i >= 0 else None for c, i in zip(codes, rows)]
+        if self.extra:
+            for j, c in enumerate(codes):
+                if results[j] is None:
+                    results[j] = self.extra_record(c)
+        return results
+
+    def merged(self, changes):
+        """changes({index_key 키: (상품명, 유통기한 일수) 또는 삭제면 None})를 반영한 새 인덱스를 반환합니다.
+
+        바뀐 행만 인코딩하고 나머지는 배열 복사(삭제는 마스크, 추가는 np.insert)로 처리하므로
+        CSV를 다시 읽는 것보다 훨씬 빠릅니다. 자신은 바꾸지 않습니다.
+        """
+        if not changes:
+            return self
+        extra = dict(self.extra)
+        for key, rec in changes.items():
+            if isinstance(key, str):
+                if rec is None:
+                    extra.pop(key, None)
+                else:
+                    extra[key] = rec
+        changes = {k: v for k, v in changes.items() if not isinstance(k, str)}
+        keys = np.array(sorted(changes), dtype=np.uint64)
+        rows = self.codes.searchsorted(keys)
+        present = rows < len(self.codes)
+        present[present] = self.codes[rows[present]] == keys[present]
+        keep = np.ones(len(self.codes), dtype=bool)
+        keep[rows[present]] = False
+
+        lengths = np.diff(self.name_offsets)
+        codes, exp_days = self.codes[keep], self.exp_days[keep]
+        blob = self.name_blob[np.repeat(keep, lengths)]
+        lengths = lengths[keep]
+
+        upserts = [(k, changes[int(k)]) for k in keys if changes[int(k)] is not None]
+        if upserts:
+            new_keys = np.array([k for k, _ in upserts], dtype=np.uint64)
+            new_blob, new_offsets = encode_names([name for _, (name, _) in upserts])
+            new_lengths = np.diff(new_offsets)
+            new_exp = np.array([day for _, (_, day) in upserts], dtype=np.int32)
+
+            at = codes.searchsorted(new_keys)
+            starts = np.concatenate([[0], np.cumsum(lengths)])
+            blob = np.insert(blob, np.repeat(starts[at], new_lengths), new_blob)
+            codes = np.insert(codes, at, new_keys)
+            exp_days = np.insert(exp_days, at, new_exp)
+            lengths = np.insert(lengths, at, new_lengths)
+
+        offsets = np.zeros(len(codes) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return ProductIndex(codes, blob, offsets, exp_days, extra)
+
+
+class SnapshotWriter:
+    """행 수를 미리 알 때 ProductIndex 스냅샷을 청크 단위로 쓰는 도구.
+
+    각 배열의 .npy 헤더를 먼저 쓰고 청크를 파일 끝에 이어 쓰며, 길이를 미리 알 수 없는 상품명 바이트는
+    임시 파일에 모았다가 close()에서 .npy로 옮기므로 메모리 사용량은 청크 크기에만 비례합니다.
+    append()에 넘기는 바코드 키(numeric_keys)는 청크 사이에서도 오름차순이어야 합니다.
+    """
+
+    def __init__(self, snapshot_dir, rows):
+        self.snapshot_dir = snapshot_dir
+        self.rows = rows
+        self.tmp = make_snapshot_tmp(snapshot_dir)
+        self.files = {
+            "codes": self._open_npy("codes", np.uint64, rows),
+            "name_offsets": self._open_npy("name_offsets", np.int64, rows + 1),
+            "exp_days": self._open_npy("exp_days", np.int32, rows),
+        }
+        self.files["name_offsets"].write(np.zeros(1, dtype=np.int64).tobytes())
+        self.blob_path = os.path.join(self.tmp, "name_blob.raw")
+        self.blob_file = open(self.blob_path, "wb")
+        self.written = 0
+        self.blob_size = 0
+        self.last_code = None
+
+    def _open_npy(self, name, dtype, length):
+        f = open(os.path.join(self.tmp, f"{name}.npy"), "wb")
+        header = {"descr": np.lib.format.dtype_to_descr(np.dtype(dtype)), "fortran_order": False, "shape": (length,)}
+        np.lib.format.write_array_header_1_0(f, header)
+        return f
+
+    def append(self, codes, name_blob, name_lengths, exp_days):
+        codes = np.asarray(codes, dtype=np.uint64)
+        n = len(codes)
+        if self.written + n > self.rows:
+            raise ValueError(f"행 수가 미리 정한 {self.rows}개를 넘습니다.")
+        if n and (np.any(codes[1:] <= codes[:-1]) or (self.last_code is not None and codes[0] <= self.last_code)):
+            raise ValueError("바코드는 중복 없이 오름차순으로 넘겨야 합니다.")
+        if len(name_lengths) != n or len(exp_days) != n:
+            raise ValueError(f"바코드 {n}개, 이름 길이 {len(name_lengths)}개, 유통기한 {len(exp_days)}개로 개수가 다릅니다.")
+        offsets = self.blob_size + np.cumsum(name_lengths, dtype=np.int64)
+        self.files["codes"].write(codes.tobytes())
+        self.files["name_offsets"].write(offsets.tobytes())
+        self.files["exp_days"].write(np.asarray(exp_days, dtype=np.int32).tobytes())
+        self.blob_file.write(np.asarray(name_blob, dtype=np.uint8).tobytes())
+        self.written += n
+        if n:
+            self.blob_size = int(offsets[-1])
+            self.last_code = codes[-1]
+
+    def close(self, source=None):
+        """스냅샷을 완성해 snapshot_dir에 설치합니다. source(CSV 경로)를 주면 load_or_build가 바로 사용합니다."""
+        for f in self.files.values():
+            f.close()
+        self.blob_file.close()
+        if self.written != self.rows:
+            shutil.rmtree(self.tmp, ignore_errors=True)
+            raise ValueError(f"{self.rows}행 중 {self.written}행만 쓰였습니다.")
+        with open(os.path.join(self.tmp, "name_blob.npy"), "wb") as out, open(self.blob_path, "rb") as raw:
+            header = {"descr": "|u1", "fortran_order": False, "shape": (self.blob_size,)}
+            np.lib.format.write_array_header_1_0(out, header)
+            shutil.copyfileobj(raw, out, 1 << 24)
+        os.remove(self.blob_path)
+        install_snapshot(self.tmp, self.snapshot_dir, self.rows, source)
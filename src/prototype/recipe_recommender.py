@@ -0,0 +1,359 @@
+import argparse
+import datetime
+import re
+import threading
+from functools import lru_cache
+
+import numpy as np
+
+from inventory_store import InventoryStore, to_day
+
+# 재료 이름. 앞쪽일수록 여러 레시피에 자주 쓰이는 재료 (합성 레시피의 재료 빈도에 사용)
+INGREDIENTS = (
+    "계란", "대파", "간장", "설탕", "마늘", "양파", "소금", "식용유", "참기름", "고춧가루",
+    "밥", "김치", "두부", "고추장", "우유", "햄", "감자", "당근", "된장", "밀가루",
+    "버터", "치즈", "후추", "돼지고기", "소고기", "닭고기", "애호박", "버섯", "김", "참치",
+    "식빵", "라면", "어묵", "떡", "콩나물", "시금치", "베이컨", "마요네즈", "케첩", "토마토",
+    "오이", "깻잎", "배추", "새우", "오징어", "멸치", "만두", "요구르트", "바나나", "사과",
+)
+
+# 상품명에 재료 이름 대신 들어가는 말 (상품명 → 재료)
+INGREDIENT_ALIASES = {
+    "계란": ("달걀",),
+    "햄": ("스팸", "소시지"),
+    "밥": ("햇반", "오뚜기밥", "즉석밥"),
+    "라면": ("비빔면", "짜파게티", "볶음면"),
+    "만두": ("교자",),
+    "요구르트": ("요거트", "액티비아"),
+    "밀가루": ("부침가루", "튀김가루"),
+    "돼지고기": ("삼겹살", "목살"),
+    "소고기": ("쇠고기", "불고기"),
+    "닭고기": ("닭가슴살",),
+}
+# 재료 이름이 들어 있지만 재료가 아닌 상품명 (새우깡 → 새우 아님)
+NOT_INGREDIENTS = ("새우깡", "햄버거")
+
+# 기본 제공 레시피 (README의 예: 우유 + 계란 → 프렌치토스트)
+BASIC_RECIPES = [
+    ("프렌치토스트", ("식빵", "계란", "우유", "버터", "설탕")),
+    ("계란찜", ("계란", "대파", "소금")),
+    ("계란말이", ("계란", "대파", "당근", "소금", "식용유")),
+    ("김치볶음밥", ("밥", "김치", "햄", "대파", "식용유", "계란")),
+    ("참치마요덮밥", ("밥", "참치", "마요네즈", "김", "간장")),
+    ("스팸마요덮밥", ("밥", "햄", "계란", "마요네즈", "간장")),
+    ("부대찌개", ("햄", "김치", "라면", "두부", "대파", "고추장", "고춧가루")),
+    ("라면", ("라면", "계란", "대파")),
+    ("김치찌개", ("김치", "돼지고기", "두부", "대파", "고춧가루")),
+    ("된장찌개", ("된장", "두부", "애호박", "양파", "감자")),
+    ("떡볶이", ("떡", "어묵", "고추장", "설탕", "대파")),
+    ("군만두", ("만두", "식용유", "간장")),
+    ("감자볶음", ("감자", "양파", "당근", "식용유", "소금")),
+    ("제육볶음", ("돼지고기", "고추장", "양파", "대파", "마늘", "설탕")),
+    ("불고기", ("소고기", "간장", "설탕", "양파", "마늘", "참기름")),
+    ("김치전", ("밀가루", "김치", "식용유")),
+    ("팬케이크", ("밀가루", "우유", "계란", "설탕", "버터")),
+    ("햄치즈토스트", ("식빵", "계란", "햄", "치즈", "케첩")),
+    ("요구르트 과일볼", ("요구르트", "바나나", "사과")),
+    ("시금치나물", ("시금치", "참기름", "간장", "마늘")),
+    ("콩나물국", ("콩나물", "대파", "마늘", "소금")),
+    ("두부조림", ("두부", "간장", "고춧가루", "대파", "설탕")),
+]
+
+SYNTHETIC_STYLES = ("볶음", "찌개", "조림", "무침", "덮밥", "전", "국", "샐러드", "구이", "찜")
+
+COVERAGE_WEIGHT = 1.0  # 레시피 재료를 모두 가지고 있으면 1점 (가진 재료 비율만큼)
+SCORE_DECIMALS = 9     # 순위 비교 전에 점수를 반올림할 자릿수
+SOON_DAYS = 3          # 결과의 "먼저 쓸 재료"에 넣을 남은 일수 (ExpiryAlertScheduler 기본 warn_days와 맞춤)
+
+# 한글 복합 명사는 끝 단어가 중심이므로 ("바나나맛 우유" → 우유) 상품명에서 가장 뒤에 나오는 재료를 씀
+_KEYWORDS = {word: ing for ing in INGREDIENTS for word in (ing, *INGREDIENT_ALIASES.get(ing, ()))}
+_KEYWORDS.update(dict.fromkeys(NOT_INGREDIENTS))
+_KEYWORD_RE = re.compile("|".join(map(re.escape, sorted(_KEYWORDS, key=len, reverse=True))))
+
+if hasattr(np, "bitwise_count"):
+    popcount = np.bitwise_count
+else:
+    _BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def popcount(words):
+        """uint64 배열 원소마다 켜진 비트 수 (numpy 2.0 미만용)."""
+        return _BYTE_BITS[words.view(np.uint8)].reshape(*words.shape, 8).sum(axis=-1)
+
+
+@lru_cache(maxsize=4096)
+def ingredient_of(name):
+    """상품명에서 재료 이름을 찾습니다 (없으면 None). 예: "서울우유" → "우유", "비비고 왕교자" → "만두"."""
+    if not name:
+        return None
+    found = None
+    for m in _KEYWORD_RE.finditer(name):
+        found = _KEYWORDS[m.group()]
+    return found
+
+
+def urgency(days_left):
+    """재료 하나의 임박 가중치. 오늘 만료 1, 내일 1/2, 사흘 뒤 1/4 ... 유통기한을 모르면 0."""
+    if days_left is None:
+        return 0.0
+    return 1.0 / (1 + max(days_left, 0))
+
+
+def synthetic_recipes(n, seed=0):
+    """재료 빈도가 치우친(자주 쓰는 재료가 많이 나오는) 합성 레시피 n개. 같은 seed면 같은 결과."""
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, len(INGREDIENTS) + 1) ** 0.8
+    sizes = rng.integers(2, 9, size=n)
+    # Gumbel top-k: 행마다 빈도 가중치로 중복 없이 재료를 뽑는 것을 한 번에 처리
+    keys = np.log(popularity / popularity.sum()) + rng.gumbel(size=(n, len(INGREDIENTS)))
+    order = np.argsort(-keys, axis=1)[:, :8]
+    recipes = []
+    for i in range(n):
+        ings = tuple(INGREDIENTS[j] for j in order[i, :sizes[i]])
+        recipes.append((f"{ings[0]} {SYNTHETIC_STYLES[i % len(SYNTHETIC_STYLES)]} #{i}", ings))
+    return recipes
+
+
+class RecipeRecommender:
+    """현재 재고로 만들 수 있는 레시피를 유통기한이 임박한 재료를 쓰는 순서로 추천합니다.
+
+    레시피 점수 = 가진 재료 비율 × COVERAGE_WEIGHT + 가진 재료들의 임박 가중치 합.
+    재료 → 레시피 역색인(postings)을 두고, 입고/출고로 어떤 재료의 보유 여부나 가장 빠른 유통기한이
+    바뀌면 그 재료가 들어가는 레시피의 점수만 더하고 뺍니다. 레시피마다 재료 비트셋(uint64 단어 배열)이
+    있어서 전체 다시 계산(rebuild)은 재고 비트셋과의 AND + popcount 한 번이고, 결과의 부족한 재료도
+    비트 연산으로 구합니다. 날짜가 바뀌면 만료된 품목을 빼고 한 번 전체를 다시 계산합니다.
+    """
+
+    def __init__(self, recipes, resolve=ingredient_of, clock=datetime.date.today):
+        self.resolve = resolve
+        self.clock = clock
+        self.ingredients = []  # 재료 id -> 이름
+        self.ingredient_ids = {}
+        self.names = []
+        rec_of, ing_of = [], []
+        for name, ings in recipes:
+            ids = sorted({self._intern(ing) for ing in ings})
+            if not ids:
+                continue
+            rec_of.extend([len(self.names)] * len(ids))
+            ing_of.extend(ids)
+            self.names.append(name)
+        n_recipes, n_ings = len(self.names), len(self.ingredients)
+        rec_of = np.array(rec_of, dtype=np.int32)
+        ing_of = np.array(ing_of, dtype=np.int32)
+
+        # 레시피별 재료 (CSR): recipe_ings[recipe_ptr[r]:recipe_ptr[r + 1]]
+        self.recipe_ptr = np.concatenate(([0], np.cumsum(np.bincount(rec_of, minlength=n_recipes))))
+        self.recipe_ings = ing_of
+        self.n_required = np.diff(self.recipe_ptr).astype(np.int16)
+        self.coverage = COVERAGE_WEIGHT / self.n_required
+        # 역색인: 재료 i가 들어가는 레시피 = postings[post_ptr[i]:post_ptr[i + 1]]
+        order = np.argsort(ing_of, kind="stable")
+        self.postings = rec_of[order]
+        self.post_ptr = np.concatenate(([0], np.cumsum(np.bincount(ing_of, minlength=n_ings))))
+        # 레시피 재료 비트셋
+        self.words = max(1, -(-n_ings // 64))
+        self.masks = np.zeros((n_recipes, self.words), dtype=np.uint64)
+        np.bitwise_or.at(self.masks, (rec_of, ing_of // 64), np.left_shift(np.uint64(1), (ing_of % 64).astype(np.uint64)))
+
+        self.lock = threading.Lock()
+        self.have = np.zeros(self.words, dtype=np.uint64)  # 재고 비트셋
+        self.stock = {}     # 재료 id -> {품목 id: 유통기한 일수 또는 None}
+        self.item_ing = {}  # 품목 id -> 재료 id
+        self.soonest = {}   # 재료 id -> 가장 빠른 유통기한 일수
+        self.weight = np.zeros(n_ings)                  # 재료별 현재 임박 가중치
+        self.matched = np.zeros(n_recipes, np.int16)    # 레시피별 가진 재료 수
+        self.score = np.zeros(n_recipes)
+        self.today = to_day(self.clock())
+        self.version = 0  # 점수가 바뀔 때마다 증가. 호출자는 이 값이 그대로면 top()을 다시 부를 필요가 없음
+
+    def _intern(self, ingredient):
+        ing = self.ingredient_ids.get(ingredient)
+        if ing is None:
+            ing = self.ingredient_ids[ingredient] = len(self.ingredients)
+            self.ingredients.append(ingredient)
+        return ing
+
+    def __len__(self):
+        return len(self.names)
+
+    # --- 재고 변경 ---
+
+    def _ingredient_of_item(self, item):
+        ingredient = self.resolve(item.get("name") or "")
+        return self.ingredient_ids.get(ingredient) if ingredient else None
+
+    def add_item(self, item):
+        """재고 품목(dict: id, name, exp)을 반영합니다. 레시피에 없는 재료이거나 이미 만료된 품목이면 False."""
+        ing = self._ingredient_of_item(item)
+        if ing is None:
+            return False
+        exp_day = to_day(item.get("exp"))
+        with self.lock:
+            self._roll_day()
+            if exp_day is not None and exp_day < self.today:
+                return False
+            self.stock.setdefault(ing, {})[item["id"]] = exp_day
+            self.item_ing[item["id"]] = ing
+            self._refresh(ing)
+        return True
+
+    def remove_item(self, item):
+        with self.lock:
+            ing = self.item_ing.pop(item["id"], None)
+            if ing is None:
+                return False
+            self.stock[ing].pop(item["id"], None)
+            self._refresh(ing)
+        return True
+
+    def on_inventory_event(self, kind, item):
+        """InventoryStore.add_listener에 등록해 입고/출고를 그대로 반영합니다. 반영했으면 True."""
+        if kind == "add":
+            return self.add_item(item)
+        if kind == "remove":
+            return self.remove_item(item)
+        if kind == "update":
+            # 유통기한만 바뀐 경우: 빼고 다시 넣음 (새 날짜가 이미 지났으면 빠진 채로 둠)
+            removed = self.remove_item(item)
+            return self.add_item(item) or removed
+        return False
+
+    def track_many(self, items):
+        """시작할 때 현재 재고 전체를 한 번에 등록합니다 (점수는 마지막에 한 번만 계산)."""
+        with self.lock:
+            self.today = to_day(self.clock())
+            for item in items:
+                ing = self._ingredient_of_item(item)
+                exp_day = to_day(item.get("exp"))
+                if ing is None or (exp_day is not None and exp_day < self.today):
+                    continue
+                self.stock.setdefault(ing, {})[item["id"]] = exp_day
+                self.item_ing[item["id"]] = ing
+            self._rebuild()
+
+    def _refresh(self, ing):
+        """재료 하나의 보유 여부/임박 가중치 변화를 그 재료가 들어가는 레시피 점수에만 반영합니다."""
+        stock = self.stock.get(ing)
+        if not stock:
+            self.stock.pop(ing, None)
+        days = [d for d in stock.values() if d is not None] if stock else []
+        soonest = min(days) if days else None
+        if soonest is None:
+            self.soonest.pop(ing, None)
+        else:
+            self.soonest[ing] = soonest
+        weight = urgency(None if soonest is None else soonest - self.today) if stock else 0.0
+        word, bit = divmod(ing, 64)
+        bit = np.uint64(1) << np.uint64(bit)
+        was = bool(self.have[word] & bit)
+        d_have = bool(stock) - was
+        d_weight = weight - self.weight[ing]
+        if not d_have and not d_weight:
+            return
+        self.version += 1
+        recipes = self.postings[self.post_ptr[ing]:self.post_ptr[ing + 1]]
+        if d_have:
+            self.have[word] ^= bit
+            self.matched[recipes] += d_have
+            self.score[recipes] += d_have * self.coverage[recipes] + d_weight
+        else:
+            self.score[recipes] += d_weight
+        self.weight[ing] = weight
+
+    def _roll_day(self):
+        today = to_day(self.clock())
+        if today == self.today:
+            return
+        self.today = today
+        for ing, stock in list(self.stock.items()):
+            for item_id, exp_day in list(stock.items()):
+                if exp_day is not None and exp_day < today:
+                    del stock[item_id]
+                    del self.item_ing[item_id]
+            if not stock:
+                del self.stock[ing]
+        self._rebuild()
+
+    def _rebuild(self):
+        """재고 비트셋과 임박 가중치로 모든 레시피 점수를 처음부터 다시 계산합니다."""
+        self.version += 1
+        self.have[:] = 0
+        self.weight[:] = 0.0
+        self.soonest = {}
+        for ing, stock in self.stock.items():
+            self.have[ing // 64] |= np.uint64(1) << np.uint64(ing % 64)
+            days = [d for d in stock.values() if d is not None]
+            if days:
+                self.soonest[ing] = min(days)
+            self.weight[ing] = urgency(self.soonest[ing] - self.today if days else None)
+        self.matched = popcount(self.masks & self.have).sum(axis=1).astype(np.int16)
+        self.score = self.matched * self.coverage + np.add.reduceat(self.weight[self.recipe_ings],
+                                                                    self.recipe_ptr[:-1])
+
+    # --- 조회 ---
+
+    def _bits(self, words):
+        return np.flatnonzero(np.unpackbits(words.view(np.uint8), bitorder="little"))
+
+    def top(self, k=5, max_missing=None):
+        """점수가 높은 레시피 k개. max_missing을 주면 부족한 재료가 그 이하인 레시피만 고릅니다."""
+        if k <= 0:
+            return []
+        with self.lock:
+            self._roll_day()
+            ok = self.matched > 0
+            if max_missing is not None:
+                ok &= (self.n_required - self.matched) <= max_missing
+            # 증분 갱신의 부동소수점 오차로 같은 점수가 갈리지 않도록 반올림한 점수로 비교하고, 같으면 레시피 순서대로
+            score = np.where(ok, np.round(self.score, SCORE_DECIMALS), -np.inf)
+            if k < len(score):
+                threshold = score[np.argpartition(-score, k - 1)[k - 1]]
+                best = np.flatnonzero(score >= threshold)
+            else:
+                best = np.flatnonzero(np.isfinite(score))
+            best = best[np.isfinite(score[best])]
+            best = best[np.lexsort((best, -score[best]))][:k]
+            have = self.have.copy()
+            soonest = dict(self.soonest)
+            today = self.today
+        results = []
+        for r in best:
+            ings = self.recipe_ings[self.recipe_ptr[r]:self.recipe_ptr[r + 1]]
+            use_first = sorted((soonest[i] - today, self.ingredients[i]) for i in ings
+                               if i in soonest and soonest[i] - today <= SOON_DAYS)
+            results.append({
+                "name": self.names[r],
+                "score": round(float(score[r]), 4),
+                "ingredients": [self.ingredients[i] for i in ings],
+                "missing": [self.ingredients[i] for i in self._bits(self.masks[r] & ~have)],
+                "use_first": [{"ingredient": name, "days_left": days} for days, name in use_first],
+            })
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 재고로 만들 수 있는 레시피 추천")
+    parser.add_argument("--inventory", default="inventory.db", help="재고 기록 SQLite 파일")
+    parser.add_argument("--synthetic", type=int, default=0, help="기본 레시피에 더할 합성 레시피 수")
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--max-missing", type=int, default=1, help="허용할 부족한 재료 수")
+    args = parser.parse_args()
+    if args.top < 1:
+        parser.error("--top은 1 이상이어야 합니다.")
+    if args.max_missing < 0:
+        parser.error("--max-missing은 0 이상이어야 합니다.")
+
+    recommender = RecipeRecommender(BASIC_RECIPES + synthetic_recipes(args.synthetic))
+    with InventoryStore(args.inventory) as inventory:
+        recommender.track_many(inventory.current_items())
+    for rec in recommender.top(args.top, args.max_missing):
+        line = f"🍳 {rec['name']} ({rec['score']:.2f}점)"
+        if rec["use_first"]:
+            line += " | 먼저 쓸 재료: " + ", ".join(f"{u['ingredient']}({u['days_left']}일)" for u in rec["use_first"])
+        if rec["missing"]:
+            line += " | 부족: " + ", ".join(rec["missing"])
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
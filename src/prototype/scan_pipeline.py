@@ -0,0 +1,203 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metrics import registry
+
+
+class DropOldestQueue:
+    """가득 차면 가장 오래된 항목을 버리는 bounded 큐.
+
+    화면에는 항상 최신 프레임이 보여야 하므로, 소비자가 느리면 기다리지 않고 오래된 프레임을 버립니다.
+    """
+
+    def __init__(self, maxsize, on_drop=None):
+        self.items = deque(maxlen=maxsize)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.dropped = 0
+        self.on_drop = on_drop
+
+    def put(self, item):
+        with self.cond:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop()
+            self.items.append(item)
+            self.cond.notify()
+
+    def get(self, timeout=None):
+        """항목을 하나 꺼냅니다. 큐가 닫혔거나 timeout이 지나면 None."""
+        with self.cond:
+            if not self.cond.wait_for(lambda: self.items or self.closed, timeout):
+                return None
+            if self.items:
+                return self.items.popleft()
+            return None
+
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def qsize(self):
+        return len(self.items)
+
+
+class ScanPipeline:
+    """캡처 스레드 → 디코딩 워커 풀 → 렌더 단계로 나눈 스캔 파이프라인.
+
+    각 단계는 DropOldestQueue로 연결됩니다. 렌더(cv2.imshow)는 메인 스레드에서만 동작하므로
+    호출하는 쪽이 next_result()로 가장 최신 결과를 받아 그립니다.
+    worker_type이 "process"이면 디코딩을 프로세스 풀에서 수행합니다 (decode_fn은 pickle 가능해야 함).
+    """
+
+    def __init__(self, cap, decode_fn, workers=2, worker_type="thread", queue_size=2,
+                 latency_window=300, metrics=registry):
+        if worker_type not in ("thread", "process"):
+            raise ValueError(f"worker_type은 'thread' 또는 'process'여야 합니다: {worker_type}")
+        self.cap = cap
+        self.decode_fn = decode_fn
+        self.workers = workers
+        self.worker_type = worker_type
+        self.metrics = metrics
+        on_drop = lambda: metrics.inc("frames_dropped")
+        self.frame_q = DropOldestQueue(queue_size, on_drop)
+        self.result_q = DropOldestQueue(queue_size, on_drop)
+        self.executor = None
+        self.threads = []
+        self.stop_event = threading.Event()
+        self.eof = threading.Event()
+        self.last_seq = -1
+        self.active_workers = 0
+        self.lock = threading.Lock()
+
+        # 통계
+        self.captured = 0
+        self.decoded = 0
+        self.rendered = 0
+        self.stale = 0  # 더 최신 프레임이 이미 그려져서 버린 결과
+        self.latencies = deque(maxlen=latency_window)
+        self.started_at = None
+
+    def start(self):
+        if self.worker_type == "process":
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.started_at = time.monotonic()
+        self.active_workers = self.workers
+        self.threads = [threading.Thread(target=self._capture_loop, name="capture", daemon=True)]
+        for i in range(self.workers):
+            self.threads.append(threading.Thread(target=self._decode_loop, name=f"decode-{i}", daemon=True))
+        for t in self.threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.frame_q.close()
+        self.result_q.close()
+        for t in self.threads:
+            t.join(timeout=2.0)
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _capture_loop(self):
+        seq = 0
+        while not self.stop_event.is_set():
+            with self.metrics.stage("capture"):
+                ret, frame = self.cap.read()
+            if not ret:
+                self.eof.set()
+                break
+            self.frame_q.put((seq, time.monotonic(), frame))
+            self.captured += 1
+            seq += 1
+        self.frame_q.close()
+
+    def _decode_loop(self):
+        try:
+            while not self.stop_event.is_set():
+                item = self.frame_q.get(timeout=0.5)
+                if item is None:
+                    if self.frame_q.closed:
+                        break
+                    continue
+                seq, t_capture, frame = item
+                with self.metrics.stage("decode"):
+                    if self.executor is not None:
+                        bars = self.executor.submit(self.decode_fn, frame).result()
+                    else:
+                        bars = self.decode_fn(frame)
+                self.metrics.inc("frames_decoded")
+                self.metrics.inc("barcodes_decoded", len(bars))
+                with self.lock:
+                    self.decoded += 1
+                self.result_q.put((seq, t_capture, frame, bars))
+        finally:
+            with self.lock:
+                self.active_workers -= 1
+                if self.active_workers == 0:
+                    self.result_q.close()
+
+    def next_result(self, timeout=0.1):
+        """렌더할 가장 최신 결과 (seq, t_capture, frame, bars)를 반환합니다.
+
+        이미 그린 프레임보다 오래된 결과는 버립니다. 새 결과가 없으면 None.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            item = self.result_q.get(timeout=max(0.0, deadline - time.monotonic()))
+            if item is None:
+                return None
+            if item[0] > self.last_seq:
+                self.last_seq = item[0]
+                return item
+            self.stale += 1
+            self.metrics.inc("frames_dropped")
+
+    def mark_rendered(self, t_capture):
+        """렌더가 끝난 시점에 호출해 캡처→화면 지연 시간을 기록합니다."""
+        self.rendered += 1
+        latency = time.monotonic() - t_capture
+        self.latencies.append(latency)
+        self.metrics.observe("frame_latency", latency)
+        self.metrics.set_gauge("capture_queue_depth", self.frame_q.qsize())
+        self.metrics.set_gauge("render_queue_depth", self.result_q.qsize())
+
+    def finished(self):
+        """카메라/영상이 끝났고 남은 결과가 모두 소비되었는지 여부."""
+        return self.result_q.closed and self.result_q.qsize() == 0
+
+    def stats(self):
+        elapsed = max(time.monotonic() - (self.started_at or time.monotonic()), 1e-9)
+        lat = np.array(self.latencies) * 1000.0 if self.latencies else np.zeros(1)
+        return {
+            "capture_q": self.frame_q.qsize(),
+            "render_q": self.result_q.qsize(),
+            "dropped_capture": self.frame_q.dropped,
+            "dropped_decode": self.result_q.dropped,
+            "stale": self.stale,
+            "capture_fps": self.captured / elapsed,
+            "decode_fps": self.decoded / elapsed,
+            "render_fps": self.rendered / elapsed,
+            "latency_p50_ms": float(np.percentile(lat, 50)),
+            "latency_p99_ms": float(np.percentile(lat, 99)),
+        }
+
+    def format_stats(self):
+        s = self.stats()
+        return (f"[pipeline] 큐 capture={s['capture_q']} render={s['render_q']} | "
+                f"버림 {s['dropped_capture']}/{s['dropped_decode']}/{s['stale']} | "
+                f"fps 캡처 {s['capture_fps']:.1f} 디코딩 {s['decode_fps']:.1f} 렌더 {s['render_fps']:.1f} | "
+                f"지연 p50 {s['latency_p50_ms']:.1f}ms p99 {s['latency_p99_ms']:.1f}ms")
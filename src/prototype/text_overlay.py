@@ -0,0 +1,95 @@
+import os
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+# PIL은 첫 라벨을 그릴 때 import (시작 시간 단축)
+
+# 한글 폰트 후보 (Windows, Linux 순)
+KOREAN_FONT_PATHS = [
+    'C:/Windows/Fonts/malgun.ttf',
+    '/usr/share/fonts/truetype/nanum/NanumGothic.ttf',
+]
+
+
+def find_korean_font(candidates=KOREAN_FONT_PATHS):
+    """사용 가능한 한글 폰트 경로를 찾습니다. 없으면 None."""
+    for path in candidates:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+@lru_cache(maxsize=32)
+def load_font(font_path, font_size):
+    # TrueType 폰트는 (경로, 크기)마다 한 번만 디스크에서 읽음
+    from PIL import ImageFont
+    return ImageFont.truetype(font_path, font_size)
+
+
+class LabelRenderer:
+    """라벨 텍스트를 RGBA 스프라이트로 캐시해 두고 프레임의 해당 영역에만 알파 블렌딩하는 렌더러.
+
+    put_text_korean처럼 프레임 전체를 PIL 이미지로 바꿨다가 되돌리지 않으므로
+    라벨 수가 늘어나도 비용은 라벨 영역 크기에만 비례합니다.
+    color는 프레임의 채널 순서 그대로 사용됩니다 (put_text_korean과 같은 결과).
+    """
+
+    def __init__(self, font_path, cache_size=256):
+        self.font_path = font_path
+        self.cache_size = cache_size
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def sprite(self, text, font_size, color):
+        """(text, font_size, color)에 해당하는 (dx, dy, RGBA 배열)을 LRU 캐시에서 가져옵니다."""
+        key = (text, font_size, color)
+        cached = self.sprites.get(key)
+        if cached is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+
+        from PIL import Image, ImageDraw
+        font = load_font(self.font_path, font_size)
+        left, top, right, bottom = font.getbbox(text)
+        w, h = max(right - left, 1), max(bottom - top, 1)
+        mask = Image.new("L", (w, h), 0)
+        ImageDraw.Draw(mask).text((-left, -top), text, font=font, fill=255)
+
+        rgba = np.empty((h, w, 4), dtype=np.uint8)
+        rgba[..., :3] = color
+        rgba[..., 3] = np.asarray(mask)
+        cached = (left, top, rgba)
+        self.sprites[key] = cached
+        if len(self.sprites) > self.cache_size:
+            self.sprites.popitem(last=False)
+        return cached
+
+    def draw(self, frame, text, pos, font_size, color):
+        """frame(HxWx3, uint8)의 pos 위치에 텍스트를 제자리에서 그리고 frame을 반환합니다."""
+        dx, dy, rgba = self.sprite(text, font_size, tuple(color))
+        x, y = pos[0] + dx, pos[1] + dy
+        h, w = rgba.shape[:2]
+        H, W = frame.shape[:2]
+
+        # 프레임 밖으로 나가는 부분은 잘라냄
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, W), min(y + h, H)
+        if x1 <= x0 or y1 <= y0:
+            return frame
+        sprite = rgba[y0 - y:y1 - y, x0 - x:x1 - x]
+        roi = frame[y0:y1, x0:x1]
+
+        alpha = sprite[..., 3:4].astype(np.uint16)
+        blended = sprite[..., :3] * alpha + roi * (255 - alpha)
+        roi[...] = (blended + 127) // 255
+        return frame
+
+
+@lru_cache(maxsize=8)
+def get_renderer(font_path):
+    return LabelRenderer(font_path)
@@ -1,11 +1,15 @@
 import cv2
-import easyocr
-import re
-from datetime import datetime, date, timezone, timedelta
+import os
+import sys
+from datetime import date
 from typing import List, Optional, Dict, Any
 
-# OCR 리더 초기화 (필요한 언어만 로드)
-reader = easyocr.Reader(['en', 'ko'], gpu=False)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "prototype"))
+from ocr_engine import get_reader, OcrEngine
+from metrics import registry as metrics
+from date_parser import parse_first
+
+# OCR 리더는 import 시점이 아니라 첫 OCR 때 한 번만 로드되어 공유됨 (ocr_engine.get_reader)
 
 # 이미지 로드
 def load_image(path: str) -> 'np.ndarray':
@@ -45,45 +49,15 @@ def preprocess(img: 'np.ndarray') -> 'np.ndarray':
 
     return thresh
 
-# 텍스트에서 날짜 패턴 추출 (강화 버전)
+# 텍스트에서 날짜 패턴 추출 (스캐너와 같은 date_parser 엔진 사용)
+# 한글 년월일, ISO, 미국식(월/일/연도), 유럽식(일/월/연도)을 한 번에 찾고 반복 문자열은 캐시됨
 def extract_date(texts: List[str]) -> Optional[date]:
-    # 다양한 형식의 날짜를 포괄하는 정규식 목록
-    date_patterns = [
-        # 2024-12-31, 2024/12/31, 2024.12.31
-        r'(19|20)\d{2}[년\-\/\.](0?[1-9]|1[0-2])[월\-\/\.](0?[1-9]|[12]\d|3[01])[일]?',
-        # 12-31-2024, 12/31/2024
-        r'(0?[1-9]|1[0-2])[\-\/\.](0?[1-9]|[12]\d|3[01])[\-\/\.](19|20)\d{2}',
-        # 31-12-2024, 31/12/2024
-        r'(0?[1-9]|[12]\d|3[01])[\-\/\.](0?[1-9]|1[0-2])[\-\/\.](19|20)\d{2}',
-        # 한국어 표기: 2024년12월31일
-        r'(19|20)\d{2}[년](0?[1-9]|1[0-2])[월](0?[1-9]|[12]\d|3[01])[일]?'
-    ]
-    for t in texts:
-        for pat in date_patterns:
-            m = re.search(pat, t)
-            if m:
-                raw = m.group(0)
-                # 다양한 포맷으로 파싱 시도
-                candidates = [
-                    "%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d",
-                    "%m-%d-%Y", "%m/%d/%Y", "%m.%d.%Y",
-                    "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y",
-                    "%Y년%m월%d일"
-                ]
-                # 한글 표기에서 '년','월','일' 제거
-                cleaned = raw.replace('년', '').replace('월', '').replace('일', '')
-                for fmt in candidates:
-                    try:
-                        dt = datetime.strptime(cleaned, fmt)
-                        return dt.date()
-                    except Exception:
-                        continue
-    return None
+    return parse_first(texts)
 
 # OCR 수행: 결과 포맷 확정 및 신뢰도 필터링
 def perform_ocr(img: 'np.ndarray', min_conf: float = 0.4) -> (List[Dict[str, Any]], List[str]):
     # EasyOCR의 반환 포맷: [(bbox, text, conf), ...]
-    results = reader.readtext(img, paragraph=False)
+    results = get_reader(['en', 'ko'], gpu=False).readtext(img, paragraph=False)
     filtered = [r for r in results if (r[2] if isinstance(r, list) else 0) >= min_conf]
     texts = [r[1] for r in filtered]
     return filtered, texts
@@ -111,16 +85,40 @@ def format_output(texts: List[str], date_found: Optional[date]) -> Dict[str, Any
         # 평균 신뢰도(해당 텍스트들 기반으로 계산 가능)
     return out
 
+# 바코드 주변 영역만 OCR하는 엔진 (같은 상품 코드는 캐시된 날짜를 재사용)
+def make_ocr_engine(min_conf: float = 0.4) -> OcrEngine:
+    return OcrEngine(extract_date, preprocess=preprocess, min_conf=min_conf)
+
+# 여러 이미지를 한 번의 배치 추론으로 처리
+def main_many(image_paths: List[str], min_conf: float = 0.4) -> List[Dict[str, Any]]:
+    engine = make_ocr_engine(min_conf)
+    imgs = [load_image(p) for p in image_paths]
+    outputs = []
+    for texts in engine.read_batch(imgs):
+        output = format_output(texts, extract_date(texts))
+        output["raw_texts"] = texts
+        output["raw_results_count"] = len(texts)
+        outputs.append(output)
+    return outputs
+
 # 메인 실행 함수: 옵션 인자 포함
 def main(image_path: str, min_conf: float = 0.4) -> Dict[str, Any]:
-    img = load_image(image_path)
-    pre = preprocess(img)
+    # 단계별 시간은 metrics.registry가 켜져 있을 때만 기록됨
+    with metrics.stage("ocr_load_image"):
+        img = load_image(image_path)
+    with metrics.stage("ocr_preprocess"):
+        pre = preprocess(img)
 
     # OCR 수행(신뢰도 기반 필터링)
-    results, texts = perform_ocr(pre, min_conf=min_conf)
+    with metrics.stage("ocr_readtext"):
+        results, texts = perform_ocr(pre, min_conf=min_conf)
 
     # 날짜 추출
-    date_found = extract_date(texts)
+    with metrics.stage("ocr_extract_date"):
+        date_found = extract_date(texts)
+    metrics.inc("ocr_images")
+    if date_found is None:
+        metrics.inc("ocr_date_not_found")
 
     # 결과 포맷
     output = format_output(texts, date_found)